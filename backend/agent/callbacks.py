@@ -1,48 +1,232 @@
 """
 Streaming callback handler that pushes agent events to a Queue.
 The SocketIO handler drains this queue and emits events to the client.
+
+Only final-answer text is forwarded as "token" events: in ReAct mode that is
+whatever the model writes after "Final Answer:", in tool-calling mode it is
+the content of any model turn (tool-call turns carry no content).
+
+CancellationHandler stops a run cooperatively: once its CancelToken is
+cancelled, the next model call, streamed token, agent step or tool start
+raises RunCancelled out of executor.invoke.  Raising from a streamed token
+closes the model's HTTP response; a tool already running finishes first.
 """
 import queue
+import threading
+import time
 from typing import Any
 from langchain_core.callbacks import BaseCallbackHandler
 
+FINAL_ANSWER_MARKER = "Final Answer:"
 
-class StreamingCallbackHandler(BaseCallbackHandler):
-    """Pushes agent lifecycle events into a thread-safe queue."""
+
+def llm_usage(response) -> tuple:
+    """(prompt_tokens, completion_tokens, model) from an LLMResult.
+
+    Non-streaming calls report usage in llm_output; streamed calls leave it
+    empty and put usage_metadata on the generated message instead.
+    """
+    output = response.llm_output or {}
+    usage = output.get('token_usage') or {}
+    if usage:
+        return usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0), output.get('model_name', '')
+    prompt = completion = 0
+    model = output.get('model_name', '')
+    for generations in response.generations:
+        for gen in generations:
+            message = getattr(gen, 'message', None)
+            meta = getattr(message, 'usage_metadata', None) or {}
+            prompt += meta.get('input_tokens', 0)
+            completion += meta.get('output_tokens', 0)
+            model = model or (getattr(message, 'response_metadata', None) or {}).get('model_name', '')
+    return prompt, completion, model
+
+
+def llm_cached_tokens(response) -> int:
+    """Prompt tokens the provider served from its prompt cache, from an LLMResult.
+
+    OpenAI reports them under token_usage.prompt_tokens_details, Anthropic as
+    usage.cache_read_input_tokens; streamed calls carry them in the message's
+    usage_metadata.input_token_details instead.
+    """
+    output = response.llm_output or {}
+    usage = output.get('token_usage') or output.get('usage') or {}
+    if usage:
+        details = usage.get('prompt_tokens_details') or {}
+        cached = details.get('cached_tokens') or usage.get('cache_read_input_tokens') or 0
+        if cached:
+            return cached
+    cached = 0
+    for generations in response.generations:
+        for gen in generations:
+            meta = getattr(getattr(gen, 'message', None), 'usage_metadata', None) or {}
+            cached += (meta.get('input_token_details') or {}).get('cache_read', 0) or 0
+    return cached
+
+
+class RunCancelled(Exception):
+    """Raised inside an agent run whose CancelToken was cancelled."""
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(f"Agent run cancelled ({reason})")
+        self.reason = reason
+
+
+class RunEscalated(Exception):
+    """Raised by the cascade's monitor to abandon a fast-tier attempt for the deep tier."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Escalating to the deep tier ({reason})")
+        self.reason = reason
+
+
+class CancelToken:
+    """One-shot, thread-safe cancellation flag with the reason it was set."""
 
     def __init__(self):
+        self._event = threading.Event()
+        self.reason = None
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise RunCancelled(self.reason)
+
+
+class CancellationHandler(BaseCallbackHandler):
+    """Raises RunCancelled at the next callback once the token is cancelled."""
+
+    raise_error = True
+
+    def __init__(self, token: CancelToken):
+        self.token = token
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        self.token.check()
+
+    def on_llm_start(self, serialized, prompts, **kwargs: Any) -> None:
+        self.token.check()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.token.check()
+
+    def on_agent_action(self, action, **kwargs: Any) -> None:
+        self.token.check()
+
+    def on_tool_start(self, serialized, input_str, **kwargs: Any) -> None:
+        self.token.check()
+
+
+class StreamingCallbackHandler(BaseCallbackHandler):
+    """Pushes agent lifecycle events into a thread-safe queue.
+
+    final_marker is the text that opens the answer in the model output
+    ("Final Answer:" for ReAct), or None when every model token is answer
+    text (tool-calling agents).
+    """
+
+    def __init__(self, final_marker=FINAL_ANSWER_MARKER):
         self.queue: queue.Queue = queue.Queue()
         self._done = False
         self.prompt_tokens = 0
         self.completion_tokens = 0
+        self.cached_tokens = 0  # prompt tokens served from the provider's prompt cache
         self.model = ""
+        self.final_marker = final_marker
+        self.started = time.monotonic()
+        self.first_token_ms = None
+        self._text = ""       # current LLM call's output so far
+        self._sent = 0        # chars of _text already forwarded
+        self._streamed = 0    # tokens streamed by the current LLM call
+        self.compaction = None  # observation-compaction savings, set when the run finishes
 
     def on_llm_end(self, response, **kwargs: Any) -> None:
+        self._streamed = 0
         try:
-            usage = response.llm_output.get('token_usage', {}) if response.llm_output else {}
-            self.prompt_tokens += usage.get('prompt_tokens', 0)
-            self.completion_tokens += usage.get('completion_tokens', 0)
-            if not self.model and response.llm_output:
-                self.model = response.llm_output.get('model_name', '')
+            prompt, completion, model = llm_usage(response)
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+            self.cached_tokens += llm_cached_tokens(response)
+            if not self.model:
+                self.model = model
         except Exception:
             pass
 
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        self._text, self._sent, self._streamed = "", 0, 0
+
+    def on_llm_start(self, serialized, prompts, **kwargs: Any) -> None:
+        self._text, self._sent, self._streamed = "", 0, 0
+
+    def restart(self, mode: str, reason: str) -> None:
+        """A cascade run escalated to the deep tier, whose agent mode may differ.
+
+        Answer text the fast tier already streamed is discarded: a "reset"
+        event tells the client to clear it before the deep tier's tokens.
+        """
+        self.final_marker = None if mode == "tools" else FINAL_ANSWER_MARKER
+        self._text, self._sent, self._streamed = "", 0, 0
+        if self.first_token_ms is not None:
+            self.first_token_ms = None
+            self.queue.put({"event": "reset", "data": reason})
+
+    def spent_tokens(self) -> tuple:
+        """(prompt, completion) so far, counting tokens streamed by an unfinished call.
+
+        A call aborted mid-stream never reports usage; each streamed chunk is
+        about one completion token, and its prompt tokens go uncounted.
+        """
+        return self.prompt_tokens, self.completion_tokens + self._streamed
+
     def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
-        self.queue.put({"event": "token", "data": token})
+        self._streamed += 1
+        if not token:
+            return
+        self._text += token
+        if self.final_marker is None:
+            start = 0
+        else:
+            marker = self._text.find(self.final_marker)
+            if marker < 0:
+                return
+            start = marker + len(self.final_marker)
+            if not self._sent:
+                # Drop the space/newline after the marker
+                while start < len(self._text) and self._text[start].isspace():
+                    start += 1
+                if start == len(self._text):
+                    return
+        delta = self._text[max(start, self._sent):]
+        self._sent = len(self._text)
+        if delta:
+            if self.first_token_ms is None:
+                self.first_token_ms = round((time.monotonic() - self.started) * 1000)
+            self.queue.put({"event": "token", "data": delta})
 
-    def on_agent_action(self, action, **kwargs: Any) -> None:
+    # Tool events carry the tool run's run_id: the parallel executor runs
+    # several tools at once, so results don't arrive in start order.
+    def on_tool_start(self, serialized, input_str: str, *, run_id=None, **kwargs: Any) -> None:
         self.queue.put({
             "event": "tool_start",
             "data": {
-                "tool": action.tool,
-                "input": str(action.tool_input),
+                "tool": (serialized or {}).get("name", ""),
+                "input": str(input_str),
+                "runId": str(run_id),
             }
         })
 
-    def on_tool_end(self, output: str, **kwargs: Any) -> None:
+    def on_tool_end(self, output: str, *, run_id=None, **kwargs: Any) -> None:
         self.queue.put({
             "event": "tool_result",
-            "data": {"output": output[:2000]}  # Truncate large outputs
+            "data": {"output": str(output)[:2000], "runId": str(run_id)}  # Truncate large outputs
         })
 
     def on_chain_end(self, outputs: dict, **kwargs: Any) -> None:
@@ -56,6 +240,7 @@ class StreamingCallbackHandler(BaseCallbackHandler):
                 })
 
     def on_agent_finish(self, finish, **kwargs: Any) -> None:
+        self.compaction = finish.return_values.get("compaction")
         self.queue.put({
             "event": "done",
             "data": {"output": finish.return_values.get("output", "")}
@@ -63,6 +248,8 @@ class StreamingCallbackHandler(BaseCallbackHandler):
         self._done = True
 
     def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        if isinstance(error, (RunCancelled, RunEscalated)):
+            return  # reported by the runner as "cancelled" / retried on the deep tier, not an error
         self.queue.put({
             "event": "error",
             "data": str(error)
@@ -70,6 +257,8 @@ class StreamingCallbackHandler(BaseCallbackHandler):
         self._done = True
 
     def on_chain_error(self, error: BaseException, **kwargs: Any) -> None:
+        if isinstance(error, (RunCancelled, RunEscalated)):
+            return
         self.queue.put({
             "event": "error",
             "data": str(error)
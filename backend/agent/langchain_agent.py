@@ -1,36 +1,33 @@
+"""LangChain ReAct agent — tool functions, tool registry and tiered executors.
+
+Importing this module is cheap: each tool imports its own heavy dependencies
+(serpapi, wikipedia, bs4, requests, smtplib, sqlite3, LLM clients) on first
+call, the Tool objects are built on the first get_tools(), and each tier's LLM
+client and AgentExecutor are built on the first get_executor() for that tier.
+The old module attributes (tools, executor, executor_fast, ...) still resolve,
+lazily, via __getattr__.
+
+    python -m backend.bench.import_bench   # import-time report + cold-start budget
+"""
 import os
 import json
 import csv
 import subprocess
-import smtplib
 import re
-import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from functools import wraps
 from io import StringIO
 from datetime import datetime
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-try:
-    from langchain.agents import AgentExecutor, create_react_agent
-except ImportError:
-    from langchain.agents.agent import AgentExecutor
-    from langchain.agents.react.agent import create_react_agent
-try:
-    from langchain.tools import Tool
-except ImportError:
-    from langchain_core.tools import Tool
-from langchain_core.prompts import PromptTemplate
-from serpapi import GoogleSearch
-import requests
-from bs4 import BeautifulSoup
-import wikipedia
-import yfinance as yf
 
 # Load API keys from .env
 load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
 
+logger = logging.getLogger(__name__)
+
 
 # --- Helper Functions ---
 
@@ -47,13 +44,126 @@ def _clean_input(s: str) -> str:
     return s
 
 
+# =====================
+# TOOL RESULT CACHE
+# =====================
+# Read-only tools whose answer depends only on their input are memoized for a
+# per-tool TTL, keyed by the normalized input — the model often repeats a call
+# verbatim (e.g. after a parsing error), within one run or across queries.
+# Entries are LRU-evicted once the cached output exceeds TOOL_CACHE_MAX_CHARS
+# in total; error outputs are never stored.  StockPrice is left out: quote_service
+# already caches each ticker for 30 s, and a second layer would double the
+# staleness.
+
+TOOL_CACHE_TTLS = {
+    "Search": 900,
+    "Wikipedia": 24 * 3600,
+    "WebScraper": 600,
+    "CurrencyConvert": 3600,
+    "Weather": 600,
+}
+TOOL_CACHE_MAX_CHARS = 2_000_000   # total cached output, ~2-8 MB
+TOOL_CACHE_MAX_ENTRY = 50_000      # larger outputs are never cached
+
+# Tools with side effects — never memoized, even if someone adds a TTL above
+UNCACHEABLE_TOOLS = {"WriteFile", "Shell", "SendEmail", "Todo", "Git", "Docker"}
+
+# Inputs that differ only in case mean the same thing for these tools
+_CASE_INSENSITIVE_TOOLS = {"Search", "Wikipedia", "CurrencyConvert", "Weather"}
+
+# "Search error: ...", "Error fetching URL: ...", "Stock error: ..." etc.
+_TOOL_ERROR_RE = re.compile(r"^(?:\w+ )?error\b", re.IGNORECASE)
+
+_tool_cache: OrderedDict = OrderedDict()  # (tool, key) -> (expires_at, output)
+_tool_cache_lock = threading.Lock()
+_tool_cache_chars = 0
+_tool_cache_counts: dict = {}  # tool -> {"hits", "misses", "stores", "evictions"}
+
+
+def _normalize_tool_input(tool: str, tool_input: str) -> str:
+    text = " ".join(_clean_input(str(tool_input)).split())
+    return text.lower() if tool in _CASE_INSENSITIVE_TOOLS else text
+
+
+def cached_tool(name: str):
+    """Memoize a tool function for TOOL_CACHE_TTLS[name] seconds."""
+    if name in UNCACHEABLE_TOOLS:
+        raise ValueError(f"{name} has side effects and must not be cached")
+    ttl = TOOL_CACHE_TTLS[name]
+
+    def decorate(func):
+        @wraps(func)
+        def wrapper(tool_input: str = "") -> str:
+            global _tool_cache_chars
+            key = (name, _normalize_tool_input(name, tool_input))
+            now = time.monotonic()
+            with _tool_cache_lock:
+                counts = _tool_cache_counts.setdefault(
+                    name, {"hits": 0, "misses": 0, "stores": 0, "evictions": 0})
+                entry = _tool_cache.get(key)
+                if entry is not None and entry[0] > now:
+                    _tool_cache.move_to_end(key)
+                    counts["hits"] += 1
+                    return entry[1]
+                counts["misses"] += 1
+
+            output = func(tool_input)
+
+            if (isinstance(output, str) and len(output) <= TOOL_CACHE_MAX_ENTRY
+                    and not _TOOL_ERROR_RE.match(output)):
+                with _tool_cache_lock:
+                    old = _tool_cache.pop(key, None)
+                    if old is not None:
+                        _tool_cache_chars -= len(old[1])
+                    _tool_cache[key] = (time.monotonic() + ttl, output)
+                    _tool_cache_chars += len(output)
+                    counts["stores"] += 1
+                    while _tool_cache_chars > TOOL_CACHE_MAX_CHARS:
+                        (evicted_tool, _), (_, evicted) = _tool_cache.popitem(last=False)
+                        _tool_cache_chars -= len(evicted)
+                        _tool_cache_counts[evicted_tool]["evictions"] += 1
+            return output
+
+        return wrapper
+
+    return decorate
+
+
+def clear_tool_cache(tool: str = None) -> None:
+    """Drop memoized tool results — all of them, or one tool's."""
+    global _tool_cache_chars
+    with _tool_cache_lock:
+        for key in [k for k in _tool_cache if tool is None or k[0] == tool]:
+            _tool_cache_chars -= len(_tool_cache.pop(key)[1])
+
+
+def get_tool_cache_stats() -> dict:
+    """Size and per-tool hit/miss counters for the tool result cache."""
+    with _tool_cache_lock:
+        tools = {name: dict(c) for name, c in sorted(_tool_cache_counts.items())}
+        entries, chars = len(_tool_cache), _tool_cache_chars
+    hits = sum(c["hits"] for c in tools.values())
+    misses = sum(c["misses"] for c in tools.values())
+    return {
+        "entries": entries,
+        "chars": chars,
+        "maxChars": TOOL_CACHE_MAX_CHARS,
+        "hits": hits,
+        "misses": misses,
+        "hitRate": round(hits / (hits + misses), 3) if hits + misses else None,
+        "tools": tools,
+    }
+
+
 # =====================
 # ORIGINAL 10 TOOLS
 # =====================
 
+@cached_tool("Search")
 def search(query: str) -> str:
     """Search the web using SerpAPI."""
     try:
+        from serpapi import GoogleSearch
         params = {
             "q": query,
             "api_key": os.environ.get("SERPAPI_API_KEY"),
@@ -97,8 +207,10 @@ def get_current_date(input: str = "") -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
+@cached_tool("Wikipedia")
 def wiki_lookup(query: str) -> str:
     """Look up a topic on Wikipedia."""
+    import wikipedia
     try:
         page = wikipedia.page(query, auto_suggest=True)
         return page.summary[:1500]
@@ -110,9 +222,12 @@ def wiki_lookup(query: str) -> str:
         return f"Wikipedia error: {e}"
 
 
+@cached_tool("WebScraper")
 def fetch_webpage(url: str) -> str:
     """Fetch and extract text content from a webpage."""
     try:
+        import requests
+        from bs4 import BeautifulSoup
         headers = {"User-Agent": "Mozilla/5.0"}
         resp = requests.get(_clean_input(url), headers=headers, timeout=10)
         resp.raise_for_status()
@@ -125,9 +240,11 @@ def fetch_webpage(url: str) -> str:
         return f"Error fetching URL: {e}"
 
 
+@cached_tool("Weather")
 def weather(location: str) -> str:
     """Get current weather for a location using wttr.in."""
     try:
+        import requests
         loc = _clean_input(location)
         resp = requests.get(f"https://wttr.in/{loc}?format=j1", timeout=20)
         resp.raise_for_status()
@@ -215,8 +332,8 @@ def shell_command(command: str) -> str:
 def summarize_text(text: str) -> str:
     """Summarize a block of text using GPT."""
     try:
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        resp = llm.invoke(f"Summarize the following text concisely:\n\n{_clean_input(text)}")
+        from backend.services.llm_clients import invoke
+        resp = invoke(f"Summarize the following text concisely:\n\n{_clean_input(text)}")
         return resp.content
     except Exception as e:
         return f"Summarize error: {e}"
@@ -225,13 +342,13 @@ def summarize_text(text: str) -> str:
 def translate_text(input_str: str) -> str:
     """Translate text to a target language. Input format: target_language|||text"""
     try:
+        from backend.services.llm_clients import invoke
         parts = input_str.split("|||", 1)
         if len(parts) != 2:
             return "Error: Input must be in format 'target_language|||text to translate'"
         lang = _clean_input(parts[0])
         text = parts[1].strip()
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        resp = llm.invoke(f"Translate the following text to {lang}. Only return the translation, nothing else:\n\n{text}")
+        resp = invoke(f"Translate the following text to {lang}. Only return the translation, nothing else:\n\n{text}")
         return resp.content
     except Exception as e:
         return f"Translate error: {e}"
@@ -240,8 +357,8 @@ def translate_text(input_str: str) -> str:
 def sentiment_analysis(text: str) -> str:
     """Analyze the sentiment of text using GPT."""
     try:
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        resp = llm.invoke(
+        from backend.services.llm_clients import invoke
+        resp = invoke(
             f"Analyze the sentiment of the following text. "
             f"Respond with: Sentiment (Positive/Negative/Neutral), Confidence (High/Medium/Low), "
             f"and a brief explanation.\n\n{_clean_input(text)}"
@@ -254,13 +371,14 @@ def sentiment_analysis(text: str) -> str:
 def text_rewriter(input_str: str) -> str:
     """Rewrite text in a given style. Input format: style|||text (styles: formal, casual, concise, persuasive, technical)"""
     try:
+        from backend.services.llm_clients import invoke
         parts = input_str.split("|||", 1)
         if len(parts) != 2:
             return "Error: Input must be in format 'style|||text'"
         style = _clean_input(parts[0])
         text = parts[1].strip()
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
-        resp = llm.invoke(f"Rewrite the following text in a {style} style. Only return the rewritten text:\n\n{text}")
+        resp = invoke(f"Rewrite the following text in a {style} style. Only return the rewritten text:\n\n{text}",
+                      temperature=0.7)
         return resp.content
     except Exception as e:
         return f"Rewrite error: {e}"
@@ -272,36 +390,26 @@ def text_rewriter(input_str: str) -> str:
 
 def stock_price(ticker: str) -> str:
     """Get current stock price and info for a ticker symbol."""
+    from backend.services.quote_service import get_quote
     try:
         t = _clean_input(ticker).upper()
-        stock = yf.Ticker(t)
-        info = stock.info
-        price = info.get("currentPrice") or info.get("regularMarketPrice", "N/A")
-        prev_close = info.get("previousClose", "N/A")
-        market_cap = info.get("marketCap", "N/A")
-        name = info.get("shortName", t)
-        day_high = info.get("dayHigh", "N/A")
-        day_low = info.get("dayLow", "N/A")
-        volume = info.get("volume", "N/A")
-        if market_cap and market_cap != "N/A":
-            if market_cap >= 1e12:
-                market_cap = f"${market_cap/1e12:.2f}T"
-            elif market_cap >= 1e9:
-                market_cap = f"${market_cap/1e9:.2f}B"
-            else:
-                market_cap = f"${market_cap/1e6:.2f}M"
-        change = ""
-        if price != "N/A" and prev_close != "N/A":
-            pct = ((price - prev_close) / prev_close) * 100
-            change = f" ({'+' if pct >= 0 else ''}{pct:.2f}%)"
-        return f"{name} ({t}): ${price}{change} | Day: ${day_low}-${day_high} | Vol: {volume:,} | Cap: {market_cap}"
+        q = get_quote(t)
+        if "error" in q:
+            return f"Stock error: {t}: {q['error']}"
+        pct = q["changePercent"]
+        change = f" ({'+' if pct >= 0 else ''}{pct:.2f}%)" if q["previousClose"] else ""
+        volume = f"{q['volume']:,}" if q["volume"] is not None else "N/A"
+        return (f"{q['name']} ({t}): ${q['price']}{change} | Prev close: ${q['previousClose'] or 'N/A'} "
+                f"| Day: ${q['dayLow']}-${q['dayHigh']} | Vol: {volume}")
     except Exception as e:
         return f"Stock error: {e}"
 
 
+@cached_tool("CurrencyConvert")
 def currency_convert(input_str: str) -> str:
     """Convert currency. Input format: amount FROM TO (e.g., 100 USD EUR)"""
     try:
+        import requests
         parts = _clean_input(input_str).upper().split()
         if len(parts) != 3:
             return "Error: Input format should be 'amount FROM TO' (e.g., '100 USD EUR')"
@@ -377,6 +485,7 @@ def parse_json(input_str: str) -> str:
 def api_request(input_str: str) -> str:
     """Make an HTTP API request. Input format: METHOD URL [|||json_body]"""
     try:
+        import requests
         cleaned = _clean_input(input_str)
         body = None
         if "|||" in cleaned:
@@ -457,7 +566,6 @@ def todo_manager(input_str: str) -> str:
 def timer_tool(input_str: str) -> str:
     """Set a countdown timer. Input: number of seconds to wait."""
     try:
-        import time
         seconds = int(_clean_input(input_str))
         if seconds > 300:
             return "Error: Max timer is 300 seconds (5 minutes)."
@@ -472,6 +580,9 @@ def timer_tool(input_str: str) -> str:
 def send_email(input_str: str) -> str:
     """Send an email. Input format: to@email.com|||subject|||body"""
     try:
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
         parts = input_str.split("|||")
         if len(parts) != 3:
             return "Error: Input must be 'to@email.com|||subject|||body'"
@@ -590,6 +701,7 @@ def regex_tool(input_str: str) -> str:
 def sqlite_tool(input_str: str) -> str:
     """Execute SQLite queries. Input format: db_path|||SQL query"""
     try:
+        import sqlite3
         parts = input_str.split("|||", 1)
         if len(parts) != 2:
             return "Error: Input must be 'db_path|||SQL query'"
@@ -724,85 +836,117 @@ def monarch_finance(query: str) -> str:
 # =====================
 # TOOL REGISTRY
 # =====================
+# (name, func, description) — plain data so importing this module stays cheap.
+# get_tools() wraps them in LangChain Tool objects on first use.
 
-tools = [
+TOOL_SPECS = [
     # --- Original 10 ---
-    Tool(name="Search", func=search,
-         description="Search the web for current information. Input: a search query."),
-    Tool(name="Calculator", func=calculator,
-         description="Evaluate math expressions. Supports sqrt(), sin(), pi, etc. Input: a math expression."),
-    Tool(name="GetDateTime", func=get_current_date,
-         description="Get the current date and time. Input can be any string or empty."),
-    Tool(name="Wikipedia", func=wiki_lookup,
-         description="Look up a topic on Wikipedia. Input: a topic name."),
-    Tool(name="WebScraper", func=fetch_webpage,
-         description="Fetch and read text from a webpage. Input: a full URL."),
-    Tool(name="Weather", func=weather,
-         description="Get current weather for a location. Input: city name or location."),
-    Tool(name="PythonREPL", func=run_python,
-         description="Execute Python code and return output. Input: Python code as a string."),
-    Tool(name="ReadFile", func=read_file,
-         description="Read the contents of a local file. Input: file path."),
-    Tool(name="WriteFile", func=write_file,
-         description="Write content to a local file. Input format: filepath|||content"),
-    Tool(name="Shell", func=shell_command,
-         description="Run a shell command. Input: a shell command string."),
+    ("Search", search,
+     "Search the web for current information. Input: a search query."),
+    ("Calculator", calculator,
+     "Evaluate math expressions. Supports sqrt(), sin(), pi, etc. Input: a math expression."),
+    ("GetDateTime", get_current_date,
+     "Get the current date and time. Input can be any string or empty."),
+    ("Wikipedia", wiki_lookup,
+     "Look up a topic on Wikipedia. Input: a topic name."),
+    ("WebScraper", fetch_webpage,
+     "Fetch and read text from a webpage. Input: a full URL."),
+    ("Weather", weather,
+     "Get current weather for a location. Input: city name or location."),
+    ("PythonREPL", run_python,
+     "Execute Python code and return output. Input: Python code as a string."),
+    ("ReadFile", read_file,
+     "Read the contents of a local file. Input: file path."),
+    ("WriteFile", write_file,
+     "Write content to a local file. Input format: filepath|||content"),
+    ("Shell", shell_command,
+     "Run a shell command. Input: a shell command string."),
     # --- AI / LLM ---
-    Tool(name="Summarize", func=summarize_text,
-         description="Summarize a block of text using AI. Input: the text to summarize."),
-    Tool(name="Translate", func=translate_text,
-         description="Translate text to another language. Input format: target_language|||text"),
-    Tool(name="Sentiment", func=sentiment_analysis,
-         description="Analyze sentiment of text (Positive/Negative/Neutral). Input: the text to analyze."),
-    Tool(name="Rewrite", func=text_rewriter,
-         description="Rewrite text in a style (formal, casual, concise, persuasive, technical). Input: style|||text"),
+    ("Summarize", summarize_text,
+     "Summarize a block of text using AI. Input: the text to summarize."),
+    ("Translate", translate_text,
+     "Translate text to another language. Input format: target_language|||text"),
+    ("Sentiment", sentiment_analysis,
+     "Analyze sentiment of text (Positive/Negative/Neutral). Input: the text to analyze."),
+    ("Rewrite", text_rewriter,
+     "Rewrite text in a style (formal, casual, concise, persuasive, technical). Input: style|||text"),
     # --- Data ---
-    Tool(name="StockPrice", func=stock_price,
-         description="Get current stock price and info. Input: ticker symbol (e.g., AAPL, TSLA, GOOGL)."),
-    Tool(name="CurrencyConvert", func=currency_convert,
-         description="Convert between currencies. Input: amount FROM TO (e.g., 100 USD EUR)."),
-    Tool(name="ParseCSV", func=parse_csv,
-         description="Parse CSV data or file. Input: file path or raw CSV text."),
-    Tool(name="ParseJSON", func=parse_json,
-         description="Parse and summarize JSON data or file. Input: file path or raw JSON text."),
-    Tool(name="APIRequest", func=api_request,
-         description="Make HTTP API requests. Input: METHOD URL [|||json_body] (e.g., GET https://api.example.com/data)."),
+    ("StockPrice", stock_price,
+     "Get current stock price and info. Input: ticker symbol (e.g., AAPL, TSLA, GOOGL)."),
+    ("CurrencyConvert", currency_convert,
+     "Convert between currencies. Input: amount FROM TO (e.g., 100 USD EUR)."),
+    ("ParseCSV", parse_csv,
+     "Parse CSV data or file. Input: file path or raw CSV text."),
+    ("ParseJSON", parse_json,
+     "Parse and summarize JSON data or file. Input: file path or raw JSON text."),
+    ("APIRequest", api_request,
+     "Make HTTP API requests. Input: METHOD URL [|||json_body] (e.g., GET https://api.example.com/data)."),
     # --- Productivity ---
-    Tool(name="Todo", func=todo_manager,
-         description="Manage a todo list. Input: add TASK | list | done NUMBER | remove NUMBER"),
-    Tool(name="Timer", func=timer_tool,
-         description="Set a countdown timer. Input: number of seconds (max 300)."),
-    Tool(name="SendEmail", func=send_email,
-         description="Send an email. Input: to@email.com|||subject|||body. Requires SMTP config in .env."),
-    Tool(name="Notes", func=note_manager,
-         description="Manage notes. Input: save TITLE|||content | list | read TITLE | delete TITLE"),
+    ("Todo", todo_manager,
+     "Manage a todo list. Input: add TASK | list | done NUMBER | remove NUMBER"),
+    ("Timer", timer_tool,
+     "Set a countdown timer. Input: number of seconds (max 300)."),
+    ("SendEmail", send_email,
+     "Send an email. Input: to@email.com|||subject|||body. Requires SMTP config in .env."),
+    ("Notes", note_manager,
+     "Manage notes. Input: save TITLE|||content | list | read TITLE | delete TITLE"),
     # --- Developer ---
-    Tool(name="Git", func=git_tool,
-         description="Run git commands. Input: git command (e.g., status, log --oneline -5, diff)."),
-    Tool(name="Regex", func=regex_tool,
-         description="Test a regex pattern. Input: pattern|||text"),
-    Tool(name="SQLite", func=sqlite_tool,
-         description="Execute SQLite queries. Input: db_path|||SQL query"),
-    Tool(name="Docker", func=docker_tool,
-         description="Run Docker commands. Input: docker command (e.g., ps, images, logs)."),
-    Tool(name="FormatJSON", func=json_formatter,
-         description="Format and validate JSON. Input: raw JSON string or file path."),
+    ("Git", git_tool,
+     "Run git commands. Input: git command (e.g., status, log --oneline -5, diff)."),
+    ("Regex", regex_tool,
+     "Test a regex pattern. Input: pattern|||text"),
+    ("SQLite", sqlite_tool,
+     "Execute SQLite queries. Input: db_path|||SQL query"),
+    ("Docker", docker_tool,
+     "Run Docker commands. Input: docker command (e.g., ps, images, logs)."),
+    ("FormatJSON", json_formatter,
+     "Format and validate JSON. Input: raw JSON string or file path."),
     # --- Personal Finance ---
-    Tool(name="PersonalFinance", func=monarch_finance,
-         description="Query personal finance data from Monarch Money. "
-                     "Handles: accounts/balances/net worth, transactions/spending, "
-                     "budgets, cashflow/income/savings, recurring/subscriptions. "
-                     "Input: a natural language query about finances."),
+    ("PersonalFinance", monarch_finance,
+     "Query personal finance data from Monarch Money. "
+     "Handles: accounts/balances/net worth, transactions/spending, "
+     "budgets, cashflow/income/savings, recurring/subscriptions. "
+     "Input: a natural language query about finances."),
 ]
 
+_tools = None
+_registry_lock = threading.Lock()
+
+
+def get_tools() -> list:
+    """The agent's LangChain Tool objects, built on first call."""
+    global _tools
+    if _tools is None:
+        with _registry_lock:
+            if _tools is None:
+                try:
+                    from langchain.tools import Tool
+                except ImportError:
+                    from langchain_core.tools import Tool
+                _tools = [Tool(name=name, func=func, description=description)
+                          for name, func, description in TOOL_SPECS]
+    return _tools
+
+
 # ── Tiered LLM setup ──────────────────────────────────────────────────────
 # Haiku: simple single-tool queries | Sonnet: complex multi-tool chains
 # NOTE: Anthropic API limit hit until April 1, 2026 — using GPT-4o fallback.
-# When limit resets, swap these two lines back:
-#   llm_fast = ChatAnthropic(model="claude-haiku-4-5-20251001", temperature=0)
-#   llm_deep = ChatAnthropic(model="claude-sonnet-4-5-20250929", temperature=0)
-llm_fast = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-llm_deep = ChatOpenAI(model="gpt-4o", temperature=0)
+# When limit resets, swap the models in _TIERS back:
+#   fast: ChatAnthropic(model="claude-haiku-4-5-20251001", temperature=0)
+#   deep: ChatAnthropic(model="claude-sonnet-4-5-20250929", temperature=0)
+# Each tier's client and executor are built on first use (see get_executor).
+#
+# Agent mode, per tier (AGENT_MODE_FAST / AGENT_MODE_DEEP):
+#   "react" — text ReAct prompt, one tool per LLM round trip
+#   "tools" — the provider's native tool calling; independent calls the model
+#             requests in one turn (weather + calendar + stock) run concurrently
+# Both tiers default to "react"; set AGENT_MODE_<TIER>=tools to opt in.
+AGENT_MODES = ("react", "tools")
+_TIERS = {
+    "fast": {"model": "gpt-4o-mini", "max_iterations": 15, "mode": os.getenv("AGENT_MODE_FAST", "react")},
+    "deep": {"model": "gpt-4o", "max_iterations": 25, "mode": os.getenv("AGENT_MODE_DEEP", "react")},
+}
+PARALLEL_TOOL_WORKERS = 4
 
 # Load family profile for personalized responses
 try:
@@ -811,38 +955,389 @@ except ImportError:
     FAMILY_PROFILE = ""
 
 # ReAct prompt template
+# Providers reuse a prompt prefix they have seen recently (OpenAI does this
+# automatically past 1024 tokens) and bill it at a discount, so everything
+# identical across calls comes first and byte-for-byte fixed: the format
+# instructions, then the profile.  What varies goes after it — the per-query
+# tool subset, then the input (with any session memory), then the scratchpad.
 _profile_block = f"\n{FAMILY_PROFILE}\n\n" if FAMILY_PROFILE else ""
-_prompt_template = (
-    _profile_block + """Answer the following questions as best you can. You have access to the following tools:
-
-{tools}
+_REACT_INSTRUCTIONS = """Answer the following questions as best you can using the tools listed below.
 
 Use the following format:
 
 Question: the input question you must answer
 Thought: you should always think about what to do
-Action: the action to take, should be one of [{tool_names}]
+Action: the action to take, exactly one of the tool names listed below
 Action Input: the input to the action
 Observation: the result of the action
 ... (this Thought/Action/Action Input/Observation can repeat N times)
 Thought: I now know the final answer
 Final Answer: the final answer to the original input question
+"""
+_STATIC_PREFIX = _REACT_INSTRUCTIONS + _profile_block
+_prompt_template = (
+    _STATIC_PREFIX.replace("{", "{{").replace("}", "}}") + """
+You have access to the following tools:
+
+{tools}
+
+Valid Action values: [{tool_names}]
 
 Begin!
 
 Question: {input}
 Thought:{agent_scratchpad}"""
 )
-prompt = PromptTemplate.from_template(_prompt_template)
 
-# Create tiered executors
-agent_fast = create_react_agent(llm_fast, tools, prompt)
-agent_deep = create_react_agent(llm_deep, tools, prompt)
-executor_fast = AgentExecutor(agent=agent_fast, tools=tools, verbose=True, handle_parsing_errors=True, max_iterations=15)
-executor_deep = AgentExecutor(agent=agent_deep, tools=tools, verbose=True, handle_parsing_errors=True, max_iterations=25)
+_llms: dict = {}       # tier -> chat model
+_executors: OrderedDict = OrderedDict()  # (tier, mode, tool names or None, cascade) -> AgentExecutor
+_EXECUTORS_MAX = 32  # full-set executors plus recently used tool subsets
+_build_lock = threading.Lock()
+_build_ms: dict = {}   # "tier/mode" -> construction time, for get_build_stats()
+
+
+def get_llm(tier: str = "fast"):
+    """The streaming chat model for a tier, created on first call."""
+    llm = _llms.get(tier)
+    if llm is None:
+        with _build_lock:
+            llm = _llms.get(tier)
+            if llm is None:
+                try:
+                    from backend.services.llm_clients import get_llm as shared_llm
+                    llm = shared_llm(_TIERS[tier]["model"], 0, streaming=True)
+                except ImportError:  # standalone copy outside the backend package
+                    from langchain_openai import ChatOpenAI
+                    llm = ChatOpenAI(model=_TIERS[tier]["model"], temperature=0, streaming=True, stream_usage=True)
+                _llms[tier] = llm
+    return llm
+
+
+def get_prompt():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate.from_template(_prompt_template)
+
+
+_TOOL_CALLING_SYSTEM = (
+    "You are a helpful assistant with access to tools. When a question needs several "
+    "independent lookups, request all of those tool calls together in one turn instead "
+    "of one at a time. Answer directly once you have what you need."
+)
+
+
+def get_tool_calling_prompt():
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+    # A fixed system message, so the cached prefix ends only where the input starts
+    system = (_TOOL_CALLING_SYSTEM + "\n" + _profile_block).replace("{", "{{").replace("}", "}}")
+    return ChatPromptTemplate.from_messages([
+        ("system", system),
+        ("human", "{input}"),
+        MessagesPlaceholder("agent_scratchpad"),
+    ])
+
+
+# ── Observation compaction ────────────────────────────────────────────────
+# Every iteration resends all earlier tool observations in the prompt, and
+# WebScraper / ReadFile / ParseCSV / SQLite return up to 3000 chars each.
+# compact_steps() is the executors' trim_intermediate_steps hook, so it only
+# changes what the model is sent: callbacks (and so the UI) and the returned
+# intermediate_steps keep the full observations.
+#
+#   * always: collapse whitespace runs, blank-line stacks and repeated lines
+#   * past OBS_TOKEN_BUDGET: observations older than the latest OBS_KEEP_RECENT
+#     are cut to head + tail, or, with AGENT_OBS_SUMMARY=1, replaced by a
+#     cheap-model summary (made once per observation, then cached)
+#
+# Savings per run land in the executor output as "compaction" and in
+# get_compaction_stats().
+
+OBS_TOKEN_BUDGET = int(os.getenv("AGENT_OBS_TOKEN_BUDGET", "2000"))
+OBS_KEEP_RECENT = 2
+OBS_TRIM_CHARS = 600
+OBS_SUMMARY = os.getenv("AGENT_OBS_SUMMARY", "0") == "1"
+OBS_SUMMARY_MODEL = "gpt-4o-mini"
+_CHARS_PER_TOKEN = 4
+_OBS_SUMMARIES_MAX = 256
+
+_obs_summaries = OrderedDict()   # hash((tool, observation)) -> summary
+_obs_lock = threading.Lock()
+_obs_stats = {"runs": 0, "calls": 0, "fullTokens": 0, "sentTokens": 0, "trimmed": 0, "summarized": 0}
+_obs_run = threading.local()      # .stats for the run on this thread
+
+
+def _tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN
+
+
+def _normalize_observation(text: str) -> str:
+    """Lossless-enough cleanup: whitespace runs, blank-line stacks, repeated lines."""
+    lines = []
+    for line in re.sub(r"[ \t]+", " ", text).splitlines():
+        line = line.rstrip()
+        if line and lines and line == lines[-1]:
+            continue
+        if not line and lines and not lines[-1]:
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _trim_observation(text: str, limit: int = OBS_TRIM_CHARS) -> str:
+    if len(text) <= limit:
+        return text
+    head = limit * 2 // 3
+    tail = limit - head
+    return f"{text[:head]}\n... [{len(text) - limit} chars trimmed] ...\n{text[-tail:]}"
+
+
+def _summarize_observation(tool: str, text: str):
+    """Short cheap-model summary of one observation, or None if the call fails."""
+    key = hash((tool, text))
+    with _obs_lock:
+        if key in _obs_summaries:
+            return _obs_summaries[key]
+    try:
+        from backend.services.llm_clients import invoke
+        summary = invoke(
+            f"Summarize this {tool} tool output in under 80 words. Keep every number, name, "
+            f"date and URL that could answer a question about it.\n\n{text}",
+            model=OBS_SUMMARY_MODEL,
+        ).content.strip()
+    except Exception as e:
+        print(f"[AGENT] observation summary failed: {e}", flush=True)
+        return None
+    with _obs_lock:
+        _obs_summaries[key] = summary
+        while len(_obs_summaries) > _OBS_SUMMARIES_MAX:
+            _obs_summaries.popitem(last=False)
+    return summary
+
+
+def compact_steps(steps: list) -> list:
+    """The (action, observation) steps to put in the next prompt."""
+    compact = [(action, _normalize_observation(obs) if isinstance(obs, str) else obs)
+               for action, obs in steps]
+    older = range(max(0, len(compact) - OBS_KEEP_RECENT))
+    sent = sum(_tokens(obs) for _, obs in compact if isinstance(obs, str))
+    trimmed = summarized = 0
+    for i in older:
+        if sent <= OBS_TOKEN_BUDGET:
+            break
+        action, obs = compact[i]
+        if not isinstance(obs, str) or len(obs) <= OBS_TRIM_CHARS:
+            continue
+        replacement = _summarize_observation(action.tool, obs) if OBS_SUMMARY else None
+        if replacement:
+            replacement = f"[summary] {replacement}"
+            summarized += 1
+        else:
+            replacement = _trim_observation(obs)
+            trimmed += 1
+        sent -= _tokens(obs) - _tokens(replacement)
+        compact[i] = (action, replacement)
+
+    full = sum(_tokens(obs) for _, obs in steps if isinstance(obs, str))
+    run = getattr(_obs_run, "stats", None)
+    with _obs_lock:
+        for counts in (_obs_stats, run) if run is not None else (_obs_stats,):
+            counts["calls"] += 1
+            counts["fullTokens"] += full
+            counts["sentTokens"] += sent
+            counts["trimmed"] += trimmed
+            counts["summarized"] += summarized
+    return compact
+
+
+def get_compaction_stats() -> dict:
+    """Observation tokens the model would have been resent vs. what it was sent."""
+    with _obs_lock:
+        stats = dict(_obs_stats)
+    stats["savedTokens"] = stats["fullTokens"] - stats["sentTokens"]
+    stats["tokenBudget"] = OBS_TOKEN_BUDGET
+    stats["summaries"] = OBS_SUMMARY
+    return stats
+
+
+_compacting_executor_cls = None
+
+
+def _compacting_executor_class():
+    """AgentExecutor that reports observation-compaction savings per run."""
+    global _compacting_executor_cls
+    if _compacting_executor_cls is not None:
+        return _compacting_executor_cls
+
+    try:
+        from langchain.agents import AgentExecutor
+    except ImportError:
+        from langchain.agents.agent import AgentExecutor
+
+    class CompactingAgentExecutor(AgentExecutor):
+        def _call(self, inputs, run_manager=None):
+            previous = getattr(_obs_run, "stats", None)
+            _obs_run.stats = {"calls": 0, "fullTokens": 0, "sentTokens": 0, "trimmed": 0, "summarized": 0}
+            with _obs_lock:
+                _obs_stats["runs"] += 1
+            try:
+                return super()._call(inputs, run_manager)
+            finally:
+                _obs_run.stats = previous
+
+        def _return(self, output, intermediate_steps, run_manager=None):
+            # Attached before on_agent_finish fires, so callbacks see it too
+            run = getattr(_obs_run, "stats", None)
+            if run and run["calls"]:
+                output.return_values["compaction"] = {
+                    **run, "savedTokens": run["fullTokens"] - run["sentTokens"]}
+            return super()._return(output, intermediate_steps, run_manager)
+
+    _compacting_executor_cls = CompactingAgentExecutor
+    return CompactingAgentExecutor
+
+
+_parallel_executor_cls = None
+
+
+def _parallel_executor_class():
+    """AgentExecutor whose multi-tool turns run their tools concurrently.
+
+    AgentExecutor yields every action of a turn before performing any of
+    them, then performs them one by one.  Once a turn has 2+ actions they are
+    all submitted to a thread pool; _perform_agent_action then just collects
+    each result, so steps and callbacks still arrive in the usual order.
+    """
+    global _parallel_executor_cls
+    if _parallel_executor_cls is not None:
+        return _parallel_executor_cls
+
+    from concurrent.futures import ThreadPoolExecutor
+    from langchain_core.agents import AgentAction
+    try:
+        from langchain.agents import AgentExecutor
+    except ImportError:
+        from langchain.agents.agent import AgentExecutor
+
+    submitted = threading.local()  # id(action) -> Future, for the current turn
+
+    class ParallelAgentExecutor(_compacting_executor_class()):
+        def _iter_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None):
+            actions = []
+            previous = getattr(submitted, "futures", {})
+            futures = submitted.futures = {}
+            pool = None
+            try:
+                for item in super()._iter_next_step(name_to_tool_map, color_mapping, inputs,
+                                                    intermediate_steps, run_manager):
+                    if isinstance(item, AgentAction):
+                        actions.append(item)
+                        if len(actions) > 1:
+                            pool = pool or ThreadPoolExecutor(max_workers=PARALLEL_TOOL_WORKERS)
+                            for action in actions:
+                                if id(action) not in futures:
+                                    futures[id(action)] = pool.submit(
+                                        AgentExecutor._perform_agent_action, self,
+                                        name_to_tool_map, color_mapping, action, run_manager)
+                    yield item
+            finally:
+                submitted.futures = previous
+                if pool is not None:
+                    pool.shutdown(wait=False)
+
+        def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None):
+            future = getattr(submitted, "futures", {}).get(id(agent_action))
+            if future is not None:
+                return future.result()
+            return super()._perform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+
+    _parallel_executor_cls = ParallelAgentExecutor
+    return ParallelAgentExecutor
+
+
+def _build_executor(tier: str, mode: str, tool_names: tuple = None, cascade: bool = False):
+    try:
+        from langchain.agents import create_react_agent, create_tool_calling_agent
+    except ImportError:
+        from langchain.agents.react.agent import create_react_agent
+        from langchain.agents.tool_calling_agent.base import create_tool_calling_agent
+
+    started = time.monotonic()
+    tools = get_tools()
+    # The prompt (or bound tool schemas) offers only the subset; the executor
+    # keeps every tool, so a name the model reaches for outside it still runs
+    offered = [t for t in tools if t.name in tool_names] if tool_names else tools
+    if mode == "tools":
+        agent = create_tool_calling_agent(get_llm(tier), offered, get_tool_calling_prompt())
+        executor_cls = _parallel_executor_class()
+    else:
+        agent = create_react_agent(get_llm(tier), offered, get_prompt())
+        executor_cls = _compacting_executor_class()
+    toolset = "subset" if tool_names else "full"
+    # A cascade's fast attempt gets a tight budget; the deep tier picks up where it stops
+    budget = ({"max_iterations": CASCADE_FAST_ITERATIONS, "max_execution_time": CASCADE_FAST_SECONDS}
+              if cascade else {"max_iterations": _TIERS[tier]["max_iterations"]})
+    executor = executor_cls(agent=agent, tools=tools, verbose=True, handle_parsing_errors=True,
+                            trim_intermediate_steps=compact_steps, **budget,
+                            tags=[f"tier:{tier}", f"mode:{mode}", f"toolset:{toolset}", f"tools:{len(offered)}"])
+    if not tool_names and not cascade:
+        _build_ms[f"{tier}/{mode}"] = round((time.monotonic() - started) * 1000)
+        print(f"[AGENT] {tier}/{mode} executor built in {_build_ms[f'{tier}/{mode}']}ms", flush=True)
+    return executor
+
+
+def get_executor(tier: str = "fast", mode: str = None, tool_names=None, cascade: bool = False):
+    """The AgentExecutor for a tier ("fast" or "deep"), built on first call.
+
+    mode overrides the tier's configured agent mode ("react" or "tools");
+    tool_names limits the tools described to the model (see select_tools);
+    cascade gives it the cascade's fast-attempt budget (see CascadeExecutor).
+    """
+    mode = mode or _TIERS[tier]["mode"]
+    if mode not in AGENT_MODES:
+        raise ValueError(f"Unknown agent mode {mode!r}; expected one of {AGENT_MODES}")
+    key = (tier, mode, tuple(sorted(tool_names)) if tool_names else None, cascade)
+    get_llm(tier)  # takes _build_lock itself
+    with _build_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = _executors[key] = _build_executor(tier, mode, key[2], cascade)
+            while len(_executors) > _EXECUTORS_MAX:
+                _executors.popitem(last=False)
+        _executors.move_to_end(key)
+    return executor
+
+
+def warm(tiers=("fast", "deep")) -> None:
+    """Build executors ahead of the first query (see wrapper.prewarm)."""
+    for tier in tiers:
+        get_executor(tier)
+
+
+def get_build_stats() -> dict:
+    """Which tiers are built and how long construction took."""
+    return {
+        "tools": _tools is not None,
+        "modes": {tier: cfg["mode"] for tier, cfg in _TIERS.items()},
+        "executors": dict(_build_ms),
+    }
+
+
+_LAZY_ATTRS = {
+    "tools": get_tools,
+    "prompt": get_prompt,
+    "llm_fast": lambda: get_llm("fast"),
+    "llm_deep": lambda: get_llm("deep"),
+    "executor_fast": lambda: get_executor("fast"),
+    "executor_deep": lambda: get_executor("deep"),
+    # Default executor (Haiku) for backwards compat
+    "executor": lambda: get_executor("fast"),
+}
 
-# Default executor (Haiku) for backwards compat
-executor = executor_fast
+
+def __getattr__(name):
+    # Old eager module attributes, now built on first access
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ── Query complexity classifier ───────────────────────────────────────────
@@ -869,40 +1364,322 @@ _DOMAIN_KEYWORDS = {
 }
 
 
-def classify_complexity(query):
-    """Return 'deep' for complex queries, 'fast' for simple ones."""
+def complexity_signal(query):
+    """(tier, signal): the tier classify_complexity picks and the rule that decided it.
+
+    signal is "pattern:<matched words>", "domains:<a>+<b>", "long" or "simple".
+    """
     # Explicit complex patterns
-    if _COMPLEX_PATTERNS.search(query):
-        return 'deep'
+    match = _COMPLEX_PATTERNS.search(query)
+    if match:
+        return 'deep', f"pattern:{' '.join(match.group(0).lower().split())[:30]}"
 
     # Multi-domain detection
-    domains_hit = sum(1 for p in _DOMAIN_KEYWORDS.values() if p.search(query))
-    if domains_hit >= 2:
-        return 'deep'
+    domains = [name for name, p in _DOMAIN_KEYWORDS.items() if p.search(query)]
+    if len(domains) >= 2:
+        return 'deep', f"domains:{'+'.join(domains)}"
 
     # Long queries with conjunctions often need multi-step reasoning
     if len(query) > 150 and re.search(r'(?i)\band\b.*\band\b|\bthen\b|\bafter\s+that\b', query):
-        return 'deep'
+        return 'deep', 'long'
 
-    return 'fast'
+    return 'fast', 'simple'
 
 
-def get_executor_for_query(query):
-    """Return the appropriate executor and tier name for a query."""
-    tier = classify_complexity(query)
+def classify_complexity(query):
+    """Return 'deep' for complex queries, 'fast' for simple ones."""
+    return complexity_signal(query)[0]
+
+
+# ── Per-query tool selection ──────────────────────────────────────────────
+# Describing all 29 tools costs thousands of prompt tokens on every ReAct
+# iteration.  select_tools() scores the tools against the query — BM25 over
+# each tool's name, description and extra keywords, plus a boost for tools
+# in the _DOMAIN_KEYWORDS domains the query touches — and offers the top
+# AGENT_TOOL_SUBSET_K plus a few always-on tools.  With no signal at all it
+# returns None and the full set is used.  The executor can still run any
+# tool, so a choice the model makes outside the subset doesn't fail.
+
+TOOL_SUBSET_K = int(os.getenv("AGENT_TOOL_SUBSET_K", "6"))  # 0 disables selection
+_ALWAYS_OFFERED = ("Search", "GetDateTime", "Calculator")
+_DOMAIN_BOOST = 2.0
+_BM25_K1, _BM25_B = 1.2, 0.75
+
+# Domain -> tools that serve it ("calendar" has no agent tool; dates come from GetDateTime)
+_DOMAIN_TOOLS = {
+    'finance':  ("PersonalFinance",),
+    'calendar': ("GetDateTime",),
+    'stocks':   ("StockPrice",),
+    'jobs':     ("Search", "WebScraper"),
+    'email':    ("SendEmail",),
+    'code':     ("PythonREPL", "Shell", "Git", "Docker", "SQLite", "Regex", "ReadFile", "WriteFile"),
+    'web':      ("Search", "WebScraper", "Wikipedia", "APIRequest"),
+}
+
+# Words users say that the descriptions don't
+_TOOL_KEYWORDS = {
+    "Search": "google news latest current who what find",
+    "Calculator": "math compute percent plus minus times divided sum total",
+    "GetDateTime": "today now day week month year clock",
+    "Wikipedia": "history biography who was encyclopedia",
+    "WebScraper": "link page site article read website",
+    "Weather": "forecast rain snow temperature sunny hot cold wind humid",
+    "PythonREPL": "script program run code compute",
+    "ReadFile": "open show contents file",
+    "WriteFile": "save create file",
+    "Shell": "terminal command bash ls directory",
+    "Summarize": "tldr summary shorten condense",
+    "Translate": "spanish french german italian chinese japanese language",
+    "Sentiment": "tone feeling mood positive negative",
+    "Rewrite": "rephrase reword polish edit style tone",
+    "StockPrice": "stock share ticker quote price market",
+    "CurrencyConvert": "usd eur gbp jpy exchange rate dollars euros pounds yen",
+    "ParseCSV": "csv spreadsheet rows columns",
+    "ParseJSON": "json",
+    "APIRequest": "endpoint http get post api rest",
+    "Todo": "todo task tasks checklist",
+    "Timer": "timer countdown wait seconds minutes",
+    "SendEmail": "email mail send message",
+    "Notes": "note notes jot remember save",
+    "Git": "git commit branch diff repo",
+    "Regex": "regex pattern match",
+    "SQLite": "sqlite sql database query table",
+    "Docker": "docker container image",
+    "FormatJSON": "json pretty format validate",
+    "PersonalFinance": "money spend spending budget account balance net worth transactions bills subscriptions",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"a", "an", "the", "of", "to", "in", "on", "for", "and", "or", "is", "it", "me", "my", "i",
+              "input", "e", "g", "eg", "get", "use", "using", "with", "from", "as", "can", "any", "be"}
+_tool_index = None  # (docs: {name: Counter}, avg_len, idf)
+
+
+def _terms(text: str) -> list:
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)  # GetDateTime -> Get Date Time
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _get_tool_index():
+    global _tool_index
+    if _tool_index is None:
+        from collections import Counter
+        import math
+        docs = {name: Counter(_terms(f"{name} {description} {_TOOL_KEYWORDS.get(name, '')}"))
+                for name, _, description in TOOL_SPECS}
+        df = Counter(term for doc in docs.values() for term in doc)
+        n = len(docs)
+        idf = {term: math.log(1 + (n - d + 0.5) / (d + 0.5)) for term, d in df.items()}
+        avg_len = sum(sum(doc.values()) for doc in docs.values()) / n
+        _tool_index = (docs, avg_len, idf)
+    return _tool_index
+
+
+def score_tools(query: str) -> dict:
+    """{tool name: relevance} for every tool with a non-zero score."""
+    docs, avg_len, idf = _get_tool_index()
+    terms = set(_terms(query))
+    scores = {}
+    for name, doc in docs.items():
+        length = sum(doc.values())
+        score = 0.0
+        for term in terms:
+            tf = doc.get(term, 0)
+            if tf:
+                score += idf[term] * tf * (_BM25_K1 + 1) / (tf + _BM25_K1 * (1 - _BM25_B + _BM25_B * length / avg_len))
+        if score:
+            scores[name] = score
+    for domain, pattern in _DOMAIN_KEYWORDS.items():
+        if pattern.search(query):
+            for name in _DOMAIN_TOOLS[domain]:
+                scores[name] = scores.get(name, 0.0) + _DOMAIN_BOOST
+    return scores
+
+
+def select_tools(query: str, k: int = None) -> list:
+    """Tool names to offer for this query, or None for the full set."""
+    k = TOOL_SUBSET_K if k is None else k
+    if k <= 0:
+        return None
+    scores = score_tools(query)
+    if not scores:
+        return None
+    ranked = sorted(scores, key=lambda name: -scores[name])[:k]
+    chosen = set(ranked) | set(_ALWAYS_OFFERED)
+    if len(chosen) >= len(TOOL_SPECS):
+        return None
+    # Registry order keeps the rendered prompt stable for a given subset
+    return [name for name, _, _ in TOOL_SPECS if name in chosen]
+
+
+# ── Fast → deep cascade ───────────────────────────────────────────────────
+# The regex classifier sends misjudged complex queries to a fast tier that
+# flounders for its full 15 iterations, and simple ones to the deep tier's
+# prices.  With AGENT_CASCADE set, get_executor_for_query() hands out a
+# CascadeExecutor instead: the fast tier runs first with a tight iteration
+# and time budget, and escalates to the deep tier when it
+#
+#   * fails to parse its own output       ("parse_error")
+#   * hits the iteration / time budget     ("budget")
+#   * finishes with an empty answer        ("empty")
+#
+# The deep run starts from the tool observations the fast run gathered, so
+# it doesn't repeat those calls.  Escalations are counted per classifier
+# signal (see complexity_signal), in get_cascade_stats().
+#
+#   AGENT_CASCADE=fast  cascade the queries classified fast; deep ones go straight to deep
+#   AGENT_CASCADE=all   cascade everything, to learn which "deep" signals the fast tier handles
+
+CASCADE = os.getenv("AGENT_CASCADE", "off")
+CASCADE_FAST_ITERATIONS = int(os.getenv("AGENT_CASCADE_FAST_ITERATIONS", "4"))
+CASCADE_FAST_SECONDS = float(os.getenv("AGENT_CASCADE_FAST_SECONDS", "25"))
+_CASCADE_CARRY_CHARS = 1500   # per carried observation
+
+_cascade_lock = threading.Lock()
+_cascade_stats: dict = {}     # signal -> {"runs", "escalated", "reasons": {reason: n}}
+
+try:
+    from backend.agent.callbacks import RunEscalated
+except ImportError:  # standalone copy outside the backend package
+    class RunEscalated(Exception):
+        def __init__(self, reason: str):
+            super().__init__(f"Escalating to the deep tier ({reason})")
+            self.reason = reason
+
+_cascade_monitor_cls = None
+
+
+def _cascade_monitor_class():
+    """Callback that records the fast run's steps and raises RunEscalated when it falters."""
+    global _cascade_monitor_cls
+    if _cascade_monitor_cls is not None:
+        return _cascade_monitor_cls
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class CascadeMonitor(BaseCallbackHandler):
+        raise_error = True
+
+        def __init__(self):
+            self.steps = []   # [tool, input, observation]
+            self._running = {}  # tool run_id -> step; parallel tools finish out of order
+
+        def on_agent_action(self, action, **kwargs):
+            if action.tool == "_Exception":
+                raise RunEscalated("parse_error")
+
+        def on_tool_start(self, serialized, input_str, *, run_id=None, **kwargs):
+            step = [(serialized or {}).get("name", ""), str(input_str), None]
+            self.steps.append(step)
+            self._running[run_id] = step
+
+        def on_tool_end(self, output, *, run_id=None, **kwargs):
+            step = self._running.pop(run_id, None)
+            if step is not None:
+                step[2] = str(output)
+
+        def on_agent_finish(self, finish, **kwargs):
+            output = str(finish.return_values.get("output", "")).strip()
+            if not output:
+                raise RunEscalated("empty")
+            if output.startswith("Agent stopped due to"):
+                raise RunEscalated("budget")
+
+    _cascade_monitor_cls = CascadeMonitor
+    return CascadeMonitor
+
+
+def _record_cascade(signal: str, reason=None) -> None:
+    with _cascade_lock:
+        counts = _cascade_stats.setdefault(signal, {"runs": 0, "escalated": 0, "reasons": {}})
+        counts["runs"] += 1
+        if reason:
+            counts["escalated"] += 1
+            counts["reasons"][reason] = counts["reasons"].get(reason, 0) + 1
+
+
+class CascadeExecutor:
+    """Executor-shaped wrapper: fast tier on a tight budget, deep tier if it falters."""
+
+    def __init__(self, fast, deep, signal: str):
+        self.fast = fast
+        self.deep = deep
+        self.signal = signal
+        self.tags = ["tier:cascade" if t.startswith("tier:") else t for t in (fast.tags or [])]
+        self.handle_parsing_errors = True  # the fast attempt escalates on parse errors instead
+
+    def invoke(self, inputs: dict, config: dict = None):
+        config = dict(config or {})
+        callbacks = list(config.get("callbacks") or [])
+        monitor = _cascade_monitor_class()()
+        try:
+            # The monitor goes first so it raises before handlers see the failed finish
+            result = self.fast.invoke(inputs, config={**config, "callbacks": [monitor, *callbacks]})
+            _record_cascade(self.signal)
+            return result
+        except RunEscalated as e:
+            reason = e.reason
+        _record_cascade(self.signal, reason)
+        logger.info("cascade escalating to deep (%s, signal %s, %d tool results carried)",
+                    reason, self.signal, len(monitor.steps))
+
+        # Streaming handlers drop the fast tier's partial answer and switch answer detection
+        deep_mode = next((t[5:] for t in self.deep.tags or [] if t.startswith("mode:")), "react")
+        for handler in callbacks:
+            if hasattr(handler, "restart"):
+                handler.restart(deep_mode, reason)
+        gathered = [f"- {tool}({tool_input[:200]}): {observation[:_CASCADE_CARRY_CHARS]}"
+                    for tool, tool_input, observation in monitor.steps if observation is not None]
+        if gathered:
+            inputs = {**inputs, "input": (
+                "Tool results already gathered for this question (use them instead of calling "
+                "those tools again):\n" + "\n".join(gathered) + "\n\n" + inputs["input"])}
+        return self.deep.invoke(inputs, config=config)
+
+
+def get_cascade_stats() -> dict:
+    """Cascade runs and escalation rate per classifier signal."""
+    with _cascade_lock:
+        by_signal = {s: {**c, "reasons": dict(c["reasons"])} for s, c in _cascade_stats.items()}
+    runs = sum(c["runs"] for c in by_signal.values())
+    escalated = sum(c["escalated"] for c in by_signal.values())
+    for counts in by_signal.values():
+        counts["rate"] = round(counts["escalated"] / counts["runs"], 3)
+    return {
+        "mode": CASCADE,
+        "fastIterations": CASCADE_FAST_ITERATIONS,
+        "fastSeconds": CASCADE_FAST_SECONDS,
+        "runs": runs,
+        "escalated": escalated,
+        "rate": round(escalated / runs, 3) if runs else None,
+        "bySignal": dict(sorted(by_signal.items(), key=lambda kv: -kv[1]["runs"])),
+    }
+
+
+def get_executor_for_query(query, mode=None):
+    """Return the appropriate executor and tier name for a query.
+
+    mode ("react" / "tools") overrides the tier's configured agent mode.
+    The executor describes only the tools select_tools() picks for the query.
+    With AGENT_CASCADE on, the executor is a CascadeExecutor and the tier "cascade".
+    """
+    tier, signal = complexity_signal(query)
+    tool_names = select_tools(query)
+    if CASCADE == "all" or (CASCADE == "fast" and tier == 'fast'):
+        fast = get_executor('fast', mode, tool_names, cascade=True)
+        return CascadeExecutor(fast, get_executor('deep', mode, tool_names), signal), 'cascade'
     if tier == 'deep':
-        return executor_deep, 'sonnet'
-    return executor_fast, 'haiku'
+        return get_executor('deep', mode, tool_names), 'sonnet'
+    return get_executor('fast', mode, tool_names), 'haiku'
 
 # Interactive loop
 if __name__ == "__main__":
     print("LangChain Agent Ready!")
-    print(f"Tools ({len(tools)}): {', '.join(t.name for t in tools)}")
+    print(f"Tools ({len(TOOL_SPECS)}): {', '.join(name for name, _, _ in TOOL_SPECS)}")
     print("Type 'quit' to exit.\n")
     while True:
         user_input = input("You: ")
         if user_input.lower() in ("quit", "exit", "q"):
             print("Goodbye!")
             break
-        response = executor.invoke({"input": user_input})
+        response = get_executor().invoke({"input": user_input})
         print(f"\nAgent: {response['output']}\n")
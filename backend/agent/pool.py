@@ -0,0 +1,186 @@
+"""Shared agent execution pool — admission control for LangChain agent runs.
+
+chat:send, travel:insights and REST /api/chat all submit their
+executor.invoke call here instead of starting a thread each.  At most
+MAX_CONCURRENT runs execute at once and at most PER_CLIENT of them belong to
+the same client (socket sid, or the REST caller's login token or address);
+the rest wait in a FIFO queue of at most MAX_QUEUE jobs.  A client-held slot
+is skipped over, so one user's burst never blocks other users.  Waiting jobs are told their queue position
+whenever it changes, and submit() raises PoolFull when the queue is full.
+
+cancel() and cancel_client() drop waiting jobs outright and signal running
+ones through the CancelToken they were submitted with; the run itself stops
+at its next callback (see agent/callbacks.py).
+
+Runs use plain threads, which are greenlets under gevent's monkey patching.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+MAX_CONCURRENT = int(os.getenv("AGENT_MAX_CONCURRENT", "4"))
+MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", "16"))
+PER_CLIENT = int(os.getenv("AGENT_PER_CLIENT", "1"))
+MAX_WAIT = float(os.getenv("AGENT_MAX_WAIT", "300"))  # seconds a streamed run may wait for a slot
+WAIT_WINDOW = 500   # recent queue waits kept for percentiles
+
+
+class PoolFull(Exception):
+    """The wait queue is full; the caller should ask the user to retry."""
+
+
+# ── Singleton state ───────────────────────────────────────────────────────────
+
+_lock = threading.Lock()
+_waiting: deque = deque()      # job dicts, FIFO
+_active: list = []             # job dicts currently running
+_running: Counter = Counter()  # client -> running jobs
+_waits: deque = deque(maxlen=WAIT_WINDOW)  # seconds spent queued, per started job
+_stats = Counter()
+
+
+def _dispatch() -> list:
+    """Start every job that fits (call with _lock held); returns position updates to send."""
+    started = []
+    for job in list(_waiting):
+        if sum(_running.values()) >= MAX_CONCURRENT:
+            break
+        if _running[job["client"]] >= PER_CLIENT:
+            continue
+        _waiting.remove(job)
+        _active.append(job)
+        _running[job["client"]] += 1
+        _waits.append(time.monotonic() - job["enqueued"])
+        started.append(job)
+    for job in started:
+        threading.Thread(target=_run, args=(job,), daemon=True, name=f"agent-{job['label']}").start()
+
+    updates = []
+    for position, job in enumerate(_waiting, 1):
+        if job["position"] != position and job["on_position"] is not None:
+            job["position"] = position
+            updates.append((job["on_position"], position))
+    return updates
+
+
+def _notify(updates: list) -> None:
+    for on_position, position in updates:
+        try:
+            on_position(position)
+        except Exception:
+            pass
+
+
+def _run(job: dict) -> None:
+    future = job["future"]
+    started = time.monotonic()
+    try:
+        if future.set_running_or_notify_cancel():
+            future.set_result(job["fn"]())
+    except BaseException as e:
+        future.set_exception(e)
+    finally:
+        with _lock:
+            _active.remove(job)
+            _running[job["client"]] -= 1
+            if _running[job["client"]] <= 0:
+                del _running[job["client"]]
+            if future.cancelled():
+                _stats["cancelled"] += 1
+            else:
+                _stats["completed" if future.exception() is None else "failed"] += 1
+            _stats["runSeconds"] += time.monotonic() - started
+            updates = _dispatch()
+        _notify(updates)
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+def submit(fn, client: str = "", label: str = "agent", on_position=None, token=None) -> Future:
+    """Queue fn() for execution; returns a Future for its result.
+
+    on_position(n) is called with the job's 1-based queue position each time
+    it changes while waiting (not called if the job starts immediately).
+    token is the run's CancelToken, used by cancel() once the job is running.
+    Raises PoolFull if MAX_QUEUE jobs are already waiting.
+    """
+    job = {"fn": fn, "client": client, "label": label, "on_position": on_position, "token": token,
+           "future": Future(), "enqueued": time.monotonic(), "position": None}
+    with _lock:
+        if len(_waiting) >= MAX_QUEUE:
+            _stats["rejected"] += 1
+            raise PoolFull(f"The assistant is busy ({len(_waiting)} requests waiting) — please try again shortly")
+        _waiting.append(job)
+        _stats["submitted"] += 1
+        _stats[f"submitted:{label}"] += 1
+        _stats["maxQueueDepth"] = max(_stats["maxQueueDepth"], len(_waiting))
+        updates = _dispatch()
+    _notify(updates)
+    return job["future"]
+
+
+def _cancel_jobs(jobs: list, reason: str) -> int:
+    """Cancel the given jobs (call with _lock held); returns how many were found."""
+    for job in jobs:
+        if job["token"] is not None:
+            job["token"].cancel(reason)
+        if job in _waiting:
+            _waiting.remove(job)
+            job["future"].cancel()
+            _stats["cancelled"] += 1
+        else:
+            _stats["cancelRequested"] += 1
+        _stats[f"cancel:{reason}"] += 1
+    return len(jobs)
+
+
+def cancel(future: Future, reason: str = "cancelled") -> bool:
+    """Cancel the job behind a submit() future; False if it already finished."""
+    with _lock:
+        found = _cancel_jobs([j for j in (*_waiting, *_active) if j["future"] is future], reason)
+        updates = _dispatch()
+    _notify(updates)
+    return bool(found)
+
+
+def cancel_client(client: str, reason: str = "cancelled", label: str | None = None) -> int:
+    """Cancel every waiting and running job of a client (optionally one label); returns the count."""
+    with _lock:
+        jobs = [j for j in (*_waiting, *_active)
+                if j["client"] == client and (label is None or j["label"] == label)]
+        found = _cancel_jobs(jobs, reason)
+        updates = _dispatch()
+    _notify(updates)
+    return found
+
+
+def get_stats() -> dict:
+    """Limits, current running/queued counts and queue-wait percentiles."""
+    with _lock:
+        waits = sorted(_waits)
+        counts = dict(_stats)
+        running = sum(_running.values())
+        queued = len(_waiting)
+    finished = counts.get("completed", 0) + counts.get("failed", 0)
+
+    def pct(p: float):
+        return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000) if waits else None
+
+    return {
+        "maxConcurrent": MAX_CONCURRENT,
+        "maxQueue": MAX_QUEUE,
+        "perClient": PER_CLIENT,
+        "running": running,
+        "queued": queued,
+        **{k: v for k, v in counts.items() if k != "runSeconds"},
+        "waitP50Ms": pct(0.5),
+        "waitP95Ms": pct(0.95),
+        "waitMaxMs": round(waits[-1] * 1000) if waits else None,
+        "meanRunMs": round(counts.get("runSeconds", 0) / finished * 1000) if finished else None,
+    }
@@ -5,6 +5,8 @@ Locally, imports from LANGCHAIN_AGENT_PATH.
 """
 import sys
 import os
+import threading
+from collections import deque
 from pathlib import Path
 
 # Try bundled agent first, then external path
@@ -18,72 +20,238 @@ if agent_path and os.path.isdir(agent_path):
     if agent_path not in sys.path:
         sys.path.insert(0, agent_path)
 
-import langchain_agent  # noqa: E402
+import langchain_agent  # noqa: E402 — cheap: tools and executors are built on first use
 
-_executor = langchain_agent.executor
-_tools = langchain_agent.tools
 
+def get_executor(tier="fast", mode=None, tool_names=None):
+    # An external LANGCHAIN_AGENT_PATH copy may predate the lazy getters
+    if hasattr(langchain_agent, "get_executor"):
+        return langchain_agent.get_executor(tier, mode, tool_names)
+    return langchain_agent.executor_deep if tier == "deep" else langchain_agent.executor
 
-def get_executor():
-    return _executor
 
+def get_executor_for_query(query, mode=None):
+    """Return (executor, tier_name) based on query complexity.
 
-def get_executor_for_query(query):
-    """Return (executor, tier_name) based on query complexity."""
-    return langchain_agent.get_executor_for_query(query)
+    mode ("react" / "tools") overrides the tier's configured agent mode.
+    """
+    if mode is None:
+        return langchain_agent.get_executor_for_query(query)
+    return langchain_agent.get_executor_for_query(query, mode)
+
+
+def select_tools(query):
+    """Tool names to offer for a query, or None for the full set."""
+    if hasattr(langchain_agent, "select_tools"):
+        return langchain_agent.select_tools(query)
+    return None
+
+
+def executor_info(executor):
+    """{"tier", "mode", "toolset", "tools"} from an executor's tags (empty if untagged)."""
+    info = {}
+    for tag in getattr(executor, "tags", None) or []:
+        key, _, value = tag.partition(":")
+        info[key] = int(value) if key == "tools" and value.isdigit() else value
+    return info
+
+
+def run_succeeded(output):
+    """False for empty answers and AgentExecutor's iteration/time-limit stop message."""
+    return bool(output and output.strip()) and not output.startswith("Agent stopped due to")
 
 
 def get_tools():
-    return _tools
+    if hasattr(langchain_agent, "get_tools"):
+        return langchain_agent.get_tools()
+    return langchain_agent.tools
 
 
 def get_tool_map():
-    return {t.name: t for t in _tools}
+    return {t.name: t for t in get_tools()}
+
+
+REST_TIMEOUT = 120  # seconds a /api/chat run may take once it has a pool slot, as chat:send
+
+
+class AgentTimeout(Exception):
+    """run_query() gave up on a run: it waited too long for a slot or ran past REST_TIMEOUT."""
+
+
+TTFT_WINDOW = 200  # recent samples kept per tier
+
+_ttft_lock = threading.Lock()
+_ttft = {}  # tier -> deque of time-to-first-answer-token, ms
+
+
+def record_ttft(tier, ms):
+    """Record how long a streamed agent run took to emit its first answer token."""
+    with _ttft_lock:
+        _ttft.setdefault(tier, deque(maxlen=TTFT_WINDOW)).append(ms)
+
+
+def get_ttft_stats():
+    """Per-tier sample count and p50/p95/last time-to-first-token over the recent window."""
+    with _ttft_lock:
+        samples = {tier: sorted(values) for tier, values in _ttft.items()}
+        last = {tier: values[-1] for tier, values in _ttft.items() if values}
+    return {
+        tier: {
+            "samples": len(values),
+            "p50Ms": values[len(values) // 2],
+            "p95Ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "lastMs": last[tier],
+        }
+        for tier, values in samples.items() if values
+    }
+
 
+def get_agent_stats():
+    """Executor build times, tool result cache, observation compaction, cascade escalations and per-tier TTFT."""
+    stats = {}
+    if hasattr(langchain_agent, "get_build_stats"):
+        stats["build"] = langchain_agent.get_build_stats()
+    if hasattr(langchain_agent, "get_tool_cache_stats"):
+        stats["toolCache"] = langchain_agent.get_tool_cache_stats()
+    if hasattr(langchain_agent, "get_compaction_stats"):
+        stats["compaction"] = langchain_agent.get_compaction_stats()
+    if hasattr(langchain_agent, "get_cascade_stats"):
+        stats["cascade"] = langchain_agent.get_cascade_stats()
+    stats["ttft"] = get_ttft_stats()
+    return stats
 
-def run_query(user_input: str, session_id: str = '') -> dict:
-    """Run a query through the agent and return the result dict."""
+
+def prewarm(tiers=("fast", "deep")):
+    """Build the agent executors in a background thread so the first chat
+    query doesn't pay for LangChain imports and client construction."""
+    def _warm():
+        try:
+            if hasattr(langchain_agent, "warm"):
+                langchain_agent.warm(tiers)
+            else:
+                get_executor()
+        except Exception as e:
+            print(f"[AGENT] prewarm failed: {e}", flush=True)
+
+    threading.Thread(target=_warm, daemon=True).start()
+
+
+def run_query(user_input: str, session_id: str = '', client: str = '') -> dict:
+    """Run a query through the agent and return the result dict.
+
+    With a chat session_id the agent also sees that session's summary and
+    recent turns (see session_memory), and a follow-up's tools are chosen
+    with the previous user message.  Repeated questions that stand on their
+    own are answered from the answer cache; those results carry
+    "cached": True and the original run's "toolCalls".  Agent runs go through
+    the shared pool as `client`; raises pool.PoolFull when its queue is full
+    and AgentTimeout (after cancelling the run) when it waits longer than
+    pool.MAX_WAIT for a slot or runs longer than REST_TIMEOUT.
+    """
+    from concurrent.futures import TimeoutError as FutureTimeout
     from langchain.callbacks.base import BaseCallbackHandler
+    from backend import answer_cache, session_memory
+    from backend.agent import pool
+    from backend.agent.callbacks import CancellationHandler, CancelToken, RunCancelled, llm_cached_tokens, llm_usage
+
+    memory, previous = session_memory.context_for(session_id, user_input) if session_id else ("", "")
+    standalone = not memory or not session_memory.is_follow_up(user_input)
+    routing_query = user_input if standalone or not previous else f"{previous}\n{user_input}"
+    executor = get_executor(tool_names=select_tools(routing_query))
+    info = executor_info(executor)
+    cache_tier = info.get("tier", "fast")
+    hit = answer_cache.lookup(user_input, cache_tier) if standalone else None
+    if hit:
+        return {"input": user_input, "output": hit["response"], "toolCalls": hit["toolCalls"], "cached": True}
 
     class TokenLogger(BaseCallbackHandler):
         def __init__(self):
             self.prompt_tokens = 0
             self.completion_tokens = 0
+            self.cached_tokens = 0
             self.model = ""
+            self.tool_calls = []
+            self._calls = {}   # tool run_id -> entry; parallel tools finish out of order
+            self._streamed = 0  # tokens streamed by the current, unfinished LLM call
+
+        def on_llm_new_token(self, token, **kwargs):
+            self._streamed += 1
+
+        def on_tool_start(self, serialized, input_str, *, run_id=None, **kwargs):
+            call = {"tool": (serialized or {}).get("name", ""), "input": str(input_str)}
+            self.tool_calls.append(call)
+            self._calls[run_id] = call
+
+        def on_tool_end(self, output, *, run_id=None, **kwargs):
+            call = self._calls.pop(run_id, None)
+            if call is not None:
+                call["output"] = str(output)[:2000]
 
         def on_llm_end(self, response, **kwargs):
+            self._streamed = 0
             try:
-                usage = response.llm_output.get('token_usage', {}) if response.llm_output else {}
-                self.prompt_tokens += usage.get('prompt_tokens', 0)
-                self.completion_tokens += usage.get('completion_tokens', 0)
-                if not self.model and response.llm_output:
-                    self.model = response.llm_output.get('model_name', '')
+                prompt, completion, model = llm_usage(response)
+                self.prompt_tokens += prompt
+                self.completion_tokens += completion
+                self.cached_tokens += llm_cached_tokens(response)
+                self.model = self.model or model
             except Exception:
                 pass
 
-    token_logger = TokenLogger()
-    result = _executor.invoke({"input": user_input}, config={"callbacks": [token_logger]})
+    def log_tokens(success, cancelled=None):
+        # Token usage for cost tracking, including what cancelled runs spent
+        # (a call cut off mid-stream never reports usage; count its chunks)
+        try:
+            import requests as _req
 
-    # Log to DB asynchronously
-    try:
-        import threading
-        import requests as _req
+            def _log():
+                try:
+                    _req.post('http://localhost:5001/api/token-usage/log', json={
+                        'source': 'langly',
+                        'model': token_logger.model or 'gpt-4o',
+                        'prompt_tokens': token_logger.prompt_tokens,
+                        'completion_tokens': token_logger.completion_tokens + token_logger._streamed,
+                        'cached_tokens': token_logger.cached_tokens,
+                        'session_id': session_id,
+                        'context': user_input[:120],
+                        'tool_selection': info.get('toolset', ''),
+                        'tools_offered': info.get('tools'),
+                        'success': success,
+                        'cancel_reason': cancelled,
+                    }, timeout=3)
+                except Exception:
+                    pass
 
-        def _log():
-            try:
-                _req.post('http://localhost:5001/api/token-usage/log', json={
-                    'source': 'langly',
-                    'model': token_logger.model or 'gpt-4o',
-                    'prompt_tokens': token_logger.prompt_tokens,
-                    'completion_tokens': token_logger.completion_tokens,
-                    'session_id': session_id,
-                    'context': user_input[:120],
-                }, timeout=3)
-            except Exception:
-                pass
+            threading.Thread(target=_log, daemon=True).start()
+        except Exception:
+            pass
+
+    token_logger = TokenLogger()
+    cancel_token = CancelToken()
+    started = threading.Event()
 
-        threading.Thread(target=_log, daemon=True).start()
-    except Exception:
-        pass
+    def run():
+        started.set()
+        return executor.invoke({"input": memory + user_input},
+                               config={"callbacks": [token_logger, CancellationHandler(cancel_token)]})
 
+    future = pool.submit(run, client=client, label="rest", token=cancel_token)
+    future.add_done_callback(lambda f: started.set())  # a job cancelled while queued never runs
+    try:
+        if not started.wait(pool.MAX_WAIT):
+            pool.cancel(future, "queue_timeout")
+            raise AgentTimeout("The assistant is busy — please try again shortly")
+        result = future.result(timeout=REST_TIMEOUT)
+    except FutureTimeout:
+        # Stop the run too, or it keeps its slot and keeps paying for tokens
+        pool.cancel(future, "timeout")
+        log_tokens(False, cancelled="timeout")
+        raise AgentTimeout(f"Agent timed out after {REST_TIMEOUT} seconds")
+    except RunCancelled as e:
+        log_tokens(False, cancelled=e.reason)
+        raise
+    output = result.get("output", "") if isinstance(result, dict) else str(result)
+    answer_cache.store(user_input, cache_tier, output, token_logger.tool_calls,
+                       ok=run_succeeded(output) and standalone)
+    log_tokens(run_succeeded(output))
     return result
@@ -0,0 +1,182 @@
+"""Answer cache for full agent runs — replays repeated questions instantly.
+
+Keyed by the normalized query plus the agent tier.  Each entry records the
+data domains its answer depends on: those of the tools the run used, plus
+the domains the question itself mentions (calendar questions, for example,
+have no agent tool).  Writes to a domain — a todo insert, a Kindora event
+create, an agent run that used the Todo tool — call invalidate() and drop
+every entry that depends on it.
+
+Entries live for the shortest TTL among their domains, never longer than
+MAX_TTL.  Answers that depended on the clock or on a side-effecting tool,
+and runs that failed, are not stored.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+MAX_ENTRIES = 256
+DEFAULT_TTL = 600   # no tools, no domain: general-knowledge answers
+MAX_TTL = 1800
+
+DOMAIN_TTLS = {
+    "stocks": 60,
+    "weather": 600,
+    "finance": 900,
+    "calendar": 300,
+    "todos": 300,
+    "notes": 300,
+    "web": 1800,
+    "currency": 1800,
+}
+
+# Agent tool -> the domain its output depends on
+TOOL_DOMAINS = {
+    "PersonalFinance": "finance",
+    "StockPrice": "stocks",
+    "Weather": "weather",
+    "Todo": "todos",
+    "Notes": "notes",
+    "Search": "web",
+    "WebScraper": "web",
+    "Wikipedia": "web",
+    "CurrencyConvert": "currency",
+}
+
+# Tools whose use makes an answer uncacheable (clock-dependent or side effects).
+# Todo and Notes writes are handled by invalidating their domain instead.
+NO_CACHE_TOOLS = {
+    "GetDateTime", "Timer", "Shell", "WriteFile", "SendEmail", "Git", "Docker",
+    "PythonREPL", "APIRequest", "SQLite", "ReadFile",
+}
+
+# Todo / Notes commands that change state; "list" and "read" don't
+_WRITE_INPUT_RE = re.compile(r"^[\s\"'`]*(?:add|done|remove|save|delete)\b", re.IGNORECASE)
+
+# Domains a question depends on even when no tool reports them
+_QUERY_DOMAINS = {
+    "calendar": re.compile(r"(?i)calendar|event|schedule|appointment|meeting|agenda|kindora"),
+    "todos": re.compile(r"(?i)\btodos?\b|to-?do|\btasks?\b"),
+    "notes": re.compile(r"(?i)\bnotes?\b|notebook"),
+    "finance": re.compile(r"(?i)budget|spend|money|account|balance|net\s*worth|income|expense|savings|cash\s*flow"),
+    "stocks": re.compile(r"(?i)stock|portfolio|ticker|market"),
+    "weather": re.compile(r"(?i)weather|forecast|temperature|rain|snow"),
+}
+
+_PUNCT_RE = re.compile(r"[^\w\s$%.-]")
+_SPACE_RE = re.compile(r"\s+")
+
+# ── Singleton state ───────────────────────────────────────────────────────────
+
+_lock = threading.Lock()
+_entries: OrderedDict = OrderedDict()  # (tier, normalized query) -> entry dict
+_stats = Counter()
+
+
+def normalize(query: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a question."""
+    text = _PUNCT_RE.sub(" ", query.lower().replace("'", "").replace("’", ""))
+    return _SPACE_RE.sub(" ", text).strip(" .-")
+
+
+def _domains(query: str, tools: list) -> set:
+    domains = {TOOL_DOMAINS[t] for t in tools if t in TOOL_DOMAINS}
+    domains.update(name for name, pattern in _QUERY_DOMAINS.items() if pattern.search(query))
+    return domains
+
+
+def _written_domains(tool_calls: list) -> set:
+    return {TOOL_DOMAINS[tc["tool"]] for tc in tool_calls
+            if tc.get("tool") in ("Todo", "Notes") and _WRITE_INPUT_RE.match(str(tc.get("input", "")))}
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+def lookup(query: str, tier: str) -> dict | None:
+    """Cached {"response", "toolCalls", "cached": True, "ageSeconds"} or None."""
+    key = (tier, normalize(query))
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None or entry["expires"] <= now:
+            if entry is not None:
+                del _entries[key]
+                _stats["expired"] += 1
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats["hits"] += 1
+        return {"response": entry["response"], "toolCalls": entry["toolCalls"], "cached": True,
+                "ageSeconds": round(now - entry["stored"])}
+
+
+def store(query: str, tier: str, response: str, tool_calls: list, ok: bool = True) -> bool:
+    """Record a finished agent run; returns True if the answer was cached.
+
+    Invalidates the domains of any write the run itself made (Todo add,
+    Notes save, ...) whether or not the answer is kept.
+    """
+    written = _written_domains(tool_calls)
+    if written:
+        invalidate(*written)
+    tools = [tc.get("tool", "") for tc in tool_calls]
+    if not ok or not response or written or NO_CACHE_TOOLS.intersection(tools):
+        with _lock:
+            _stats["skipped"] += 1
+        return False
+
+    domains = _domains(query, tools)
+    ttl = min([DOMAIN_TTLS.get(d, DEFAULT_TTL) for d in domains] or [DEFAULT_TTL])
+    key = (tier, normalize(query))
+    now = time.monotonic()
+    with _lock:
+        _entries[key] = {
+            "response": response,
+            "toolCalls": tool_calls,
+            "domains": domains,
+            "stored": now,
+            "expires": now + min(ttl, MAX_TTL),
+        }
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _stats["evicted"] += 1
+        _stats["stored"] += 1
+    return True
+
+
+def invalidate(*domains: str) -> int:
+    """Drop every entry that depends on any of the domains; returns how many."""
+    wanted = set(domains)
+    with _lock:
+        stale = [key for key, entry in _entries.items() if entry["domains"] & wanted]
+        for key in stale:
+            del _entries[key]
+        _stats["invalidated"] += len(stale)
+    return len(stale)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def get_stats() -> dict:
+    """Entry count, per-domain entry counts and hit/miss/invalidation counters."""
+    with _lock:
+        counts = dict(_stats)
+        by_domain = Counter(d for entry in _entries.values() for d in entry["domains"])
+        size = len(_entries)
+    hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+    return {
+        "entries": size,
+        "maxEntries": MAX_ENTRIES,
+        **counts,
+        "hitRate": round(hits / (hits + misses), 3) if hits + misses else None,
+        "byDomain": dict(by_domain),
+    }
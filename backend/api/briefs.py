@@ -75,46 +75,24 @@ def _fetch_drudge() -> dict:
 
 
 def _fetch_markets() -> dict:
-    """Fetch stock watchlist + major indices via yfinance."""
+    """Fetch stock watchlist + major indices from the shared quote service."""
     tickers = STOCKS + ["^GSPC", "^DJI", "^IXIC"]
     items = []
 
     try:
-        import yfinance as yf
+        from backend.services.quote_service import get_quotes
 
-        data = yf.download(tickers, period="2d", group_by="ticker", progress=False, threads=True)
-
-        for ticker in tickers:
-            try:
-                if len(tickers) == 1:
-                    df = data
-                else:
-                    df = data[ticker]
-                if df.empty or len(df) < 1:
-                    continue
-                close = float(df["Close"].iloc[-1])
-                prev = float(df["Close"].iloc[-2]) if len(df) > 1 else close
-                change = close - prev
-                change_pct = (change / prev * 100) if prev else 0
-
-                # Friendly name for indices
-                display = ticker
-                if ticker == "^GSPC":
-                    display = "S&P 500"
-                elif ticker == "^DJI":
-                    display = "Dow"
-                elif ticker == "^IXIC":
-                    display = "Nasdaq"
-
-                items.append({
-                    "ticker": ticker,
-                    "price": round(close, 2),
-                    "change": round(change, 2),
-                    "changePct": round(change_pct, 2),
-                    "display": display,
-                })
-            except Exception:
+        for ticker, q in get_quotes(tickers).items():
+            if "error" in q:
                 continue
+            items.append({
+                "ticker": ticker,
+                "price": q["price"],
+                "change": q["change"],
+                "changePct": q["changePercent"],
+                # Friendly name for indices
+                "display": q["name"] if ticker.startswith("^") else ticker,
+            })
 
         return {"id": "markets", "title": "Markets", "icon": "trending-up", "items": items}
     except Exception as e:
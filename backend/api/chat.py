@@ -1,5 +1,6 @@
 """Chat REST API — session management and message persistence."""
 from __future__ import annotations
+import hashlib
 import json
 from flask import Blueprint, request, jsonify
 from backend.db import query, execute, execute_returning
@@ -7,10 +8,19 @@ from backend.db import query, execute, execute_returning
 chat_bp = Blueprint("chat", __name__)
 
 
+def _pool_client() -> str:
+    """Agent-pool identity of the caller: its login token (hashed), else its address."""
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        return "auth:" + hashlib.sha256(auth_header[7:].encode()).hexdigest()[:16]
+    return request.remote_addr or ""
+
+
 @chat_bp.route("/api/chat", methods=["POST"])
 def chat():
     """Non-streaming chat fallback via REST."""
-    from backend.agent.wrapper import run_query
+    from backend.agent.pool import PoolFull
+    from backend.agent.wrapper import AgentTimeout, run_query
 
     data = request.get_json()
     user_input = data.get("message", "")
@@ -18,8 +28,15 @@ def chat():
         return jsonify({"error": "No message provided"}), 400
 
     try:
-        result = run_query(user_input)
+        result = run_query(user_input, session_id=str(data.get("sessionId") or ""),
+                           client=_pool_client())
+        if result.get("cached"):
+            return jsonify({"response": result["output"], "toolCalls": result["toolCalls"], "cached": True})
         return jsonify({"response": result.get("output", "")})
+    except PoolFull as e:
+        return jsonify({"error": str(e)}), 503
+    except AgentTimeout as e:
+        return jsonify({"error": str(e)}), 504
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -99,6 +116,10 @@ def save_message(session_id):
         else:
             execute("UPDATE chat_sessions SET updated_at = NOW() WHERE id = %s", (session_id,))
 
+    # Fold messages that just left the agent's recent-turns window into the session summary
+    from backend import session_memory
+    session_memory.note_message(session_id)
+
     result = {"id": row["id"] if row else None}
     if row and row.get("created_at"):
         result["created_at"] = row["created_at"].isoformat()
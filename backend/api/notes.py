@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import re
 from flask import Blueprint, request, jsonify
+from backend import answer_cache
 from backend.db import query, execute, execute_returning, log_activity
 
 notes_bp = Blueprint("notes", __name__)
@@ -73,6 +74,7 @@ def create_note():
     _sync_mentions(note["id"], content)
     _note_with_mentions(note)
     log_activity("notes", "created", f"Created note: {title}")
+    answer_cache.invalidate("notes")
     return jsonify(note), 201
 
 
@@ -113,6 +115,7 @@ def update_note(note_id):
     )
     _sync_mentions(note_id, note["content"])
     _note_with_mentions(note)
+    answer_cache.invalidate("notes")
     return jsonify(note)
 
 
@@ -124,4 +127,5 @@ def delete_note(note_id):
 
     execute("DELETE FROM notes WHERE id = %s", (note_id,))
     log_activity("notes", "deleted", f"Deleted note: {existing[0]['title']}")
+    answer_cache.invalidate("notes")
     return jsonify({"deleted": note_id})
@@ -1,38 +1,31 @@
-"""Stock data endpoints — calls yfinance directly for structured JSON."""
-from concurrent.futures import ThreadPoolExecutor
+"""Stock data endpoints — batched quotes from the shared quote service."""
 from flask import Blueprint, request, jsonify
-import yfinance as yf
+
+from backend.services.quote_service import get_quote, get_quotes
 
 stocks_bp = Blueprint("stocks", __name__)
 
 
 def _get_stock_data(ticker: str) -> dict:
     """Fetch stock data for a single ticker."""
-    try:
-        stock = yf.Ticker(ticker.upper())
-        info = stock.info
-        hist = stock.history(period="5d", interval="1h")
-
-        price = info.get("currentPrice") or info.get("regularMarketPrice", 0)
-        prev_close = info.get("previousClose") or info.get("regularMarketPreviousClose", 0)
-        change = price - prev_close if price and prev_close else 0
-        change_pct = (change / prev_close * 100) if prev_close else 0
-
-        sparkline = hist["Close"].dropna().tolist()[-24:] if not hist.empty else []
-
-        return {
-            "ticker": ticker.upper(),
-            "name": info.get("shortName", ticker.upper()),
-            "price": round(price, 2) if price else None,
-            "change": round(change, 2),
-            "changePercent": round(change_pct, 2),
-            "previousClose": round(prev_close, 2) if prev_close else None,
-            "marketCap": info.get("marketCap"),
-            "volume": info.get("volume"),
-            "sparkline": [round(v, 2) for v in sparkline],
-        }
-    except Exception as e:
-        return {"ticker": ticker.upper(), "error": str(e)}
+    return _to_response(get_quote(ticker))
+
+
+def _to_response(quote: dict) -> dict:
+    """Shape a quote for the StockWidget."""
+    if "error" in quote:
+        return {"ticker": quote["ticker"], "error": quote["error"]}
+    return {
+        "ticker": quote["ticker"],
+        "name": quote["name"],
+        "price": quote["price"],
+        "change": quote["change"],
+        "changePercent": quote["changePercent"],
+        "previousClose": quote["previousClose"],
+        "marketCap": None,  # not in batched bars; would cost an .info call per symbol
+        "volume": quote["volume"],
+        "sparkline": quote["sparkline"],
+    }
 
 
 @stocks_bp.route("/api/stocks/<ticker>")
@@ -47,6 +40,4 @@ def get_stock(ticker):
 def get_watchlist():
     tickers_param = request.args.get("tickers", "AAPL,TSLA,GOOGL")
     tickers = [t.strip() for t in tickers_param.split(",") if t.strip()]
-    with ThreadPoolExecutor(max_workers=min(len(tickers), 5)) as pool:
-        results = list(pool.map(_get_stock_data, tickers))
-    return jsonify(results)
+    return jsonify([_to_response(q) for q in get_quotes(tickers).values()])
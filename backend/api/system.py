@@ -210,3 +210,36 @@ def running_services():
             sock.close()
 
     return jsonify(services)
+
+
+@system_bp.route("/api/system/router-stats")
+def router_stats():
+    """Fast-path router metrics: per-route latency/errors, agent fall-through, cache."""
+    try:
+        from backend.router import router_stats as _router_stats
+        from backend.services.quote_service import get_stats as quote_stats
+
+        stats = _router_stats()
+        stats["quotes"] = quote_stats()
+        return jsonify(stats)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@system_bp.route("/api/system/agent-stats")
+def agent_stats():
+    """LangChain agent metrics: executor build times, caches, run pool, session memory, shared LLM clients."""
+    try:
+        from backend import answer_cache, session_memory
+        from backend.agent import pool
+        from backend.agent.wrapper import get_agent_stats
+        from backend.services.llm_clients import get_stats as llm_stats
+
+        stats = get_agent_stats()
+        stats["answerCache"] = answer_cache.get_stats()
+        stats["pool"] = pool.get_stats()
+        stats["sessionMemory"] = session_memory.get_stats()
+        stats["llmClients"] = llm_stats()
+        return jsonify(stats)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,5 +1,6 @@
 """Todo CRUD — backed by PostgreSQL, with fallback sync to agent's todos.json."""
 from flask import Blueprint, request, jsonify
+from backend import answer_cache
 from backend.db import query, execute, execute_returning, log_activity
 
 todos_bp = Blueprint("todos", __name__)
@@ -23,6 +24,7 @@ def add_todo():
         (task, False)
     )
     log_activity("todos", "created", f"Created todo: {task}")
+    answer_cache.invalidate("todos")
     return jsonify(todo), 201
 
 
@@ -52,6 +54,7 @@ def update_todo(todo_id):
         f"UPDATE todos SET {', '.join(updates)} WHERE id = %s RETURNING id, task, done, created_at, updated_at",
         params
     )
+    answer_cache.invalidate("todos")
     return jsonify(todo)
 
 
@@ -63,4 +66,5 @@ def delete_todo(todo_id):
 
     execute("DELETE FROM todos WHERE id = %s", (todo_id,))
     log_activity("todos", "deleted", f"Deleted todo: {existing[0]['task']}")
+    answer_cache.invalidate("todos")
     return jsonify({"deleted": todo_id})
@@ -19,9 +19,17 @@ MODEL_PRICING = {
 }
 
 
-def calc_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+# Share of the input price charged for prompt tokens served from the provider's
+# prompt cache (OpenAI: 50%, Anthropic cache reads: 10%)
+CACHED_INPUT_RATE = {'gpt': 0.5, 'claude': 0.1}
+
+
+def calc_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
     pricing = MODEL_PRICING.get(model, MODEL_PRICING['gpt-4o-mini'])
-    return (prompt_tokens / 1000 * pricing['input']) + (completion_tokens / 1000 * pricing['output'])
+    cached = min(cached_tokens, prompt_tokens)
+    rate = CACHED_INPUT_RATE['claude' if model.startswith('claude') else 'gpt']
+    return (((prompt_tokens - cached) + cached * rate) / 1000 * pricing['input']
+            + completion_tokens / 1000 * pricing['output'])
 
 
 def _q(sql, params=None):
@@ -57,19 +65,23 @@ def log_usage():
     model = data.get('model', 'gpt-4o-mini')
     prompt_tokens = int(data.get('prompt_tokens', 0))
     completion_tokens = int(data.get('completion_tokens', 0))
+    cached_tokens = int(data.get('cached_tokens') or 0)
     total_tokens = prompt_tokens + completion_tokens
-    cost = calc_cost(model, prompt_tokens, completion_tokens)
+    cost = calc_cost(model, prompt_tokens, completion_tokens, cached_tokens)
 
     try:
         row = _exec("""
             INSERT INTO token_usage
-                (source, model, prompt_tokens, completion_tokens, total_tokens, cost_usd, session_id, context)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                (source, model, prompt_tokens, completion_tokens, total_tokens, cost_usd, session_id, context,
+                 tool_selection, tools_offered, success, cancel_reason, cached_tokens)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING id
         """, (
             data.get('source', 'langly'), model,
             prompt_tokens, completion_tokens, total_tokens, cost,
             data.get('session_id', ''), data.get('context', ''),
+            data.get('tool_selection', ''), data.get('tools_offered'), data.get('success'),
+            data.get('cancel_reason'), cached_tokens,
         ))
         return jsonify({'ok': True, 'id': row['id'] if row else None, 'cost_usd': float(cost)}), 201
     except Exception as e:
@@ -173,3 +185,63 @@ def get_stats():
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@token_usage_bp.route('/api/token-usage/tool-selection', methods=['GET'])
+def get_tool_selection():
+    """Agent runs with a per-query tool subset vs the full tool set: prompt size and success."""
+    days = int(request.args.get('days', 30))
+    try:
+        rows = _q("""
+            SELECT tool_selection, model, COUNT(*) as runs,
+                   COALESCE(AVG(prompt_tokens), 0) as avg_prompt_tokens,
+                   COALESCE(AVG(tools_offered), 0) as avg_tools_offered,
+                   COALESCE(AVG(CASE WHEN success THEN 1.0 ELSE 0.0 END), 0) as success_rate,
+                   COALESCE(SUM(cost_usd), 0) as cost
+            FROM token_usage
+            WHERE created_at >= NOW() - INTERVAL '%s days' AND tool_selection IN ('subset', 'full')
+            GROUP BY tool_selection, model ORDER BY model, tool_selection
+        """ % days)
+        return jsonify({
+            'period_days': days,
+            'by_selection': [
+                {'tool_selection': r['tool_selection'], 'model': r['model'], 'runs': r['runs'],
+                 'avg_prompt_tokens': round(float(r['avg_prompt_tokens'])),
+                 'avg_tools_offered': round(float(r['avg_tools_offered']), 1),
+                 'success_rate': round(float(r['success_rate']), 3),
+                 'cost': float(r['cost'])}
+                for r in rows
+            ],
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@token_usage_bp.route('/api/token-usage/prompt-cache', methods=['GET'])
+def get_prompt_cache():
+    """Share of agent prompt tokens served from the provider's prompt cache, and what it saved."""
+    days = int(request.args.get('days', 30))
+    try:
+        rows = _q("""
+            SELECT model, COUNT(*) as runs,
+                   COALESCE(SUM(prompt_tokens), 0) as prompt_tokens,
+                   COALESCE(SUM(cached_tokens), 0) as cached_tokens,
+                   COALESCE(SUM(CASE WHEN cached_tokens > 0 THEN 1 ELSE 0 END), 0) as runs_with_hits,
+                   COALESCE(SUM(cost_usd), 0) as cost
+            FROM token_usage
+            WHERE created_at >= NOW() - INTERVAL '%s days' AND source = 'langly'
+            GROUP BY model ORDER BY cost DESC
+        """ % days)
+        by_model = []
+        for r in rows:
+            prompt, cached = int(r['prompt_tokens']), int(r['cached_tokens'])
+            saved = calc_cost(r['model'], prompt, 0) - calc_cost(r['model'], prompt, 0, cached)
+            by_model.append({
+                'model': r['model'], 'runs': r['runs'], 'runs_with_hits': int(r['runs_with_hits']),
+                'prompt_tokens': prompt, 'cached_tokens': cached,
+                'cached_share': round(cached / prompt, 3) if prompt else None,
+                'cost': float(r['cost']), 'saved_usd': round(saved, 6),
+            })
+        return jsonify({'period_days': days, 'by_model': by_model})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -13,6 +13,13 @@ def create_app():
     app = Flask(__name__, static_folder=None)
     app.config["SECRET_KEY"] = "dev-secret-key"
 
+    # On Railway every request arrives through its proxy, so remote_addr is the
+    # proxy's; trust the one X-Forwarded-For hop it appends.  Not locally, where
+    # there is no proxy and the header would be client-controlled.
+    if os.getenv("RAILWAY_ENVIRONMENT"):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1)
+
     CORS(app, resources={r"/api/*": {"origins": "*"}})
 
     # Register blueprints
@@ -0,0 +1,443 @@
+"""Offline, deterministic replay benchmark for the LangChain agent loop.
+
+Measures what the agent framework itself costs per run, which live runs hide
+behind seconds of model and API latency.  Both tier models are replaced by
+a scripted chat model that streams pre-written turns from
+bench/agent_transcripts.jsonl; every tool is replaced by that transcript's
+recorded results.  Each transcript is then replayed two ways:
+
+  * executor — get_executor_for_query(query).invoke(), as /api/chat does
+  * chat     — a socket.io test client sends chat:send through the real
+               chat_handler, pool, stream runner and StreamingCallbackHandler
+
+and the report gives, per transcript:
+
+  * end-to-end time, and framework overhead per iteration: wall time minus
+    the (optionally simulated, --llm-ms) model time and tool time, divided by
+    the number of model calls
+  * callback → queue → pump latency: how long each event waits between
+    StreamingCallbackHandler putting it on the queue and the pump picking it up
+  * time to the first chat:token and the cost of each socketio.emit
+
+Runs need no network, database or API keys: activity logging and the
+learned router fallback are switched off, and the answer cache is cleared
+before every run.  Exits non-zero if a replay's answer differs from the
+transcript's expected answer.
+
+    python -m backend.bench.agent_replay_bench [--repeat 20] [--llm-ms 0]
+                                               [--path executor|chat|both] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+TRANSCRIPTS_PATH = Path(__file__).with_name("agent_transcripts.jsonl")
+RUN_TIMEOUT = 30.0   # seconds to wait for chat:done before counting a chat replay as failed
+CHUNK_CHARS = 8      # characters per streamed chunk from the scripted model
+
+
+def load_transcripts(path: Path = TRANSCRIPTS_PATH) -> tuple[dict, list[dict]]:
+    """Return (meta, transcripts) from a transcript file."""
+    meta: dict = {}
+    rows = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if "_meta" in row:
+                meta = row["_meta"]
+            else:
+                rows.append(row)
+    return meta, rows
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _ms_stats(samples: list[float]) -> dict:
+    values = sorted(samples)
+    if not values:
+        return {"n": 0}
+    return {
+        "n": len(values),
+        "mean": round(sum(values) / len(values), 3),
+        "p50": round(_percentile(values, 50), 3),
+        "p95": round(_percentile(values, 95), 3),
+        "max": round(values[-1], 3),
+    }
+
+
+# ── Scripted model and recorded tools ────────────────────────────────────────
+
+class Replay:
+    """The current transcript's remaining turns and fixtures, plus per-run timings."""
+
+    def __init__(self, llm_ms: float = 0.0):
+        self.llm_ms = llm_ms
+        self.lock = threading.Lock()
+        self.turns: deque = deque()
+        self.fixtures: dict = {}
+        self.reset()
+
+    def load(self, transcript: dict) -> None:
+        with self.lock:
+            self.turns = deque(transcript["turns"])
+            self.fixtures = transcript.get("tools", {})
+        self.reset()
+
+    def reset(self) -> None:
+        self.model_calls = 0
+        self.model_ms = 0.0
+        self.tool_ms = 0.0
+        self.queue_waits: list = []
+        self.emit_ms: list = []
+
+    def next_turn(self):
+        with self.lock:
+            self.model_calls += 1
+            if not self.turns:
+                raise RuntimeError("transcript exhausted: the agent asked for more model turns than were scripted")
+            return self.turns.popleft()
+
+    def tool(self, name: str, tool_input) -> str:
+        started = time.perf_counter()
+        recorded = self.fixtures.get(name, {})
+        key = str(tool_input).strip()
+        output = recorded.get(key, recorded.get("*", f"No recorded result for {name}({key})"))
+        with self.lock:  # tool-calling mode runs a turn's tools concurrently
+            self.tool_ms += (time.perf_counter() - started) * 1000
+        return output
+
+
+def scripted_chat_model(replay: Replay):
+    """A streaming chat model that plays back replay's turns, one per call."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+    def usage(messages, text: str) -> dict:
+        prompt = sum(len(str(m.content)) for m in messages) // 4
+        completion = max(1, len(text) // 4)
+        return {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}
+
+    def turn_parts(turn) -> tuple:
+        if isinstance(turn, str):
+            return turn, []
+        calls = [{"name": c["name"], "args": c.get("args", {}), "id": f"call_{i}"}
+                 for i, c in enumerate(turn.get("tool_calls", []))]
+        return turn.get("content", ""), calls
+
+    class ScriptedChatModel(BaseChatModel):
+        @property
+        def _llm_type(self) -> str:
+            return "scripted"
+
+        def bind_tools(self, tools, **kwargs):
+            return self  # the script decides which tools get called
+
+        def _turn(self):
+            started = time.perf_counter()
+            turn = replay.next_turn()
+            if replay.llm_ms:
+                time.sleep(replay.llm_ms / 1000)
+            replay.model_ms += (time.perf_counter() - started) * 1000
+            return turn_parts(turn)
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            text, calls = self._turn()
+            message = AIMessage(content=text, tool_calls=calls, usage_metadata=usage(messages, text))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            # BaseChatModel.stream reports each chunk to on_llm_new_token
+            text, calls = self._turn()
+            for i in range(0, len(text), CHUNK_CHARS):
+                yield ChatGenerationChunk(message=AIMessageChunk(content=text[i:i + CHUNK_CHARS]))
+            if calls:
+                yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                    for i, c in enumerate(calls)]))
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage(messages, text)))
+
+    return ScriptedChatModel()
+
+
+class StampedQueue(queue.Queue):
+    """Callback event queue that records how long each event waited for the pump."""
+
+    def __init__(self, replay: Replay):
+        super().__init__()
+        self.replay = replay
+
+    def put(self, item, block=True, timeout=None):
+        super().put((time.perf_counter(), item), block, timeout)
+
+    def get(self, block=True, timeout=None):
+        put_at, item = super().get(block, timeout)
+        self.replay.queue_waits.append((time.perf_counter() - put_at) * 1000)
+        return item
+
+
+@contextlib.contextmanager
+def offline_agent(replay: Replay):
+    """Swap the tier models and tools for replay's script and fixtures; restore on exit."""
+    from backend import db, intent_model
+    from backend.agent.callbacks import StreamingCallbackHandler
+    from backend.agent.wrapper import langchain_agent
+
+    try:
+        from langchain.tools import Tool
+    except ImportError:
+        from langchain_core.tools import Tool
+
+    model = scripted_chat_model(replay)
+    saved = {
+        "llms": dict(langchain_agent._llms),
+        "executors": langchain_agent._executors.copy(),
+        "tools": langchain_agent._tools,
+        "modes": {tier: cfg["mode"] for tier, cfg in langchain_agent._TIERS.items()},
+        "log_activity": db.log_activity,
+        "classify_fallback": intent_model.classify_fallback,
+        "handler_init": StreamingCallbackHandler.__init__,
+    }
+
+    def handler_init(self, *args, **kwargs):
+        saved["handler_init"](self, *args, **kwargs)
+        self.queue = StampedQueue(replay)
+
+    with langchain_agent._build_lock:
+        langchain_agent._llms.update(fast=model, deep=model)
+        langchain_agent._executors.clear()
+    langchain_agent._tools = [
+        Tool(name=name, func=lambda tool_input, name=name: replay.tool(name, tool_input), description=description)
+        for name, _, description in langchain_agent.TOOL_SPECS
+    ]
+    db.log_activity = lambda *args, **kwargs: None
+    intent_model.classify_fallback = lambda message: None  # routing isn't what this measures
+    StreamingCallbackHandler.__init__ = handler_init
+    try:
+        yield langchain_agent
+    finally:
+        StreamingCallbackHandler.__init__ = saved["handler_init"]
+        intent_model.classify_fallback = saved["classify_fallback"]
+        db.log_activity = saved["log_activity"]
+        langchain_agent._tools = saved["tools"]
+        for tier, mode in saved["modes"].items():
+            langchain_agent._TIERS[tier]["mode"] = mode
+        with langchain_agent._build_lock:
+            langchain_agent._llms.clear()
+            langchain_agent._llms.update(saved["llms"])
+            langchain_agent._executors.clear()
+            langchain_agent._executors.update(saved["executors"])
+
+
+def _use_mode(langchain_agent, mode: str) -> None:
+    """Run both tiers in the transcript's agent mode, so its scripted turns fit."""
+    for cfg in langchain_agent._TIERS.values():
+        cfg["mode"] = mode
+
+
+# ── Replays ──────────────────────────────────────────────────────────────────
+
+def _run_record(replay: Replay, elapsed_ms: float, output: str, expected: str) -> dict:
+    iterations = max(1, replay.model_calls)
+    overhead = elapsed_ms - replay.model_ms - replay.tool_ms
+    return {
+        "e2e_ms": elapsed_ms,
+        "iterations": replay.model_calls,
+        "overhead_per_iter_ms": overhead / iterations,
+        "ok": output.strip() == expected.strip(),
+        "output": output,
+    }
+
+
+def replay_executor(langchain_agent, replay: Replay, transcript: dict) -> dict:
+    """One executor.invoke() replay, as the REST /api/chat path runs it."""
+    from backend import answer_cache
+
+    answer_cache.clear()
+    _use_mode(langchain_agent, transcript["mode"])
+    executor, _ = langchain_agent.get_executor_for_query(transcript["query"])
+    replay.load(transcript)
+    started = time.perf_counter()
+    try:
+        result = executor.invoke({"input": transcript["query"]})
+        output = result.get("output", "") if isinstance(result, dict) else str(result)
+    except Exception as e:
+        output = f"ERROR: {e}"
+    return _run_record(replay, (time.perf_counter() - started) * 1000, output, transcript["expect"])
+
+
+class ChatDriver:
+    """A Flask-SocketIO test client connected to the real chat handlers."""
+
+    def __init__(self, replay: Replay):
+        from flask import Flask
+        from flask_socketio import SocketIO
+
+        from backend.api import auth
+        from backend.sockets.chat_handler import register_handlers
+
+        self.replay = replay
+        self.app = Flask(__name__)
+        self.socketio = SocketIO(self.app, async_mode="threading")
+        register_handlers(self.socketio)
+        self._emit = self.socketio.emit
+        self.socketio.emit = self._timed_emit
+        self.finished = threading.Event()
+        self.events: list = []
+        token = "agent-replay-bench"
+        auth._valid_tokens.add(token)
+        self.client = self.socketio.test_client(self.app, query_string=f"token={token}")
+
+    def _timed_emit(self, event, *args, **kwargs):
+        started = time.perf_counter()
+        result = self._emit(event, *args, **kwargs)
+        now = time.perf_counter()
+        self.replay.emit_ms.append((now - started) * 1000)
+        self.events.append((now, event, args[0] if args else None))
+        if event in ("chat:done", "chat:error", "chat:cancelled"):
+            self.finished.set()
+        return result
+
+    def replay_chat(self, langchain_agent, transcript: dict) -> dict:
+        """One chat:send replay through chat_handler, the pool and the stream runner."""
+        from backend import answer_cache
+        from backend.agent import pool
+
+        # The previous run's pool job ends just after its chat:done; don't time a queued start
+        while pool.get_stats()["running"]:
+            time.sleep(0.001)
+        answer_cache.clear()
+        _use_mode(langchain_agent, transcript["mode"])
+        self.replay.load(transcript)
+        self.events = []
+        self.finished.clear()
+        started = time.perf_counter()
+        self.client.emit("chat:send", {"message": transcript["query"]})
+        if not self.finished.wait(RUN_TIMEOUT):
+            output, finished_at = "ERROR: no chat:done within the timeout", time.perf_counter()
+        else:
+            finished_at, event, payload = self.events[-1]
+            output = payload.get("response", "") if event == "chat:done" else f"ERROR: {event} {payload}"
+        self.client.get_received()  # drain the test client's copy of the events
+        record = _run_record(self.replay, (finished_at - started) * 1000, output, transcript["expect"])
+        first_token = next((t for t, event, _ in self.events if event == "chat:token"), None)
+        record["first_token_ms"] = (first_token - started) * 1000 if first_token else None
+        record["events"] = len(self.events)
+        return record
+
+    def close(self) -> None:
+        self.client.disconnect()
+
+
+def _summarize(records: list[dict], replay_waits: list, emit_ms: list) -> dict:
+    summary = {
+        "runs": len(records),
+        "failures": sum(not r["ok"] for r in records),
+        "iterations": records[0]["iterations"] if records else 0,
+        "e2e_ms": _ms_stats([r["e2e_ms"] for r in records]),
+        "overhead_per_iter_ms": _ms_stats([r["overhead_per_iter_ms"] for r in records]),
+    }
+    if any("first_token_ms" in r for r in records):
+        summary["first_token_ms"] = _ms_stats([r["first_token_ms"] for r in records if r.get("first_token_ms") is not None])
+        summary["queue_wait_ms"] = _ms_stats(replay_waits)
+        summary["emit_ms"] = _ms_stats(emit_ms)
+    failed = next((r["output"] for r in records if not r["ok"]), None)
+    if failed is not None:
+        summary["first_failure"] = failed[:300]
+    return summary
+
+
+def run(transcripts: list[dict], repeat: int, llm_ms: float, paths: tuple, quiet: bool = True) -> dict:
+    """Replay every transcript `repeat` times along each path; returns the report."""
+    replay = Replay(llm_ms)
+    report = {"repeat": repeat, "llm_ms": llm_ms, "transcripts": {}}
+    sink = io.StringIO()
+    # AgentExecutor(verbose=True) and the handlers print on every step; that cost
+    # stays in the measurement, only the terminal output is dropped
+    output = contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext()
+    with offline_agent(replay) as langchain_agent, output:
+        driver = ChatDriver(replay) if "chat" in paths else None
+        try:
+            for transcript in transcripts:
+                results = {}
+                if "executor" in paths:
+                    records = [replay_executor(langchain_agent, replay, transcript) for _ in range(repeat)]
+                    results["executor"] = _summarize(records, [], [])
+                if driver is not None:
+                    records, waits, emits = [], [], []
+                    for _ in range(repeat):
+                        records.append(driver.replay_chat(langchain_agent, transcript))
+                        waits.extend(replay.queue_waits)
+                        emits.extend(replay.emit_ms)
+                    results["chat"] = _summarize(records, waits, emits)
+                report["transcripts"][transcript["id"]] = results
+        finally:
+            if driver is not None:
+                driver.close()
+    return report
+
+
+def _print_report(meta: dict, report: dict) -> None:
+    print(f"transcripts v{meta.get('version', '?')}: {len(report['transcripts'])} scripted runs x {report['repeat']}, "
+          f"simulated model latency {report['llm_ms']} ms/call")
+    print(f"\n{'transcript':28} {'path':8} {'iters':>5} {'e2e p50':>9} {'e2e p95':>9} {'ovh/iter':>9} "
+          f"{'1st tok':>8} {'queue p50':>10} {'queue p95':>10} {'emit':>7}  fail")
+    for name, paths in report["transcripts"].items():
+        for path, s in paths.items():
+            tok = s.get("first_token_ms", {})
+            wait = s.get("queue_wait_ms", {})
+            emit = s.get("emit_ms", {})
+            print(f"{name:28} {path:8} {s['iterations']:5} {s['e2e_ms'].get('p50', 0):8.2f}m "
+                  f"{s['e2e_ms'].get('p95', 0):8.2f}m {s['overhead_per_iter_ms'].get('p50', 0):8.2f}m "
+                  f"{tok.get('p50', float('nan')):7.2f}m {wait.get('p50', float('nan')):9.3f}m "
+                  f"{wait.get('p95', float('nan')):9.3f}m {emit.get('mean', float('nan')):6.3f}m  {s['failures']}")
+            if "first_failure" in s:
+                print(f"    first failure: {s['first_failure']!r}")
+    print("\nms throughout; ovh/iter = (e2e - model - tool time) / model calls; "
+          "queue = callback put -> pump get; emit = mean socketio.emit cost")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transcripts", type=Path, default=TRANSCRIPTS_PATH)
+    parser.add_argument("--repeat", type=int, default=20, help="replays per transcript and path")
+    parser.add_argument("--llm-ms", type=float, default=0.0, help="simulated latency per model call")
+    parser.add_argument("--path", choices=("executor", "chat", "both"), default="both")
+    parser.add_argument("--only", help="replay just this transcript id")
+    parser.add_argument("--verbose", action="store_true", help="keep the agent's and handlers' log output")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    meta, transcripts = load_transcripts(args.transcripts)
+    if args.only:
+        transcripts = [t for t in transcripts if t["id"] == args.only]
+    paths = ("executor", "chat") if args.path == "both" else (args.path,)
+    report = run(transcripts, args.repeat, args.llm_ms, paths, quiet=not args.verbose)
+    report["transcripts_version"] = meta.get("version")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(meta, report)
+    failures = sum(s["failures"] for paths in report["transcripts"].values() for s in paths.values())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
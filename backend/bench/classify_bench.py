@@ -0,0 +1,178 @@
+"""Micro-benchmark for router.classify().
+
+Times the single-pass intent scanner against the frozen sequential classifier
+in bench/legacy_router.py, and fails if any routing decision differs.  Parity
+is checked on router._classify_single(), i.e. without compound (multi-intent)
+splitting, which the legacy classifier never did.  The
+message set is the hand-written SAMPLES below plus randomly assembled
+messages built from the router's own vocabulary, so new keywords are covered
+automatically.  COMPOUND_SAMPLES pins the multi-intent routing, and the run
+also fails if full classify() is slower than the legacy classifier.
+
+    python -m backend.bench.classify_bench [--fuzz 20000] [--seed 7] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+
+from backend import router
+from backend.bench import legacy_router
+
+SAMPLES = [
+    "hi", "hey there!", "Good morning Langly", "what's up", "history of rome",
+    "what time is it", "today's date?", "what day is it today",
+    "weather", "what's the weather in Boston, MA?", "forecast for Denver", "is it going to snow",
+    "how's AAPL doing", "TSLA and NVDA price", "how are my stocks", "check my portfolio",
+    "apple stock price", "SNOW", "snowflake earnings", "is intel a buy", "stock market today",
+    "add buy milk to my todos", "add todo: call the plumber", "create a task for taxes",
+    "new task pick up dry cleaning", "show my todos", "task list", "todo add groceries",
+    "show my notes", "open my notebook", "system status", "cpu usage", "how much disk is left",
+    "news", "brief me", "what's happening in the world", "headlines today",
+    "what's on today", "my calendar", "today's schedule", "upcoming events",
+    "what's on the next 3 days", "who's in the family calendar", "family members on kindora",
+    "schedule a dentist appointment", "add an event for friday", "sebby's schedule this week",
+    "what's my net worth", "account balances", "budget status", "how much did I spend - spending",
+    "recent charges on my credit card", "recent transactions", "cash flow this month",
+    "how much money do I have", "my subscriptions", "personal financ",
+    "compare AAPL and MSFT", "why is the sky blue", "write me a cover letter",
+    "weather and also my calendar", "help me plan a trip", "translate hello to french",
+    "what's the capital of France", "tell me a joke", "", "   ",
+    "meeting tomorrow, book it", "plan a visit to grandma", "todays event list",
+    "what's on\nmy todo list add", "add\nmilk to my todos", "to-do list", "what's  happening",
+    "weather in Montréal", "café budget", "Ünicode AAPL price", "TODAY's agenda",
+]
+
+# message -> expected sub-routes of the "multi" route, or None for the agent
+COMPOUND_SAMPLES = {
+    "weather and my calendar today": ["weather", "calendar_today"],
+    "weather in Austin, TX and my calendar today": ["weather:Austin, TX", "calendar_today"],
+    "what time is it, and the weather in Paris?": ["datetime", "weather:Paris"],
+    "how's NVDA and also my todos": ["stocks", "todo_list"],
+    "show my notes; system status": ["note_list", "system"],
+    "news plus my net worth": ["news", "finance_accounts"],
+    "hey, what's the weather and my todos": ["weather", "todo_list"],
+    "what time is it, weather in Austin, and email Bob the report": None,
+    "weather in Boston and write me a poem about it": None,
+    "what time is it and why is the sky blue": None,
+}
+
+_FILLER = (
+    "the my a to for in on of and is it me please can you show check what's how "
+    "about today tomorrow now this next week Boston NYC grandma milk eggs plumber I "
+    "did do get tell quick update with from at all any some 3 10 friday"
+).split()
+
+
+def _realize(fragment: str, rng: random.Random) -> str:
+    """Turn a vocabulary regex fragment into one concrete string it matches."""
+    text = re.sub(r"\(\?:([^()]*)\)", lambda m: rng.choice(m.group(1).split("|")), fragment)
+    text = text.replace(r"\s*", rng.choice(["", " "])).replace(r"\s+", rng.choice([" ", "  "]))
+    text = text.replace(r"\d+", str(rng.randint(1, 30)))
+    return re.sub(r"(.)\?", lambda m: m.group(1) if rng.random() < 0.5 else "", text)
+
+
+def _fuzz_messages(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    words = [f for frags in router._INTENT_VOCAB.values() for f in frags]
+    names = list(router.TICKER_NAME_MAP)
+    symbols = sorted(router.KNOWN_TICKERS)
+    messages = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 9)):
+            roll = rng.random()
+            if roll < 0.35:
+                parts.append(_realize(rng.choice(words), rng))
+            elif roll < 0.42:
+                parts.append(rng.choice(names) + rng.choice(["", "s", "'s", "ly"]))
+            elif roll < 0.50:
+                parts.append(rng.choice(symbols))
+            else:
+                parts.append(rng.choice(_FILLER))
+        msg = " ".join(parts)
+        if rng.random() < 0.2:
+            msg = msg.upper() if rng.random() < 0.3 else msg.capitalize()
+        if rng.random() < 0.2:
+            msg += rng.choice(["?", ".", "!", "\n", " :)"])
+        messages.append(msg)
+    return messages
+
+
+def _time_per_call(fns, messages: list[str], repeat: int) -> list[float]:
+    """Best-of-`repeat` mean seconds per call of each fn, rounds interleaved so noise hits all alike."""
+    best = [float("inf")] * len(fns)
+    for _ in range(repeat):
+        for i, fn in enumerate(fns):
+            start = time.perf_counter()
+            for msg in messages:
+                fn(msg)
+            best[i] = min(best[i], time.perf_counter() - start)
+    return [b / len(messages) for b in best]
+
+
+def _compound_routes(msg: str):
+    route_info = router.classify(msg)
+    if route_info is None or route_info["route"] != "multi":
+        return route_info and route_info["route"]
+    return [r["route"] + (f":{r['params']['location']}" if "location" in r["params"] else "")
+            for r in route_info["params"]["routes"]]
+
+
+def _matches(expected, actual) -> bool:
+    if not isinstance(expected, list) or not isinstance(actual, list) or len(expected) != len(actual):
+        return expected == actual
+    return all(e == a or (":" not in e and a.startswith(e + ":")) for e, a in zip(expected, actual))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fuzz", type=int, default=20000, help="random messages to add")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    messages = SAMPLES + _fuzz_messages(args.fuzz, args.seed)
+
+    mismatches = []
+    for msg in messages:
+        expected = legacy_router.classify(msg)
+        actual = router._classify_single(msg)
+        if expected != actual:
+            mismatches.append((msg, expected, actual))
+
+    compound = list(COMPOUND_SAMPLES)
+    misrouted = [(m, e, _compound_routes(m)) for m, e in COMPOUND_SAMPLES.items()
+                 if not _matches(e, _compound_routes(m))]
+
+    fuzz = messages[len(SAMPLES):]
+    fast = sum(1 for m in messages if router.classify(m))
+    print(f"messages: {len(messages)} ({fast} fast-path)")
+    slower = []
+    for label, subset, repeat in (("samples", SAMPLES, args.repeat * 40), ("compound", compound, args.repeat * 200),
+                                  ("fuzz", fuzz, args.repeat)):
+        if not subset:
+            continue
+        legacy, current, full = _time_per_call(
+            (legacy_router.classify, router._classify_single, router.classify), subset, repeat)
+        print(f"{label:8} legacy {legacy * 1e6:6.2f} µs/call   "
+              f"single-pass {current * 1e6:6.2f} µs/call   speedup {legacy / current:.2f}x   "
+              f"with compound {full * 1e6:6.2f} µs/call")
+        if label == "fuzz" and full > legacy:
+            slower.append(label)
+    print(f"routing mismatches: {len(mismatches)}")
+    for msg, expected, actual in mismatches[:20]:
+        print(f"  {msg!r}\n    legacy: {expected}\n    now:    {actual}")
+    print(f"compound misroutes: {len(misrouted)}")
+    for msg, expected, actual in misrouted:
+        print(f"  {msg!r}\n    expected: {expected}\n    got:      {actual}")
+    if slower:
+        print("classify() with compound handling is slower than the legacy classifier")
+    return 1 if mismatches or misrouted or slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Import-time report and cold-start budget for the backend.
+
+Runs each target in a fresh interpreter under ``python -X importtime`` and
+reports wall time plus the modules with the largest cumulative import cost.
+Targets mirror what a Railway redeploy or a recycled gunicorn worker pays
+before it can serve:
+
+  * app    — backend.run minus the database step: config, create_app(),
+             every blueprint and socket handler
+  * agent  — backend.agent.wrapper, which must stay cheap now that tools and
+             executors are built on first use
+  * router — backend.router, imported by the chat socket handler
+
+Exits non-zero when a target exceeds its budget, so it can gate deploys.
+
+    python -m backend.bench.import_bench [--top 15] [--json] [--target app]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Cold-start budgets, ms of wall time in a fresh interpreter
+TARGETS = {
+    "app": ("import backend.config; from backend.app import create_app; create_app()", 1500),
+    "agent": ("import backend.agent.wrapper", 150),
+    "router": ("import backend.router", 100),
+}
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Parse -X importtime lines into [{"module", "self_ms", "cumulative_ms", "depth"}]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        except ValueError:
+            continue
+        rows.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": (len(name) - len(name.lstrip())) // 2,
+        })
+    return rows
+
+
+def measure(code: str) -> dict:
+    """Run `code` in a fresh interpreter and return wall time and per-module costs."""
+    env = {**os.environ, "AGENT_PREWARM": "0", "PYTHONDONTWRITEBYTECODE": "1"}
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    modules = parse_importtime(proc.stderr)
+    error = None
+    if proc.returncode != 0:
+        error = next((line for line in reversed(proc.stderr.splitlines())
+                      if line and not line.startswith("import time:")), "failed")
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(sum(m["self_ms"] for m in modules), 1),
+        "modules": len(modules),
+        "top": sorted(modules, key=lambda m: -m["cumulative_ms"]),
+        "error": error,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=sorted(TARGETS), action="append",
+                        help="measure only these targets (repeatable)")
+    parser.add_argument("--top", type=int, default=15, help="heaviest modules to list per target")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = {}
+    over_budget = False
+    for name in args.target or TARGETS:
+        code, budget_ms = TARGETS[name]
+        result = measure(code)
+        result["budget_ms"] = budget_ms
+        result["within_budget"] = result["error"] is None and result["wall_ms"] <= budget_ms
+        over_budget |= not result["within_budget"]
+        result["top"] = [{k: round(v, 1) if isinstance(v, float) else v for k, v in m.items()}
+                         for m in result["top"][:args.top]]
+        report[name] = result
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, r in report.items():
+            verdict = "ok" if r["within_budget"] else "OVER BUDGET"
+            print(f"{name}: {r['wall_ms']:.0f} ms wall, {r['import_ms']:.0f} ms importing "
+                  f"{r['modules']} modules (budget {r['budget_ms']} ms) — {verdict}")
+            if r["error"]:
+                print(f"  error: {r['error']}")
+            for m in r["top"]:
+                print(f"  {m['cumulative_ms']:8.1f} ms cumulative  {m['self_ms']:7.1f} ms self  {m['module']}")
+            print()
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""Frozen copy of the sequential regex classifier that router.classify() replaced.
+
+Kept only as the reference for bench/classify_bench.py: the single-pass scanner
+must return exactly what this returns for every message.  Do not edit.
+"""
+
+from __future__ import annotations
+
+import re
+
+from backend.router import _extract_location, _extract_todo_task
+
+GREETING_PATTERNS = re.compile(
+    r"^(hey|hi|hello|howdy|yo|sup|what'?s up|good (morning|afternoon|evening)|greetings)\b",
+    re.IGNORECASE,
+)
+
+WEATHER_PATTERNS = re.compile(
+    r"\b(weather|temperature|temp|forecast|rain|snow|sunny|cloudy|humid|wind)\b",
+    re.IGNORECASE,
+)
+
+STOCK_PATTERNS = re.compile(
+    r"\b(stock|stocks|price|ticker|market|share|shares|portfolio|watchlist)\b",
+    re.IGNORECASE,
+)
+
+# Match explicit tickers like AAPL, TSLA — 1-5 uppercase letters
+TICKER_RE = re.compile(r"\b([A-Z]{1,5})\b")
+
+# Known tickers for matching in natural language
+KNOWN_TICKERS = {
+    "AAPL", "TSLA", "GOOGL", "GOOG", "MSFT", "AMZN", "META", "NVDA", "AMD",
+    "NFLX", "SNOW", "PLTR", "SPY", "QQQ", "DIS", "BABA", "INTC", "UBER",
+    "LYFT", "SQ", "SHOP", "PYPL", "COIN", "ROKU", "SNAP", "PINS", "TWLO",
+    "CRM", "ORCL", "IBM", "BA", "JPM", "GS", "V", "MA", "WMT", "TGT",
+}
+
+TICKER_NAME_MAP = {
+    "apple": "AAPL", "tesla": "TSLA", "google": "GOOGL", "alphabet": "GOOGL",
+    "microsoft": "MSFT", "amazon": "AMZN", "meta": "META", "facebook": "META",
+    "nvidia": "NVDA", "amd": "AMD", "netflix": "NFLX", "snowflake": "SNOW",
+    "palantir": "PLTR", "disney": "DIS", "uber": "UBER", "spotify": "SPOT",
+    "shopify": "SHOP", "paypal": "PYPL", "coinbase": "COIN", "intel": "INTC",
+    "salesforce": "CRM", "oracle": "ORCL", "ibm": "IBM", "boeing": "BA",
+    "walmart": "WMT", "target": "TGT", "visa": "V", "mastercard": "MA",
+}
+
+TODO_PATTERNS = re.compile(
+    r"\b(todos?|to-?dos?|tasks?|todo list|task list)\b",
+    re.IGNORECASE,
+)
+
+TODO_ADD_PATTERNS = re.compile(
+    r"\b(add|create|new|make)\b.+\b(todos?|to-?dos?|tasks?)\b|\b(todos?|to-?dos?|tasks?)\b.+\b(add|create)\b",
+    re.IGNORECASE,
+)
+
+NOTES_PATTERNS = re.compile(
+    r"\b(notes?|notebook)\b",
+    re.IGNORECASE,
+)
+
+TIME_PATTERNS = re.compile(
+    r"\b(what time|current time|date and time|what date|today'?s date|what day)\b",
+    re.IGNORECASE,
+)
+
+SYSTEM_PATTERNS = re.compile(
+    r"\b(system (status|info|stats)|cpu|memory|disk|uptime)\b",
+    re.IGNORECASE,
+)
+
+NEWS_PATTERNS = re.compile(
+    r"\b(news|headline|headlines|digest|briefing|brief me|what'?s happening|current events)\b",
+    re.IGNORECASE,
+)
+
+CALENDAR_PATTERNS = re.compile(
+    r"\b(calendar|schedule|agenda|event|events|appointment|appointments|"
+    r"what'?s\s+on|what'?s\s+happening|family\s+schedule|sebby'?s\s+schedule|"
+    r"kindora|upcoming\s+events?|today'?s\s+(?:schedule|agenda|events?))\b",
+    re.IGNORECASE,
+)
+
+CALENDAR_ADD_PATTERNS = re.compile(
+    r"\b(add|create|schedule|book|set up|plan)\b.+\b(event|appointment|meeting|visit)\b|"
+    r"\b(event|appointment|meeting|visit)\b.+\b(add|create|schedule|book)\b",
+    re.IGNORECASE,
+)
+
+FINANCE_PATTERNS = re.compile(
+    r"\b(net\s*worth|balance|balances|bank|banks|account|accounts|budget|budgets|"
+    r"spending|expenses?|income|cashflow|cash\s*flow|savings?|"
+    r"recurring|subscriptions?|bills?|credit\s*card|mortgage|loan|"
+    r"personal\s*financ|monarch|how\s*much\s+(?:do\s+i|money))\b",
+    re.IGNORECASE,
+)
+
+# Signals that the query is complex and needs the full agent
+COMPLEX_SIGNALS = re.compile(
+    r"\b(compare|analyze|explain|why|how does|write|create a|generate|summarize|translate|"
+    r"search the web|look up|find me|research|calculate|convert|send email|"
+    r"and also|and then|after that|help me)\b",
+    re.IGNORECASE,
+)
+
+
+def _extract_tickers(message: str) -> list[str]:
+    """Extract stock tickers from the message."""
+    tickers = []
+
+    # Check for known company names
+    lower = message.lower()
+    for name, ticker in TICKER_NAME_MAP.items():
+        if name in lower:
+            tickers.append(ticker)
+
+    # Check for uppercase ticker symbols
+    for match in TICKER_RE.finditer(message):
+        candidate = match.group(1)
+        if candidate in KNOWN_TICKERS and candidate not in tickers:
+            tickers.append(candidate)
+
+    return tickers
+
+
+def classify(message: str) -> dict | None:
+    """Classify user intent and return a fast-path route, or None for full agent.
+
+    Returns dict with:
+        route: str — the fast-path handler name
+        params: dict — extracted parameters
+        label: str — human-readable description for the UI
+    """
+    msg = message.strip()
+
+    # If the message has complex signals, always use the full agent
+    if COMPLEX_SIGNALS.search(msg):
+        return None
+
+    # Very short greetings — instant response, no tools needed
+    if GREETING_PATTERNS.match(msg) and len(msg.split()) <= 5:
+        return {"route": "greeting", "params": {}, "label": "Greeting"}
+
+    # Date/time
+    if TIME_PATTERNS.search(msg):
+        return {"route": "datetime", "params": {}, "label": "Date & Time"}
+
+    # Weather
+    if WEATHER_PATTERNS.search(msg):
+        location = _extract_location(msg)
+        return {"route": "weather", "params": {"location": location}, "label": f"Weather: {location}"}
+
+    # Stock queries — match on keywords OR when a known ticker/company name appears
+    tickers = _extract_tickers(msg)
+    has_stock_keywords = STOCK_PATTERNS.search(msg)
+    if has_stock_keywords or tickers:
+        if tickers:
+            return {"route": "stocks", "params": {"tickers": tickers}, "label": f"Stocks: {', '.join(tickers)}"}
+        # General "how are my stocks" → use watchlist
+        if re.search(r"\b(my stocks|my portfolio|watchlist)\b", msg, re.IGNORECASE):
+            return {"route": "watchlist", "params": {}, "label": "Watchlist"}
+
+    # Add todo
+    if TODO_ADD_PATTERNS.search(msg):
+        task_text = _extract_todo_task(msg)
+        if task_text:
+            return {"route": "todo_add", "params": {"task": task_text}, "label": f"Add todo: {task_text}"}
+
+    # List todos
+    if TODO_PATTERNS.search(msg) and not TODO_ADD_PATTERNS.search(msg):
+        return {"route": "todo_list", "params": {}, "label": "Todos"}
+
+    # Notes
+    if NOTES_PATTERNS.search(msg):
+        return {"route": "note_list", "params": {}, "label": "Notes"}
+
+    # System info
+    if SYSTEM_PATTERNS.search(msg):
+        return {"route": "system", "params": {}, "label": "System Info"}
+
+    # News / briefings
+    if NEWS_PATTERNS.search(msg):
+        return {"route": "news", "params": {"query": msg}, "label": "News Digest"}
+
+    # Family calendar — Kindora
+    if CALENDAR_PATTERNS.search(msg) and not CALENDAR_ADD_PATTERNS.search(msg):
+        lower = msg.lower()
+        if re.search(r"\b(today|this morning|tonight|today'?s)\b", lower):
+            return {"route": "calendar_today", "params": {}, "label": "Today's Calendar"}
+        if re.search(r"\b(this week|next few days|upcoming|next \d+ days)\b", lower):
+            days_match = re.search(r"next (\d+) days", lower)
+            days = int(days_match.group(1)) if days_match else 7
+            return {"route": "calendar_week", "params": {"days": days}, "label": "Upcoming Events"}
+        if re.search(r"\b(family\s*members?|who'?s\s+in)\b", lower):
+            return {"route": "calendar_family", "params": {}, "label": "Family Members"}
+        # Default: today's events
+        return {"route": "calendar_today", "params": {}, "label": "Today's Calendar"}
+
+    # Personal finance — Monarch Money
+    if FINANCE_PATTERNS.search(msg):
+        lower = msg.lower()
+        if re.search(r"\b(budget|spending|expenses?)\b", lower):
+            return {"route": "finance_budgets", "params": {}, "label": "Budgets"}
+        if re.search(r"\b(transaction|recent\s*(charges?|purchases?))\b", lower):
+            return {"route": "finance_transactions", "params": {}, "label": "Transactions"}
+        if re.search(r"\b(cashflow|cash\s*flow|income|savings?)\b", lower):
+            return {"route": "finance_overview", "params": {}, "label": "Financial Overview"}
+        # Default: accounts + net worth
+        return {"route": "finance_accounts", "params": {}, "label": "Accounts & Net Worth"}
+
+    return None
@@ -0,0 +1,193 @@
+"""Coverage and latency benchmark for the fast-path router.
+
+Replays bench/routing_corpus.jsonl — real-style queries labeled with the route
+and params they *should* get — through router.classify() and reports:
+
+  * classify() throughput and p50/p99 latency
+  * accuracy (route and params) and a per-route confusion matrix
+  * the share of traffic that falls through to the full LangChain agent,
+    split into intended agent queries and missed fast-path hits
+
+Every missed hit costs 2-10 s of agent time, so router changes should be
+checked here for coverage as well as speed.
+
+    python -m backend.bench.router_bench [--repeat 20] [--show-misses 25] [--json]
+                                         [--min-accuracy 0.9]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from backend import router
+
+CORPUS_PATH = Path(__file__).with_name("routing_corpus.jsonl")
+AGENT = "agent"
+
+# Params the corpus labels; anything else the router returns (e.g. news "query") is ignored.
+# For multi routes, "routes" is compared as the list of sub-route names.
+LABELED_PARAMS = ("location", "tickers", "days", "task", "routes")
+
+# Agent cost per fall-through, seconds (low, high) — see ARCHITECTURE.md
+AGENT_SECONDS = (2.0, 10.0)
+
+
+def load_corpus(path: Path = CORPUS_PATH) -> tuple[dict, list[dict]]:
+    """Return (meta, rows) from a routing corpus file."""
+    meta: dict = {}
+    rows = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if "_meta" in row:
+                meta = row["_meta"]
+            else:
+                rows.append(row)
+    return meta, rows
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure_latency(queries: list[str], repeat: int) -> dict:
+    """Time every classify() call individually; return throughput and percentiles (µs)."""
+    clock = time.perf_counter_ns
+    samples = []
+    for _ in range(repeat):
+        for q in queries:
+            start = clock()
+            router.classify(q)
+            samples.append(clock() - start)
+    samples.sort()
+    total_s = sum(samples) / 1e9
+    return {
+        "calls": len(samples),
+        "throughput_per_s": round(len(samples) / total_s) if total_s else 0,
+        "mean_us": round(sum(samples) / len(samples) / 1e3, 2),
+        "p50_us": round(_percentile(samples, 50) / 1e3, 2),
+        "p99_us": round(_percentile(samples, 99) / 1e3, 2),
+        "max_us": round(samples[-1] / 1e3, 2),
+    }
+
+
+def evaluate(rows: list[dict]) -> dict:
+    """Classify every corpus row and compare against its label."""
+    confusion: Counter = Counter()
+    param_errors = []
+    misroutes = []
+    for row in rows:
+        result = router.classify(row["query"])
+        actual = result["route"] if result else AGENT
+        expected = row["route"]
+        confusion[(expected, actual)] += 1
+        if actual != expected:
+            misroutes.append({"id": row["id"], "query": row["query"], "expected": expected, "actual": actual})
+            continue
+        if result:
+            got = {k: result["params"][k] for k in LABELED_PARAMS if k in result["params"]}
+            if "routes" in got:
+                got["routes"] = [r["route"] for r in got["routes"]]
+            want = {k: v for k, v in row["params"].items() if k in LABELED_PARAMS}
+            if got != want:
+                param_errors.append({"id": row["id"], "query": row["query"], "expected": want, "actual": got})
+
+    total = len(rows)
+    route_ok = sum(n for (e, a), n in confusion.items() if e == a)
+    fell_through = sum(n for (e, a), n in confusion.items() if a == AGENT)
+    missed = sum(n for (e, a), n in confusion.items() if a == AGENT and e != AGENT)
+    wrong_fast = sum(n for (e, a), n in confusion.items() if a != AGENT and a != e)
+
+    per_route = {}
+    for route in sorted({e for e, _ in confusion} | {a for _, a in confusion}):
+        tp = confusion[(route, route)]
+        labeled = sum(n for (e, _), n in confusion.items() if e == route)
+        predicted = sum(n for (_, a), n in confusion.items() if a == route)
+        per_route[route] = {
+            "labeled": labeled,
+            "predicted": predicted,
+            "recall": round(tp / labeled, 3) if labeled else None,
+            "precision": round(tp / predicted, 3) if predicted else None,
+        }
+
+    return {
+        "rows": total,
+        "route_accuracy": round(route_ok / total, 4) if total else 0,
+        "full_accuracy": round((route_ok - len(param_errors)) / total, 4) if total else 0,
+        "agent_share": round(fell_through / total, 4) if total else 0,
+        "missed_fast_path": missed,
+        "wrong_fast_path": wrong_fast,
+        "missed_agent_seconds": [missed * AGENT_SECONDS[0], missed * AGENT_SECONDS[1]],
+        "per_route": per_route,
+        "confusion": {f"{e} -> {a}": n for (e, a), n in sorted(confusion.items()) if e != a},
+        "misroutes": misroutes,
+        "param_errors": param_errors,
+    }
+
+
+def _print_confusion(per_route: dict, confusion: dict) -> None:
+    print("\nPer-route            labeled  predicted  recall  precision")
+    for route, s in per_route.items():
+        recall = "-" if s["recall"] is None else f"{s['recall']:.3f}"
+        precision = "-" if s["precision"] is None else f"{s['precision']:.3f}"
+        print(f"  {route:20} {s['labeled']:7} {s['predicted']:10}  {recall:>6}  {precision:>9}")
+    if confusion:
+        print("\nConfusions (expected -> actual)")
+        for pair, n in sorted(confusion.items(), key=lambda kv: -kv[1]):
+            print(f"  {n:5}  {pair}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=CORPUS_PATH)
+    parser.add_argument("--repeat", type=int, default=20, help="latency passes over the corpus")
+    parser.add_argument("--show-misses", type=int, default=25, help="misroutes/param errors to list")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    parser.add_argument("--min-accuracy", type=float, default=None,
+                        help="exit non-zero if full accuracy drops below this")
+    args = parser.parse_args(argv)
+
+    meta, rows = load_corpus(args.corpus)
+    latency = measure_latency([r["query"] for r in rows], args.repeat)
+    report = evaluate(rows)
+    report["corpus_version"] = meta.get("version")
+    report["latency"] = latency
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"corpus v{meta.get('version', '?')}: {report['rows']} queries")
+        print(f"classify(): {latency['throughput_per_s']:,}/s  mean {latency['mean_us']} µs  "
+              f"p50 {latency['p50_us']} µs  p99 {latency['p99_us']} µs  max {latency['max_us']} µs")
+        print(f"route accuracy: {report['route_accuracy']:.1%}   route+params: {report['full_accuracy']:.1%}")
+        low, high = report["missed_agent_seconds"]
+        print(f"fall-through to agent: {report['agent_share']:.1%}   "
+              f"missed fast-path hits: {report['missed_fast_path']} (~{low:.0f}-{high:.0f} s of agent time)   "
+              f"wrong fast route: {report['wrong_fast_path']}")
+        _print_confusion(report["per_route"], report["confusion"])
+        if args.show_misses:
+            if report["misroutes"]:
+                print("\nMisroutes")
+                for m in report["misroutes"][:args.show_misses]:
+                    print(f"  #{m['id']:<5} {m['expected']:>20} -> {m['actual']:<20} {m['query']!r}")
+            if report["param_errors"]:
+                print("\nParam errors")
+                for m in report["param_errors"][:args.show_misses]:
+                    print(f"  #{m['id']:<5} {m['query']!r}: expected {m['expected']}, got {m['actual']}")
+
+    if args.min_accuracy is not None and report["full_accuracy"] < args.min_accuracy:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -221,6 +221,13 @@ def init_tables():
                 cur.execute("""
                     ALTER TABLE content_calendar ADD COLUMN IF NOT EXISTS published_url TEXT DEFAULT '';
                     ALTER TABLE content_calendar ADD COLUMN IF NOT EXISTS published_at TIMESTAMPTZ;
+                    ALTER TABLE token_usage ADD COLUMN IF NOT EXISTS tool_selection TEXT DEFAULT '';
+                    ALTER TABLE token_usage ADD COLUMN IF NOT EXISTS tools_offered INTEGER;
+                    ALTER TABLE token_usage ADD COLUMN IF NOT EXISTS success BOOLEAN;
+                    ALTER TABLE token_usage ADD COLUMN IF NOT EXISTS cancel_reason TEXT;
+                    ALTER TABLE token_usage ADD COLUMN IF NOT EXISTS cached_tokens INTEGER DEFAULT 0;
+                    ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summary TEXT DEFAULT '';
+                    ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summary_upto INTEGER DEFAULT 0;
                 """)
             except Exception:
                 pass
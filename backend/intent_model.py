@@ -0,0 +1,398 @@
+"""Learned fallback classifier — second chance for queries the regex router misses.
+
+A character n-gram TF-IDF nearest-neighbour model, pure Python and fully
+in-process.  It is trained on the labeled routing corpus plus real traffic
+from activity_log:
+
+  * fast_query rows → the route the regex router picked
+  * query rows (agent runs) → "weather" / "datetime" / "stocks" when the agent
+    used only the matching tool, otherwise "agent"
+
+chat_handler asks classify_fallback() only after router.classify() returned
+None.  A prediction is used when its neighbour vote share and similarity both
+clear the thresholds; anything else — queries with complex signals ("compare",
+"and also", ...), greetings and write routes such as todo_add — still goes to
+the agent.
+
+The training set is snapshotted to INTENT_MODEL_PATH (a few hundred KB of
+text) and indexed at load.  Without a snapshot the model trains itself in the
+background on first use.
+
+    python -m backend.intent_model --retrain [--no-db]   # rebuild the snapshot
+    python -m backend.intent_model --eval                # precision on held-out templates
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from pathlib import Path
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+MODEL_PATH = Path(os.getenv("INTENT_MODEL_PATH", str(Path.home() / ".langly_intent_model.json")))
+CORPUS_PATH = Path(__file__).parent / "bench" / "routing_corpus.jsonl"
+
+NGRAM_SIZES = (3, 4, 5)
+# --eval with templates held out: 31 of 206 rescuable misses rescued, 3 wrong
+# routes (one finance_budgets phrasing sent to finance_accounts).  Lower
+# thresholds trade more wrong routes for recall.
+K_NEIGHBOURS = 3
+MIN_CONFIDENCE = 0.75   # share of the neighbour vote for the winning route
+MIN_SIMILARITY = 0.5    # cosine similarity of its closest neighbour
+MAX_DF = 0.25           # n-grams in more docs than this are skipped at query time
+ACTIVITY_LIMIT = 5000
+LOAD_RETRY_SECONDS = 600   # after a failed background load, wait this long before retrying
+
+AGENT = "agent"
+
+# Routes the fallback may never pick, even when confident: writes stay with the
+# agent, greetings depend on position/length rules only the regex applies, and
+# multi needs per-clause params only classify() can build
+_NEVER_ROUTE = {"todo_add", "greeting", "multi"}
+
+# Single-tool agent runs that a fast route answers just as well
+_TOOL_ROUTES = {"Weather": "weather", "GetDateTime": "datetime", "StockPrice": "stocks"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+# ── Features ─────────────────────────────────────────────────────────────────
+
+def _features(text: str) -> Counter:
+    """Character n-grams within word boundaries, plus whole words."""
+    grams: Counter = Counter()
+    for word in _TOKEN_RE.findall(text.lower()):
+        grams["w:" + word] += 1
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+class IntentModel:
+    """TF-IDF (sublinear tf, L2-normalised) cosine kNN over labeled examples."""
+
+    def __init__(self, examples: list[tuple[str, str]]):
+        self.labels = [label for _, label in examples]
+        features = [_features(text) for text, _ in examples]
+        n_docs = len(examples)
+
+        df: Counter = Counter()
+        for grams in features:
+            df.update(grams.keys())
+        self.idf = {g: math.log((1 + n_docs) / (1 + d)) + 1 for g, d in df.items()}
+        self.common = {g for g, d in df.items() if d > MAX_DF * n_docs}
+
+        self.postings: dict = defaultdict(list)  # gram -> [(doc, weight)]
+        for doc, grams in enumerate(features):
+            vec = self._vector(grams)
+            for g, w in vec.items():
+                self.postings[g].append((doc, w))
+
+    def _vector(self, grams: Counter) -> dict:
+        vec = {g: (1 + math.log(tf)) * self.idf[g] for g, tf in grams.items() if g in self.idf}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        return {g: w / norm for g, w in vec.items()}
+
+    def predict(self, text: str) -> tuple[str, float, float]:
+        """Return (label, confidence, similarity) for the k nearest examples."""
+        scores: dict = defaultdict(float)
+        for g, qw in self._vector(_features(text)).items():
+            if g in self.common:
+                continue
+            for doc, dw in self.postings[g]:
+                scores[doc] += qw * dw
+        if not scores:
+            return AGENT, 0.0, 0.0
+
+        votes: dict = defaultdict(float)
+        best_sim: dict = {}
+        for doc, sim in heapq.nlargest(K_NEIGHBOURS, scores.items(), key=lambda kv: kv[1]):
+            label = self.labels[doc]
+            votes[label] += sim
+            best_sim[label] = max(best_sim.get(label, 0.0), sim)
+        label = max(votes, key=votes.get)
+        return label, votes[label] / sum(votes.values()), best_sim[label]
+
+
+# ── Training data ────────────────────────────────────────────────────────────
+
+def corpus_examples(path: Path = CORPUS_PATH) -> list[tuple[str, str, str]]:
+    """(id, query, route) for every labeled corpus row."""
+    rows = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                if "_meta" not in row:
+                    rows.append((str(row["id"]), row["query"], row["route"]))
+    return rows
+
+
+# The corpus is templated: one phrasing recurs with other cities, tickers or
+# tasks and with conversational wrappers ("hey, ...", "... real quick").
+# Evaluation holds out whole templates, so a test query's siblings are never
+# in the training folds.
+_WRAPPER_LEAD = ("can you tell me", "quick q", "langly", "hey", "ok", "so")
+_WRAPPER_TAIL = ("real quick", "right now", "for me", "please", "thanks")
+
+
+def _entities(params: dict) -> list[str]:
+    values = [params.get("location"), params.get("task"), *params.get("tickers", ())]
+    return [v.lower() for v in values if isinstance(v, str) and v]
+
+
+def template_key(query: str, params: dict) -> str:
+    """The query with its entities masked and wrappers, case and punctuation dropped."""
+    from backend.router import TICKER_NAME_MAP
+
+    text = query.lower()
+    for value in sorted(_entities(params), key=len, reverse=True):
+        text = text.replace(value, " <x> ")
+    words = [w if w not in TICKER_NAME_MAP else "<x>" for w in re.findall(r"[a-z0-9'<>+]+", text)]
+    text = " ".join(words)
+    for lead in _WRAPPER_LEAD:
+        if text.startswith(lead + " "):
+            text = text[len(lead) + 1:]
+            break
+    for tail in _WRAPPER_TAIL:
+        if text.endswith(" " + tail):
+            text = text[:-len(tail) - 1]
+            break
+    return text
+
+
+def corpus_templates(path: Path = CORPUS_PATH) -> dict[str, str]:
+    """id -> template_key() for every labeled corpus row."""
+    templates = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                if "_meta" not in row:
+                    templates[str(row["id"])] = template_key(row["query"], row.get("params") or {})
+    return templates
+
+
+def activity_examples(limit: int = ACTIVITY_LIMIT) -> list[tuple[str, str]]:
+    """(query, route) from logged chat traffic — see the module docstring for labels."""
+    from backend.db import query
+
+    rows = query(
+        "SELECT event_type, summary, metadata FROM activity_log "
+        "WHERE source = 'chat' AND event_type IN ('fast_query', 'query') "
+        "ORDER BY created_at DESC LIMIT %s",
+        (limit,),
+    )
+    examples = []
+    for row in rows:
+        text = row["summary"][3:] if row["summary"].startswith("Q: ") else row["summary"]
+        meta = row["metadata"] or {}
+        if not text.strip():
+            continue
+        if row["event_type"] == "fast_query":
+            # Skip our own predictions so the model doesn't train on itself
+            if meta.get("classifier") == "learned" or not meta.get("route"):
+                continue
+            examples.append((text, meta["route"]))
+        else:
+            tools = set(meta.get("tools") or [])
+            route = _TOOL_ROUTES.get(next(iter(tools))) if len(tools) == 1 else None
+            examples.append((text, route or AGENT))
+    return examples
+
+
+def _dedupe(examples: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """One example per normalised text, keeping its most common label."""
+    by_text: dict = defaultdict(Counter)
+    for text, label in examples:
+        key = " ".join(_TOKEN_RE.findall(text.lower()))
+        if key:
+            by_text[key][label] += 1
+    return [(text, labels.most_common(1)[0][0]) for text, labels in by_text.items()]
+
+
+def build_examples(use_db: bool = True) -> tuple[list[tuple[str, str]], dict]:
+    """Collect and dedupe training examples; returns (examples, source counts)."""
+    corpus = [(q, r) for _, q, r in corpus_examples()]
+    logged = []
+    if use_db:
+        try:
+            logged = activity_examples()
+        except Exception as e:
+            print(f"[INTENT] activity_log unavailable, training on corpus only: {e}", flush=True)
+    examples = _dedupe(corpus + logged)
+    return examples, {"corpus": len(corpus), "activity_log": len(logged), "examples": len(examples)}
+
+
+def retrain(use_db: bool = True, path: Path = MODEL_PATH) -> dict:
+    """Rebuild the training snapshot, swap in the new model and return its stats.
+
+    The model is used even if the snapshot can't be written (read-only home,
+    container FS); it is then retrained on the next process start.
+    """
+    examples, sources = build_examples(use_db)
+    _set_model(IntentModel(examples), sources)
+    snapshot = {"version": 1, "trainedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "sources": sources, "examples": examples}
+    try:
+        path.write_text(json.dumps(snapshot))
+    except OSError as e:
+        print(f"[INTENT] snapshot not saved to {path}: {e}", flush=True)
+    return sources
+
+
+# ── Runtime ──────────────────────────────────────────────────────────────────
+
+_model: IntentModel | None = None
+_model_info: dict = {}
+_model_lock = threading.Lock()
+_loading = False
+_retry_after = 0.0   # monotonic time before which a failed load isn't retried
+
+
+def _set_model(model: IntentModel, info: dict) -> None:
+    global _model, _model_info
+    with _model_lock:
+        _model, _model_info = model, info
+
+
+def _load() -> None:
+    global _loading, _retry_after
+    try:
+        if MODEL_PATH.exists():
+            snapshot = json.loads(MODEL_PATH.read_text())
+            _set_model(IntentModel([tuple(e) for e in snapshot["examples"]]), snapshot["sources"])
+        else:
+            retrain()
+        print(f"[INTENT] fallback model ready: {_model_info}", flush=True)
+    except Exception as e:
+        _retry_after = time.monotonic() + LOAD_RETRY_SECONDS
+        print(f"[INTENT] fallback model unavailable, retrying in {LOAD_RETRY_SECONDS}s: {e}", flush=True)
+    finally:
+        _loading = False
+
+
+def get_model() -> IntentModel | None:
+    """The loaded model, or None while it is still loading in the background."""
+    global _loading
+    if _model is None:
+        with _model_lock:
+            if _model is None and not _loading and time.monotonic() >= _retry_after:
+                _loading = True
+                threading.Thread(target=_load, daemon=True).start()
+    return _model
+
+
+def classify_fallback(message: str) -> dict | None:
+    """Route a query router.classify() missed, or None to use the agent.
+
+    Returns the same shape as classify() plus classifier="learned" and the
+    prediction's confidence and similarity.
+    """
+    from backend import router
+
+    model = get_model()
+    msg = message.strip()
+    if model is None or not msg or "complex" in router._scan(msg)[0]:
+        return None
+    route, confidence, similarity = model.predict(msg)
+    if (route == AGENT or route in _NEVER_ROUTE or route not in router.ROUTES
+            or confidence < MIN_CONFIDENCE or similarity < MIN_SIMILARITY):
+        return None
+
+    params: dict = {}
+    label = router.ROUTES[route]["label"]
+    if route == "weather":
+        params["location"] = router._extract_location(msg)
+        label = f"Weather: {params['location']}"
+    elif route == "stocks":
+        params["tickers"] = router._extract_tickers(msg)
+        if not params["tickers"]:
+            return None
+        label = f"Stocks: {', '.join(params['tickers'])}"
+    elif route == "news":
+        params["query"] = msg
+    elif route == "calendar_week":
+        days_match = re.search(r"next (\d+) days", msg.lower())
+        params["days"] = int(days_match.group(1)) if days_match else 7
+
+    return {"route": route, "params": params, "label": label, "classifier": "learned",
+            "confidence": round(confidence, 3), "similarity": round(similarity, 3)}
+
+
+# ── Evaluation / CLI ─────────────────────────────────────────────────────────
+
+def evaluate(folds: int = 5) -> dict:
+    """Cross-validate on the corpus by template, scoring held-out queries the regex router misses.
+
+    Each template (see template_key) falls in exactly one fold, so no query
+    is tested against a training copy of itself with another city or wrapper.
+    """
+    from backend import router
+
+    rows = corpus_examples()
+    templates = corpus_templates()
+    fold_of = {i: zlib.crc32(templates[i].encode()) % folds for i, _, _ in rows}
+    outcome: Counter = Counter()
+    tested = 0
+    global _model
+    saved = _model
+    try:
+        for fold in range(folds):
+            train = [(q, r) for i, q, r in rows if fold_of[i] != fold]
+            test = [(q, r) for i, q, r in rows if fold_of[i] == fold and router.classify(q) is None]
+            _set_model(IntentModel(_dedupe(train)), {})
+            tested += len(test)
+            for q, expected in test:
+                info = classify_fallback(q)
+                actual = info["route"] if info else AGENT
+                if actual == AGENT:
+                    outcome["rescuable_missed" if expected != AGENT else "agent_kept"] += 1
+                elif actual == expected:
+                    outcome["rescued"] += 1
+                else:
+                    outcome["wrong_route"] += 1
+    finally:
+        _model = saved
+
+    routed = outcome["rescued"] + outcome["wrong_route"]
+    rescuable = routed + outcome["rescuable_missed"]
+    return {
+        "folds": folds,
+        "templates": len(set(templates.values())),
+        "heldout_fallthroughs": tested,
+        **outcome,
+        "precision": round(outcome["rescued"] / routed, 3) if routed else None,
+        "rescue_rate": round(outcome["rescued"] / rescuable, 3) if rescuable else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--retrain", action="store_true", help=f"rebuild the snapshot at {MODEL_PATH}")
+    parser.add_argument("--no-db", action="store_true", help="train on the corpus only")
+    parser.add_argument("--eval", action="store_true", help="cross-validate on held-out corpus templates")
+    args = parser.parse_args(argv)
+
+    if args.retrain:
+        print(f"retrained: {retrain(use_db=not args.no_db)} -> {MODEL_PATH}")
+    if args.eval:
+        print(json.dumps(evaluate(), indent=2))
+    if not (args.retrain or args.eval):
+        parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
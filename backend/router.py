@@ -7,30 +7,82 @@ Falls back to the full agent for complex/ambiguous queries.
 from __future__ import annotations
 
 import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
+from itertools import chain
 
 # Default location for weather when none specified
 DEFAULT_LOCATION = "Morristown, NJ"
 
-# ── Pattern definitions ──────────────────────────────────────────────────────
-
-GREETING_PATTERNS = re.compile(
-    r"^(hey|hi|hello|howdy|yo|sup|what'?s up|good (morning|afternoon|evening)|greetings)\b",
-    re.IGNORECASE,
-)
-
-WEATHER_PATTERNS = re.compile(
-    r"\b(weather|temperature|temp|forecast|rain|snow|sunny|cloudy|humid|wind)\b",
-    re.IGNORECASE,
-)
-
-STOCK_PATTERNS = re.compile(
-    r"\b(stock|stocks|price|ticker|market|share|shares|portfolio|watchlist)\b",
-    re.IGNORECASE,
-)
-
-# Match explicit tickers like AAPL, TSLA — 1-5 uppercase letters
-TICKER_RE = re.compile(r"\b([A-Z]{1,5})\b")
+# ── Intent vocabulary ────────────────────────────────────────────────────────
+#
+# Every keyword the router cares about, grouped by tag.  All tags are compiled
+# into a single alternation (_INTENT_SCANNER) so classify() walks the message
+# once and collects every hit; the priority order between intents lives in
+# classify() itself.  Keep fragments free of capturing groups.
+
+_INTENT_VOCAB = {
+    # Signals that the query is complex and needs the full agent
+    "complex": (
+        r"compare", r"analyze", r"explain", r"why", r"how does", r"write", r"create a",
+        r"generate", r"summarize", r"translate", r"search the web", r"look up", r"find me",
+        r"research", r"calculate", r"convert", r"send email", r"and also", r"and then",
+        r"after that", r"help me",
+    ),
+    # Only honoured when the hit starts the message (see classify)
+    "greeting": (
+        r"hey", r"hi", r"hello", r"howdy", r"yo", r"sup", r"what'?s up",
+        r"good (?:morning|afternoon|evening)", r"greetings",
+    ),
+    "time": (
+        r"what time", r"current time", r"date and time", r"what date", r"today'?s date", r"what day",
+    ),
+    "weather": (
+        r"weather", r"temperature", r"temp", r"forecast", r"rain", r"snow", r"sunny", r"cloudy",
+        r"humid", r"wind",
+    ),
+    "stock": (
+        r"stock", r"stocks", r"price", r"ticker", r"market", r"share", r"shares", r"portfolio",
+        r"watchlist",
+    ),
+    "watchlist": (r"my stocks", r"my portfolio", r"watchlist"),
+    "todo": (r"todos?", r"to-?dos?", r"tasks?", r"todo list", r"task list"),
+    # "add <task> to my todos" / "todo ... add"
+    "todo_verb": (r"add", r"create", r"new", r"make"),
+    "todo_verb_after": (r"add", r"create"),
+    "todo_noun": (r"todos?", r"to-?dos?", r"tasks?"),
+    "notes": (r"notes?", r"notebook"),
+    "system": (r"system (?:status|info|stats)", r"cpu", r"memory", r"disk", r"uptime"),
+    "news": (
+        r"news", r"headline", r"headlines", r"digest", r"briefing", r"brief me",
+        r"what'?s happening", r"current events",
+    ),
+    "calendar": (
+        r"calendar", r"schedule", r"agenda", r"event", r"events", r"appointment", r"appointments",
+        r"what'?s\s+on", r"what'?s\s+happening", r"family\s+schedule", r"sebby'?s\s+schedule",
+        r"kindora", r"upcoming\s+events?", r"today'?s\s+(?:schedule|agenda|events?)",
+    ),
+    # "schedule a visit" / "meeting ... book" — writes go to the agent
+    "calendar_verb": (r"add", r"create", r"schedule", r"book", r"set up", r"plan"),
+    "calendar_verb_after": (r"add", r"create", r"schedule", r"book"),
+    "calendar_noun": (r"event", r"appointment", r"meeting", r"visit"),
+    "calendar_today": (r"today", r"this morning", r"tonight", r"today'?s"),
+    "calendar_week": (r"this week", r"next few days", r"upcoming", r"next \d+ days"),
+    "calendar_family": (r"family\s*members?", r"who'?s\s+in"),
+    "finance": (
+        r"net\s*worth", r"balance", r"balances", r"bank", r"banks", r"account", r"accounts",
+        r"budget", r"budgets", r"spending", r"expenses?", r"income", r"cashflow", r"cash\s*flow",
+        r"savings?", r"recurring", r"subscriptions?", r"bills?", r"credit\s*card", r"mortgage",
+        r"loan", r"personal\s*financ", r"monarch", r"how\s*much\s+(?:do\s+i|money)",
+    ),
+    "finance_budgets": (r"budget", r"spending", r"expenses?"),
+    "finance_transactions": (r"transaction", r"recent\s*(?:charges?|purchases?)"),
+    "finance_overview": (r"cashflow", r"cash\s*flow", r"income", r"savings?"),
+}
 
 # Known tickers for matching in natural language
 KNOWN_TICKERS = {
@@ -50,64 +102,137 @@ TICKER_NAME_MAP = {
     "walmart": "WMT", "target": "TGT", "visa": "V", "mastercard": "MA",
 }
 
-TODO_PATTERNS = re.compile(
-    r"\b(todos?|to-?dos?|tasks?|todo list|task list)\b",
-    re.IGNORECASE,
-)
 
-TODO_ADD_PATTERNS = re.compile(
-    r"\b(add|create|new|make)\b.+\b(todos?|to-?dos?|tasks?)\b|\b(todos?|to-?dos?|tasks?)\b.+\b(add|create)\b",
-    re.IGNORECASE,
-)
+def _longest_first(fragments) -> list:
+    # Longest first so the scanner prefers "today's schedule" over "today"
+    return sorted(set(fragments), key=lambda f: (-len(f), f))
 
-NOTES_PATTERNS = re.compile(
-    r"\b(notes?|notebook)\b",
-    re.IGNORECASE,
-)
 
-TIME_PATTERNS = re.compile(
-    r"\b(what time|current time|date and time|what date|today'?s date|what day)\b",
-    re.IGNORECASE,
-)
+def _build_scanner_source(keywords, substrings) -> str:
+    """Compile keyword and substring fragments into one first-character trie.
 
-SYSTEM_PATTERNS = re.compile(
-    r"\b(system (status|info|stats)|cpu|memory|disk|uptime)\b",
-    re.IGNORECASE,
+    Keywords are word-bounded; substrings (company names) match anywhere.
+    Every top-level branch starts with a literal, so sre can skip straight to
+    candidate positions instead of trying the alternation at every character.
+    The leading word boundary is a lookbehind placed after that literal.
+    """
+    groups: dict = {}
+    for fragment in _longest_first(keywords):
+        groups.setdefault(fragment[0], ([], []))[0].append(fragment[1:])
+    for fragment in _longest_first(substrings):
+        groups.setdefault(fragment[0], ([], []))[1].append(fragment[1:])
+    branches = []
+    for first, (kw_rests, sub_rests) in sorted(groups.items()):
+        options = []
+        if kw_rests:
+            options.append(r"(?<!\w.)(?:" + "|".join(kw_rests) + r")\b")
+        options.extend(sub_rests)
+        branches.append(re.escape(first) + "(?:" + "|".join(options) + ")")
+    return "|".join(branches)
+
+
+# One pattern for every keyword, ticker symbol and company name.  ASCII
+# messages are lowercased and scanned case-sensitively, which keeps sre's
+# literal fast paths; anything else goes through the IGNORECASE twin.
+_SCANNER_SOURCE = _build_scanner_source(
+    [f for frags in _INTENT_VOCAB.values() for f in frags] + [t.lower() for t in KNOWN_TICKERS],
+    [re.escape(name) for name in TICKER_NAME_MAP],
 )
+_INTENT_SCANNER = re.compile(_SCANNER_SOURCE)
+_INTENT_SCANNER_I = re.compile(_SCANNER_SOURCE, re.IGNORECASE)
+
+# Per-tag patterns, used once per distinct keyword to find every tag it implies
+# (e.g. "today's schedule" is calendar, calendar_today and a calendar_verb).
+_TAG_PATTERNS = {
+    tag: re.compile(r"\b(?:" + "|".join(_longest_first(frags)) + r")\b", re.IGNORECASE)
+    for tag, frags in _INTENT_VOCAB.items()
+}
 
-NEWS_PATTERNS = re.compile(
-    r"\b(news|headline|headlines|digest|briefing|brief me|what'?s happening|current events)\b",
-    re.IGNORECASE,
-)
+_NAME_ORDER = {name: i for i, name in enumerate(TICKER_NAME_MAP)}
 
-CALENDAR_PATTERNS = re.compile(
-    r"\b(calendar|schedule|agenda|event|events|appointment|appointments|"
-    r"what'?s\s+on|what'?s\s+happening|family\s+schedule|sebby'?s\s+schedule|"
-    r"kindora|upcoming\s+events?|today'?s\s+(?:schedule|agenda|events?))\b",
-    re.IGNORECASE,
-)
+_keyword_info: dict = {}
+_KEYWORD_INFO_MAX = 2048
 
-CALENDAR_ADD_PATTERNS = re.compile(
-    r"\b(add|create|schedule|book|set up|plan)\b.+\b(event|appointment|meeting|visit)\b|"
-    r"\b(event|appointment|meeting|visit)\b.+\b(add|create|schedule|book)\b",
-    re.IGNORECASE,
-)
 
-FINANCE_PATTERNS = re.compile(
-    r"\b(net\s*worth|balance|balances|bank|banks|account|accounts|budget|budgets|"
-    r"spending|expenses?|income|cashflow|cash\s*flow|savings?|"
-    r"recurring|subscriptions?|bills?|credit\s*card|mortgage|loan|"
-    r"personal\s*financ|monarch|how\s*much\s+(?:do\s+i|money))\b",
-    re.IGNORECASE,
-)
+def _keyword_tags(keyword: str) -> tuple[tuple, tuple]:
+    """Return (tags, company names) implied by a matched keyword (memoized)."""
+    info = _keyword_info.get(keyword)
+    if info is None:
+        tags = tuple(
+            tag for tag, pattern in _TAG_PATTERNS.items()
+            if (pattern.match(keyword) if tag == "greeting" else pattern.search(keyword))
+        )
+        info = (tags, tuple(n for n in TICKER_NAME_MAP if n in keyword))
+        if len(_keyword_info) < _KEYWORD_INFO_MAX:
+            _keyword_info[keyword] = info
+    return info
+
+
+def _scan(message: str) -> tuple[dict, list[str]]:
+    """Single pass over the message.
+
+    Returns (hits, tickers) where hits maps tag -> list of (start, end) spans.
+    The search resumes one character after each hit, so overlapping keywords
+    ("what's happening" vs "happening") are all reported.
+    """
+    hits, tickers, _ = _scan_spans(message)
+    return hits, tickers
 
-# Signals that the query is complex and needs the full agent
-COMPLEX_SIGNALS = re.compile(
-    r"\b(compare|analyze|explain|why|how does|write|create a|generate|summarize|translate|"
-    r"search the web|look up|find me|research|calculate|convert|send email|"
-    r"and also|and then|after that|help me)\b",
-    re.IGNORECASE,
-)
+
+def _tickers_from(names, symbols) -> list[str]:
+    tickers = []
+    if names:
+        tickers = [TICKER_NAME_MAP[n] for n in sorted(names, key=_NAME_ORDER.__getitem__)]
+    if symbols:
+        for symbol in symbols:
+            if symbol not in tickers:
+                tickers.append(symbol)
+    return tickers
+
+
+def _scan_spans(message: str) -> tuple[dict, list[str], list]:
+    """_scan() plus where each ticker came from: [(start, company names, symbol or None)]."""
+    if message.isascii():
+        text, search = message.lower(), _INTENT_SCANNER.search
+    else:
+        text, search = message, _INTENT_SCANNER_I.search
+
+    hits: dict = {}
+    names = None
+    symbols = None
+    ticker_spans = []
+    m = search(text)
+    while m is not None:
+        span = m.span()
+        keyword = m.group()
+        tags, contained = _keyword_info.get(keyword) or _keyword_tags(keyword.lower())
+        for tag in tags:
+            if tag in hits:
+                hits[tag].append(span)
+            else:
+                hits[tag] = [span]
+        symbol = None
+        if contained:
+            names = names.union(contained) if names else set(contained)
+        if len(keyword) <= 5:
+            original = message[span[0]:span[1]]
+            if original in KNOWN_TICKERS:
+                symbol = original
+                symbols = (symbols or []) + [original]
+        if contained or symbol:
+            ticker_spans.append((span[0], contained, symbol))
+        m = search(text, span[0] + 1)
+
+    return hits, _tickers_from(names, symbols), ticker_spans
+
+
+def _followed_by(message: str, hits: dict, first: str, then: str) -> bool:
+    """True when a `first` keyword precedes a `then` keyword on the same line."""
+    for _, end in hits.get(first, ()):
+        for start, _ in hits.get(then, ()):
+            if end < start and "\n" not in message[end:start]:
+                return True
+    return False
 
 
 def _extract_location(message: str) -> str:
@@ -127,21 +252,7 @@ def _extract_location(message: str) -> str:
 
 def _extract_tickers(message: str) -> list[str]:
     """Extract stock tickers from the message."""
-    tickers = []
-
-    # Check for known company names
-    lower = message.lower()
-    for name, ticker in TICKER_NAME_MAP.items():
-        if name in lower:
-            tickers.append(ticker)
-
-    # Check for uppercase ticker symbols
-    for match in TICKER_RE.finditer(message):
-        candidate = match.group(1)
-        if candidate in KNOWN_TICKERS and candidate not in tickers:
-            tickers.append(candidate)
-
-    return tickers
+    return _scan(message)[1]
 
 
 def _extract_todo_task(message: str) -> str | None:
@@ -169,87 +280,483 @@ def classify(message: str) -> dict | None:
         route: str — the fast-path handler name
         params: dict — extracted parameters
         label: str — human-readable description for the UI
+
+    Compound questions ("weather and my calendar today") come back as the
+    "multi" route with one route_info per intent in params["routes"].
     """
     msg = message.strip()
+    hits, tickers, ticker_spans = _scan_spans(msg)
+
+    if _maybe_compound(msg, hits, tickers):
+        route_info = _classify_compound(msg, hits, ticker_spans)
+        if route_info is _NEEDS_AGENT:
+            return None
+        if route_info is not None:
+            return route_info
 
     # If the message has complex signals, always use the full agent
-    if COMPLEX_SIGNALS.search(msg):
+    if "complex" in hits:
+        return None
+
+    for hook in _CLASSIFIER_HOOKS:
+        route_info = hook(msg, hits, tickers)
+        if route_info is not None:
+            return route_info
+    return None
+
+
+def _classify_single(message: str) -> dict | None:
+    """classify() without compound handling — one route per message."""
+    msg = message.strip()
+    hits, tickers = _scan(msg)
+    if "complex" in hits:
+        return None
+    for hook in _CLASSIFIER_HOOKS:
+        route_info = hook(msg, hits, tickers)
+        if route_info is not None:
+            return route_info
+    return None
+
+
+# ── Compound (multi-intent) queries ──────────────────────────────────────────
+#
+# A message that mentions two or more intent families is split on
+# conjunctions and each clause classified on its own, reusing the spans of
+# the message's single scan.  When every clause resolves and at least two
+# resolve to different routes, the message becomes a "multi" route.  If any
+# clause doesn't ("..., and email Bob the report") the whole message goes to
+# the agent rather than silently dropping that part.  A comma followed by a
+# capitalized word ("Austin, TX") continues a location and doesn't split.
+# "and also" is a complex signal only because it used to chain requests the
+# router couldn't split.
+
+_INTENT_FAMILIES = {
+    "time": "time", "weather": "weather", "stock": "stock", "watchlist": "stock",
+    "todo": "todo", "todo_noun": "todo", "notes": "notes", "system": "system",
+    "news": "news", "calendar": "calendar", "finance": "finance",
+}
+_COMPOUND_SPLIT = re.compile(
+    r"(?:,(?!\s*(?-i:[A-Z]))|[;&+]|\band also\b|\bas well as\b|\bplus\b|\band\b)\s*", re.IGNORECASE)
+_COMPOUND_HINTS = (",", ";", "&", "+", "and", "plus", "as well as")  # cheaper than a regex miss
+_MULTI_MAX_ROUTES = 4
+_NEEDS_AGENT = object()  # _classify_compound: a clause the fast path can't answer
+
+
+def _maybe_compound(msg: str, hits: dict, tickers: list) -> bool:
+    """Cheap pre-check: two intent families, and no complex signal but "and also"."""
+    families = {_INTENT_FAMILIES[tag] for tag in hits if tag in _INTENT_FAMILIES}
+    if tickers:
+        families.add("stock")
+    if len(families) < 2:
+        return False
+    return all(msg[start:end].lower() == "and also" for start, end in hits.get("complex", ()))
+
+
+def _clause_routes(msg: str, hits: dict, ticker_spans: list, separators):
+    """Route each clause from the message's own scan; yields route_info or None per clause."""
+    start = 0
+    for sep in chain(separators, (None,)):
+        clause = msg[start:sep.start() if sep is not None else len(msg)].rstrip()
+        end = start + len(clause)
+        if clause:
+            clause_hits = {}
+            for tag, spans in hits.items():
+                inside = [(s - start, e - start) for s, e in spans if start <= s and e <= end]
+                if inside:
+                    clause_hits[tag] = inside
+            names, symbols = set(), []
+            for pos, contained, symbol in ticker_spans:
+                if start <= pos < end:
+                    names.update(contained)
+                    if symbol:
+                        symbols.append(symbol)
+            route_info = None
+            if "complex" not in clause_hits:
+                tickers = _tickers_from(names, symbols)
+                for hook in _CLASSIFIER_HOOKS:
+                    route_info = hook(clause, clause_hits, tickers)
+                    if route_info is not None:
+                        break
+            yield route_info
+        if sep is not None:
+            start = sep.end()
+
+
+def _classify_compound(msg: str, hits: dict, ticker_spans: list):
+    """A "multi" route_info, None if not compound, or _NEEDS_AGENT if a clause is unroutable."""
+    lowered = msg.lower()
+    if not any(hint in lowered for hint in _COMPOUND_HINTS):
+        return None
+    separators = _COMPOUND_SPLIT.finditer(msg)
+    first = next(separators, None)
+    if first is None:
+        return None
+    routes: list = []
+    for route_info in _clause_routes(msg, hits, ticker_spans, chain((first,), separators)):
+        if route_info is None:
+            return _NEEDS_AGENT
+        if route_info["route"] in ("greeting", "multi"):
+            continue
+        same = next((r for r in routes if r["route"] == route_info["route"]), None)
+        if same is None:
+            routes.append(route_info)
+        elif route_info["route"] == "stocks":
+            # "AAPL and my portfolio, plus TSLA" — one quote batch
+            merged = list(dict.fromkeys(same["params"]["tickers"] + route_info["params"]["tickers"]))
+            same["params"]["tickers"] = merged
+            same["label"] = f"Stocks: {', '.join(merged)}"
+    if len(routes) < 2 or len(routes) > _MULTI_MAX_ROUTES:
         return None
+    return {"route": "multi", "params": {"routes": routes}, "label": " + ".join(r["label"] for r in routes)}
 
+
+# ── Classifier hooks ─────────────────────────────────────────────────────────
+#
+# One hook per intent family, tried in ROUTES order (first registered wins).
+# A hook gets the stripped message plus the scanner's hits and tickers and
+# returns a route_info dict, or None to let later hooks try.
+
+def _route_info(route: str, params: dict | None = None, label: str | None = None) -> dict:
+    return {"route": route, "params": params or {}, "label": label or ROUTES[route]["label"]}
+
+
+def _classify_greeting(msg: str, hits: dict, tickers: list) -> dict | None:
     # Very short greetings — instant response, no tools needed
-    if GREETING_PATTERNS.match(msg) and len(msg.split()) <= 5:
-        return {"route": "greeting", "params": {}, "label": "Greeting"}
+    if "greeting" in hits and hits["greeting"][0][0] == 0 and len(msg.split()) <= 5:
+        return _route_info("greeting")
+    return None
+
 
-    # Date/time
-    if TIME_PATTERNS.search(msg):
-        return {"route": "datetime", "params": {}, "label": "Date & Time"}
+def _classify_datetime(msg: str, hits: dict, tickers: list) -> dict | None:
+    return _route_info("datetime") if "time" in hits else None
 
-    # Weather
-    if WEATHER_PATTERNS.search(msg):
+
+def _classify_weather(msg: str, hits: dict, tickers: list) -> dict | None:
+    if "weather" in hits:
         location = _extract_location(msg)
-        return {"route": "weather", "params": {"location": location}, "label": f"Weather: {location}"}
-
-    # Stock queries — match on keywords OR when a known ticker/company name appears
-    tickers = _extract_tickers(msg)
-    has_stock_keywords = STOCK_PATTERNS.search(msg)
-    if has_stock_keywords or tickers:
-        if tickers:
-            return {"route": "stocks", "params": {"tickers": tickers}, "label": f"Stocks: {', '.join(tickers)}"}
-        # General "how are my stocks" → use watchlist
-        if re.search(r"\b(my stocks|my portfolio|watchlist)\b", msg, re.IGNORECASE):
-            return {"route": "watchlist", "params": {}, "label": "Watchlist"}
-
-    # Add todo
-    if TODO_ADD_PATTERNS.search(msg):
+        return _route_info("weather", {"location": location}, f"Weather: {location}")
+    return None
+
+
+def _classify_stocks(msg: str, hits: dict, tickers: list) -> dict | None:
+    # Match on keywords OR when a known ticker/company name appears
+    if tickers:
+        return _route_info("stocks", {"tickers": tickers}, f"Stocks: {', '.join(tickers)}")
+    # General "how are my stocks" → use watchlist
+    if "stock" in hits and "watchlist" in hits:
+        return _route_info("watchlist")
+    return None
+
+
+def _classify_todos(msg: str, hits: dict, tickers: list) -> dict | None:
+    todo_add = "todo_noun" in hits and (
+        _followed_by(msg, hits, "todo_verb", "todo_noun")
+        or _followed_by(msg, hits, "todo_noun", "todo_verb_after")
+    )
+    if todo_add:
         task_text = _extract_todo_task(msg)
         if task_text:
-            return {"route": "todo_add", "params": {"task": task_text}, "label": f"Add todo: {task_text}"}
-
-    # List todos
-    if TODO_PATTERNS.search(msg) and not TODO_ADD_PATTERNS.search(msg):
-        return {"route": "todo_list", "params": {}, "label": "Todos"}
-
-    # Notes
-    if NOTES_PATTERNS.search(msg):
-        return {"route": "note_list", "params": {}, "label": "Notes"}
-
-    # System info
-    if SYSTEM_PATTERNS.search(msg):
-        return {"route": "system", "params": {}, "label": "System Info"}
-
-    # News / briefings
-    if NEWS_PATTERNS.search(msg):
-        return {"route": "news", "params": {"query": msg}, "label": "News Digest"}
-
-    # Family calendar — Kindora
-    if CALENDAR_PATTERNS.search(msg) and not CALENDAR_ADD_PATTERNS.search(msg):
-        lower = msg.lower()
-        if re.search(r"\b(today|this morning|tonight|today'?s)\b", lower):
-            return {"route": "calendar_today", "params": {}, "label": "Today's Calendar"}
-        if re.search(r"\b(this week|next few days|upcoming|next \d+ days)\b", lower):
-            days_match = re.search(r"next (\d+) days", lower)
-            days = int(days_match.group(1)) if days_match else 7
-            return {"route": "calendar_week", "params": {"days": days}, "label": "Upcoming Events"}
-        if re.search(r"\b(family\s*members?|who'?s\s+in)\b", lower):
-            return {"route": "calendar_family", "params": {}, "label": "Family Members"}
-        # Default: today's events
-        return {"route": "calendar_today", "params": {}, "label": "Today's Calendar"}
+            return _route_info("todo_add", {"task": task_text}, f"Add todo: {task_text}")
+        return None
+    return _route_info("todo_list") if "todo" in hits else None
+
+
+def _classify_notes(msg: str, hits: dict, tickers: list) -> dict | None:
+    return _route_info("note_list") if "notes" in hits else None
+
 
+def _classify_system(msg: str, hits: dict, tickers: list) -> dict | None:
+    return _route_info("system") if "system" in hits else None
+
+
+def _classify_news(msg: str, hits: dict, tickers: list) -> dict | None:
+    return _route_info("news", {"query": msg}) if "news" in hits else None
+
+
+def _classify_calendar(msg: str, hits: dict, tickers: list) -> dict | None:
+    # Family calendar — Kindora; "schedule a visit" style writes go to the agent
+    if "calendar" not in hits or (
+        "calendar_noun" in hits and (
+            _followed_by(msg, hits, "calendar_verb", "calendar_noun")
+            or _followed_by(msg, hits, "calendar_noun", "calendar_verb_after")
+        )
+    ):
+        return None
+    if "calendar_today" in hits:
+        return _route_info("calendar_today")
+    if "calendar_week" in hits:
+        days_match = re.search(r"next (\d+) days", msg.lower())
+        return _route_info("calendar_week", {"days": int(days_match.group(1)) if days_match else 7})
+    if "calendar_family" in hits:
+        return _route_info("calendar_family")
+    # Default: today's events
+    return _route_info("calendar_today")
+
+
+def _classify_finance(msg: str, hits: dict, tickers: list) -> dict | None:
     # Personal finance — Monarch Money
-    if FINANCE_PATTERNS.search(msg):
-        lower = msg.lower()
-        if re.search(r"\b(budget|spending|expenses?)\b", lower):
-            return {"route": "finance_budgets", "params": {}, "label": "Budgets"}
-        if re.search(r"\b(transaction|recent\s*(charges?|purchases?))\b", lower):
-            return {"route": "finance_transactions", "params": {}, "label": "Transactions"}
-        if re.search(r"\b(cashflow|cash\s*flow|income|savings?)\b", lower):
-            return {"route": "finance_overview", "params": {}, "label": "Financial Overview"}
-        # Default: accounts + net worth
-        return {"route": "finance_accounts", "params": {}, "label": "Accounts & Net Worth"}
+    if "finance" not in hits:
+        return None
+    if "finance_budgets" in hits:
+        return _route_info("finance_budgets")
+    if "finance_transactions" in hits:
+        return _route_info("finance_transactions")
+    if "finance_overview" in hits:
+        return _route_info("finance_overview")
+    # Default: accounts + net worth
+    return _route_info("finance_accounts")
+
+
+# ── Fast-path response cache ─────────────────────────────────────────────────
+#
+# Results are cached per (route, normalized params) with a route-specific TTL
+# in a bounded LRU.  Routes missing from FAST_CACHE_TTLS (greeting, datetime,
+# todos, notes, system) are never cached.  Only complete results are stored —
+# handler error paths, stocks with a failed ticker, and digests with a late or
+# failed section are served once and refetched next time.  Writes clear the
+# routes of the data domain they touch, named as in answer_cache.invalidate().
+
+FAST_CACHE_TTLS = {
+    "weather": 600,
+    "stocks": 30,
+    "watchlist": 30,
+    "news": 900,
+    "calendar_today": 120,
+    "calendar_week": 120,
+    "calendar_family": 120,
+    "finance_accounts": 300,
+    "finance_transactions": 300,
+    "finance_budgets": 300,
+    "finance_overview": 300,
+}
+FAST_CACHE_MAX = 256
+
+# Data domain -> the routes whose results depend on it
+FAST_CACHE_DOMAINS = {
+    "calendar": ("calendar_today", "calendar_week", "calendar_family"),
+    "finance": ("finance_accounts", "finance_transactions", "finance_budgets", "finance_overview"),
+}
+
+# Params that change the answer; anything else (e.g. the news "query", which is
+# just the raw message) is left out of the key.
+_CACHE_KEY_PARAMS = {
+    "weather": ("location",),
+    "stocks": ("tickers",),
+    "calendar_week": ("days",),
+}
+
+_fast_cache: OrderedDict = OrderedDict()  # key -> (expires_at, result)
+_fast_cache_lock = threading.Lock()
+_fast_cache_counts: dict = {}  # route -> {"hits": n, "misses": n}
+
+
+def _normalize_param(value):
+    if isinstance(value, str):
+        return " ".join(value.lower().replace(",", " ").split())
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize_param(v) for v in value)
+    return value
+
+
+def _cache_key(route_info: dict) -> tuple | None:
+    route = route_info["route"]
+    if route not in FAST_CACHE_TTLS:
+        return None
+    params = route_info.get("params", {})
+    return (route,) + tuple(_normalize_param(params.get(name)) for name in _CACHE_KEY_PARAMS.get(route, ()))
+
+
+def _is_complete(result: dict) -> bool:
+    """False for results that should not outlive this request."""
+    data = result.get("data")
+    if data == {} or not result.get("response") or _result_error(result):
+        return False
+    # Digest sections served from the fallback (late or cached) should refetch
+    return not (isinstance(data, dict) and any(s.get("status") != "ok" for s in data.get("sections", ())))
+
+
+def _cache_get(key: tuple | None) -> dict | None:
+    if key is None:
+        return None
+    now = time.monotonic()
+    with _fast_cache_lock:
+        counts = _fast_cache_counts.setdefault(key[0], {"hits": 0, "misses": 0})
+        entry = _fast_cache.get(key)
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                del _fast_cache[key]
+            counts["misses"] += 1
+            return None
+        _fast_cache.move_to_end(key)
+        counts["hits"] += 1
+        return {**entry[1], "cached": True}
+
+
+def _cache_put(key: tuple | None, result: dict) -> None:
+    if key is None or not _is_complete(result):
+        return
+    with _fast_cache_lock:
+        _fast_cache[key] = (time.monotonic() + FAST_CACHE_TTLS[key[0]], result)
+        _fast_cache.move_to_end(key)
+        while len(_fast_cache) > FAST_CACHE_MAX:
+            _fast_cache.popitem(last=False)
+
+
+def clear_fast_cache(*names: str) -> None:
+    """Drop cached results — all of them, or those of the given routes or data domains.
+
+    Call it next to answer_cache.invalidate() after a write, with the same
+    domain: clear_fast_cache("calendar").
+    """
+    with _fast_cache_lock:
+        if not names:
+            _fast_cache.clear()
+            return
+        routes = {r for name in names for r in FAST_CACHE_DOMAINS.get(name, (name,))}
+        for key in [k for k in _fast_cache if k[0] in routes]:
+            del _fast_cache[key]
+
+
+def fast_cache_stats() -> dict:
+    """Size and hit/miss counters, overall and per route."""
+    with _fast_cache_lock:
+        routes = {route: dict(c) for route, c in sorted(_fast_cache_counts.items())}
+        size = len(_fast_cache)
+    hits = sum(c["hits"] for c in routes.values())
+    misses = sum(c["misses"] for c in routes.values())
+    return {
+        "size": size,
+        "maxSize": FAST_CACHE_MAX,
+        "hits": hits,
+        "misses": misses,
+        "hitRate": round(hits / (hits + misses), 3) if hits + misses else None,
+        "routes": routes,
+    }
 
+
+# ── Route instrumentation ────────────────────────────────────────────────────
+#
+# Per-route call counts, cache hits, upstream errors, a latency histogram for
+# calls that reached the upstream, and fall-throughs (fast path raised, so the
+# agent answered instead).  Queries classify() sends to the agent are counted
+# by the intent tags they did hit, with a few recent examples, to show which
+# fast paths are missing.  Served at /api/system/router-stats.
+
+_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+_BUCKET_LABELS = [f"<={b}ms" for b in _LATENCY_BUCKETS_MS] + [f">{_LATENCY_BUCKETS_MS[-1]}ms"]
+_UNROUTED_SAMPLES = 25
+
+_stats_lock = threading.Lock()
+_route_stats: dict = {}  # route -> counters
+_unrouted = {"total": 0, "complex": 0, "noIntent": 0, "byTag": Counter(), "recent": deque(maxlen=_UNROUTED_SAMPLES)}
+
+
+def _route_counters(route: str) -> dict:
+    counters = _route_stats.get(route)
+    if counters is None:
+        counters = _route_stats[route] = {
+            "calls": 0, "cacheHits": 0, "errors": 0, "fallthroughs": 0,
+            "totalMs": 0.0, "maxMs": 0.0, "buckets": [0] * (len(_LATENCY_BUCKETS_MS) + 1),
+        }
+    return counters
+
+
+def _result_error(result: dict) -> bool:
+    """True when the handler reported an upstream failure (see the "error" key)."""
+    if result.get("error"):
+        return True
+    data = result.get("data")
+    if isinstance(data, dict):
+        return bool(data.get("errors")) or any(s.get("status") == "error" for s in data.get("sections", ()))
+    return isinstance(data, list) and any(isinstance(d, dict) and d.get("error") for d in data)
+
+
+def _record_call(route: str, ms: float = 0.0, error: bool = False, cached: bool = False) -> None:
+    with _stats_lock:
+        counters = _route_counters(route)
+        counters["calls"] += 1
+        if cached:
+            counters["cacheHits"] += 1
+            return
+        counters["errors"] += bool(error)
+        counters["totalMs"] += ms
+        counters["maxMs"] = max(counters["maxMs"], ms)
+        counters["buckets"][bisect_left(_LATENCY_BUCKETS_MS, ms)] += 1
+
+
+def _timed(route: str, executor, params: dict) -> dict:
+    started = time.monotonic()
+    try:
+        result = executor(params)
+    except Exception:
+        _record_call(route, ms=(time.monotonic() - started) * 1000, error=True)
+        raise
+    _record_call(route, ms=(time.monotonic() - started) * 1000, error=_result_error(result))
+    return result
+
+
+def record_fallthrough(route: str) -> None:
+    """Count a fast-path failure that sent the query on to the agent."""
+    with _stats_lock:
+        _route_counters(route)["fallthroughs"] += 1
+
+
+def record_unrouted(message: str) -> None:
+    """Count a query classify() left to the agent, by the intent tags it hit."""
+    hits, tickers = _scan(message.strip())
+    tags = sorted(tag for tag in hits if tag != "complex") + (["ticker"] if tickers else [])
+    with _stats_lock:
+        _unrouted["total"] += 1
+        if "complex" in hits:
+            _unrouted["complex"] += 1
+        elif not tags:
+            _unrouted["noIntent"] += 1
+        _unrouted["byTag"].update(tags)
+        _unrouted["recent"].append({"query": message[:120], "tags": tags, "complex": "complex" in hits})
+
+
+def _bucket_percentile(buckets: list, pct: float):
+    """Upper bound (ms) of the histogram bucket holding the pct-th sample."""
+    total = sum(buckets)
+    if not total:
+        return None
+    target = total * pct / 100
+    running = 0
+    for i, n in enumerate(buckets):
+        running += n
+        if running >= target:
+            return _LATENCY_BUCKETS_MS[i] if i < len(_LATENCY_BUCKETS_MS) else None
     return None
 
 
+def router_stats() -> dict:
+    """Snapshot of per-route metrics, agent fall-through counts and cache stats."""
+    with _stats_lock:
+        routes = {}
+        for route, c in sorted(_route_stats.items()):
+            executed = c["calls"] - c["cacheHits"]
+            routes[route] = {
+                "calls": c["calls"],
+                "cacheHits": c["cacheHits"],
+                "errors": c["errors"],
+                "errorRate": round(c["errors"] / executed, 3) if executed else None,
+                "fallthroughs": c["fallthroughs"],
+                "meanMs": round(c["totalMs"] / executed, 1) if executed else None,
+                "p50Ms": _bucket_percentile(c["buckets"], 50),
+                "p95Ms": _bucket_percentile(c["buckets"], 95),
+                "maxMs": round(c["maxMs"], 1),
+                "histogram": dict(zip(_BUCKET_LABELS, c["buckets"])),
+            }
+        unrouted = {
+            "total": _unrouted["total"],
+            "complex": _unrouted["complex"],
+            "noIntent": _unrouted["noIntent"],
+            "byTag": dict(_unrouted["byTag"].most_common()),
+            "recent": list(_unrouted["recent"]),
+        }
+    return {"routes": routes, "agent": unrouted, "cache": fast_cache_stats(), "prefetch": prefetch_stats()}
+
+
 # ── Fast-path executors ──────────────────────────────────────────────────────
 
 def execute_fast(route_info: dict) -> dict:
@@ -259,46 +766,233 @@ def execute_fast(route_info: dict) -> dict:
         response: str — formatted response text
         tool: str — tool name for UI display
         data: dict — raw data for potential widget use
+        cached: bool — only present (True) when served from the response cache
+        error: str — only present when the upstream call failed
     """
-    route = route_info["route"]
-    params = route_info["params"]
-
-    if route == "greeting":
-        return _handle_greeting()
-    elif route == "datetime":
-        return _handle_datetime()
-    elif route == "weather":
-        return _handle_weather(params["location"])
-    elif route == "stocks":
-        return _handle_stocks(params["tickers"])
-    elif route == "watchlist":
-        return _handle_watchlist()
-    elif route == "todo_list":
-        return _handle_todo_list()
-    elif route == "todo_add":
-        return _handle_todo_add(params["task"])
-    elif route == "note_list":
-        return _handle_note_list()
-    elif route == "system":
-        return _handle_system()
-    elif route == "news":
-        return _handle_news(params["query"])
-    elif route == "calendar_today":
-        return _handle_calendar_today()
-    elif route == "calendar_week":
-        return _handle_calendar_week(params.get("days", 7))
-    elif route == "calendar_family":
-        return _handle_calendar_family()
-    elif route == "finance_accounts":
-        return _handle_finance_accounts()
-    elif route == "finance_transactions":
-        return _handle_finance_transactions()
-    elif route == "finance_budgets":
-        return _handle_finance_budgets()
-    elif route == "finance_overview":
-        return _handle_finance_overview()
-    else:
+    key = _cache_key(route_info)
+    cached = _cache_get_or_join(key)
+    if cached is not None:
+        _record_call(route_info["route"], cached=True)
+        return cached
+    result = _dispatch(route_info)
+    _cache_put(key, result)
+    return result
+
+
+def _dispatch(route_info: dict) -> dict:
+    spec = ROUTES.get(route_info["route"])
+    if spec is None:
         return {"response": "I'm not sure how to handle that.", "tool": None, "data": {}}
+    return _timed(route_info["route"], spec["executor"], route_info["params"])
+
+
+# ── Typeahead prefetch ───────────────────────────────────────────────────────
+#
+# chat:typing sends the half-typed message here.  When it already classifies
+# to one of PREFETCH_ROUTES — cheap, read-only, cacheable — the route runs in
+# the background and lands in the response cache, so the chat:send that
+# follows is a cache hit and Open-Meteo / Kindora / Monarch latency hides
+# behind typing time.  A chat:send that arrives while the prefetch is still
+# running waits for it rather than fetching the same thing twice.
+#
+# Speculation is bounded: one start per client per PREFETCH_MIN_INTERVAL, at
+# most PREFETCH_MAX_INFLIGHT fetches at once, and nothing for a key that is
+# already cached or in flight.  A draft whose parameter comes from the word
+# still being typed ("weather in San") is skipped — that fetch would be for the
+# wrong key.  Prefetches are counted in prefetch_stats(), never in the
+# per-route call stats, which only reflect requests the user actually sent.
+
+PREFETCH_ROUTES = {"weather", "calendar_today", "finance_accounts", "stocks", "watchlist"}
+PREFETCH_MIN_CHARS = 4
+PREFETCH_MIN_INTERVAL = 1.0   # seconds between prefetches from one client
+PREFETCH_MAX_INFLIGHT = 4
+PREFETCH_JOIN_TIMEOUT = 8.0   # how long chat:send waits on a running prefetch
+_PREFETCH_CLIENTS_MAX = 1024
+
+_prefetch_lock = threading.Lock()
+_prefetch_inflight: dict = {}  # cache key -> threading.Event set when the fetch finishes
+_prefetch_warmed: set = set()  # keys a prefetch stored and no request has read yet
+_prefetch_last: OrderedDict = OrderedDict()  # client -> monotonic time of last start
+_prefetch_counts = Counter()
+_prefetch_ms = {"total": 0.0, "max": 0.0}  # upstream time spent on prefetches
+
+
+def prefetch(message: str, client: str = "") -> list[dict]:
+    """Warm the cache for whatever the partial message classifies to.
+
+    Returns one {"route", "status"} per candidate route, status being one of
+    started / hot / inflight / rate_limited / busy / partial.  Routes outside
+    PREFETCH_ROUTES and unroutable prefixes return nothing.
+    """
+    msg = message.strip()
+    if len(msg) < PREFETCH_MIN_CHARS:
+        return []
+    route_info = classify(msg)
+    if route_info is None:
+        return []
+    candidates = route_info["params"]["routes"] if route_info["route"] == "multi" else [route_info]
+    candidates = [c for c in candidates if c["route"] in PREFETCH_ROUTES]
+    statuses = []
+    for c in candidates:
+        if _from_trailing_word(message, c["params"]):
+            with _prefetch_lock:
+                _prefetch_counts["partial"] += 1
+            statuses.append({"route": c["route"], "status": "partial"})
+        else:
+            statuses.append({"route": c["route"], "status": _start_prefetch(c, client)})
+    return statuses
+
+
+def _from_trailing_word(message: str, params: dict) -> bool:
+    """True when a param value ends in the draft's last word, which may be half-typed.
+
+    A draft ending in whitespace or punctuation has no word in progress.
+    """
+    if not message or not message[-1].isalnum():
+        return False
+    word = message.split()[-1].lower()
+    for value in params.values():
+        values = value if isinstance(value, list) else [value]
+        if any(isinstance(v, str) and v.lower().endswith(word) for v in values):
+            return True
+    return False
+
+
+def _start_prefetch(route_info: dict, client: str) -> str:
+    key = _cache_key(route_info)
+    now = time.monotonic()
+    with _fast_cache_lock:
+        entry = _fast_cache.get(key)
+        hot = entry is not None and entry[0] > now
+    with _prefetch_lock:
+        if hot:
+            status = "hot"
+        elif key in _prefetch_inflight:
+            status = "inflight"
+        elif now - _prefetch_last.get(client, float("-inf")) < PREFETCH_MIN_INTERVAL:
+            status = "rate_limited"
+        elif len(_prefetch_inflight) >= PREFETCH_MAX_INFLIGHT:
+            status = "busy"
+        else:
+            status = "started"
+            _prefetch_inflight[key] = threading.Event()
+            _prefetch_last[client] = now
+            _prefetch_last.move_to_end(client)
+            while len(_prefetch_last) > _PREFETCH_CLIENTS_MAX:
+                _prefetch_last.popitem(last=False)
+        _prefetch_counts[status] += 1
+    if status == "started":
+        threading.Thread(target=_run_prefetch, args=(key, route_info), daemon=True).start()
+    return status
+
+
+def _run_prefetch(key: tuple, route_info: dict) -> None:
+    # Calls the executor directly rather than via _dispatch() so speculation
+    # stays out of the per-route call counts and latency histograms.
+    started = time.monotonic()
+    try:
+        result = ROUTES[route_info["route"]]["executor"](route_info["params"])
+        _cache_put(key, result)
+        stored = _is_complete(result)
+    except Exception as e:
+        print(f"[ROUTER] prefetch {route_info['route']} failed: {e}", flush=True)
+        stored = False
+    ms = (time.monotonic() - started) * 1000
+    with _prefetch_lock:
+        _prefetch_ms["total"] += ms
+        _prefetch_ms["max"] = max(_prefetch_ms["max"], ms)
+        if stored:
+            _prefetch_warmed.add(key)
+        _prefetch_counts["stored" if stored else "failed"] += 1
+        _prefetch_inflight.pop(key).set()
+
+
+def _cache_get_or_join(key: tuple | None) -> dict | None:
+    """_cache_get(), but first wait out a prefetch already fetching this key."""
+    if key is None:
+        return None
+    with _prefetch_lock:
+        pending = _prefetch_inflight.get(key)
+    if pending is not None:
+        joined = pending.wait(PREFETCH_JOIN_TIMEOUT)
+        with _prefetch_lock:
+            _prefetch_counts["joined" if joined else "join_timeouts"] += 1
+    cached = _cache_get(key)
+    if cached is not None:
+        with _prefetch_lock:
+            if key in _prefetch_warmed:
+                _prefetch_warmed.discard(key)
+                _prefetch_counts["used"] += 1
+    return cached
+
+
+def prefetch_stats() -> dict:
+    """Prefetch outcomes — used / stored is the share of speculation that paid off."""
+    with _prefetch_lock:
+        counts = dict(_prefetch_counts)
+        running = len(_prefetch_inflight)
+        total_ms, max_ms = _prefetch_ms["total"], _prefetch_ms["max"]
+    stored = counts.get("stored", 0)
+    fetched = stored + counts.get("failed", 0)
+    return {
+        **counts,
+        "running": running,
+        "hitRate": round(counts.get("used", 0) / stored, 3) if stored else None,
+        "meanMs": round(total_ms / fetched, 1) if fetched else None,
+        "maxMs": round(max_ms, 1),
+    }
+
+
+# ── Progressive fast paths ───────────────────────────────────────────────────
+#
+# Multi-section routes (news, calendar_week, finance_overview) are generators
+# so the socket handler can show each section the moment it is ready instead
+# of waiting for the slowest upstream.  They yield
+#
+#     ("partial", {"index": int, "title": str, "markdown": str, "status": str})
+#
+# for each section — a later partial with the same index replaces the earlier
+# one — and finish with ("done", result), result being the usual
+# execute_fast() dict whose response is the sections joined in index order.
+
+def stream_fast(route_info: dict):
+    """Generator version of execute_fast(): yields partials, then ("done", result).
+
+    Single-shot routes yield only the final ("done", result).
+    """
+    spec = ROUTES.get(route_info["route"])
+    if spec is None or spec["stream"] is None:
+        yield "done", execute_fast(route_info)
+        return
+    key = _cache_key(route_info)
+    cached = _cache_get_or_join(key)
+    if cached is not None:
+        _record_call(route_info["route"], cached=True)
+        yield "done", cached
+        return
+    started = time.monotonic()
+    try:
+        for kind, payload in spec["stream"](route_info["params"]):
+            if kind == "done":
+                _record_call(route_info["route"], ms=(time.monotonic() - started) * 1000,
+                             error=_result_error(payload))
+                _cache_put(key, payload)
+            yield kind, payload
+    except Exception:
+        _record_call(route_info["route"], ms=(time.monotonic() - started) * 1000, error=True)
+        raise
+
+
+def _partial(index: int, title: str, markdown: str, status: str = "ok") -> tuple[str, dict]:
+    return "partial", {"index": index, "title": title, "markdown": markdown, "status": status}
+
+
+def _drain(events) -> dict:
+    """Run a streaming handler to completion and return its final result."""
+    for kind, payload in events:
+        if kind == "done":
+            return payload
+    return {"response": "I'm not sure how to handle that.", "tool": None, "data": {}}
 
 
 def _handle_greeting():
@@ -441,7 +1135,7 @@ def _handle_weather(location: str):
 
         return {"response": response, "tool": "Weather", "data": wx}
     except Exception as e:
-        return {"response": f"Couldn't fetch weather for {location}: {e}", "tool": "Weather", "data": {}}
+        return {"response": f"Couldn't fetch weather for {location}: {e}", "tool": "Weather", "data": {}, "error": str(e)}
 
 
 def _wmo_description(code: int) -> str:
@@ -459,25 +1153,19 @@ def _wmo_description(code: int) -> str:
 
 
 def _handle_stocks(tickers: list[str]):
-    import yfinance as yf
+    from backend.services.quote_service import get_quotes
 
     lines = []
     raw = []
-    for ticker in tickers:
-        try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            price = info.get("currentPrice") or info.get("regularMarketPrice", 0)
-            prev = info.get("previousClose") or info.get("regularMarketPreviousClose", 0)
-            change = price - prev if price and prev else 0
-            pct = (change / prev * 100) if prev else 0
-            name = info.get("shortName", ticker)
-            arrow = "+" if change >= 0 else ""
-            lines.append(f"**{name}** ({ticker}): **${price:.2f}** ({arrow}{change:.2f}, {arrow}{pct:.1f}%)")
-            raw.append({"ticker": ticker, "price": price, "change": change, "pct": pct, "name": name})
-        except Exception:
+    for ticker, q in get_quotes(tickers).items():
+        if "error" in q or not q.get("price"):
             lines.append(f"**{ticker}**: Unable to fetch data")
             raw.append({"ticker": ticker, "error": True})
+            continue
+        price, change, pct, name = q["price"], q["change"], q["changePercent"], q["name"]
+        arrow = "+" if change >= 0 else ""
+        lines.append(f"**{name}** ({ticker}): **${price:.2f}** ({arrow}{change:.2f}, {arrow}{pct:.1f}%)")
+        raw.append({"ticker": ticker, "price": price, "change": change, "pct": pct, "name": name})
 
     return {"response": "\n".join(lines), "tool": "Stocks", "data": raw}
 
@@ -506,12 +1194,14 @@ def _handle_todo_list():
 
 
 def _handle_todo_add(task: str):
+    from backend import answer_cache
     from backend.db import execute_returning, log_activity
     todo = execute_returning(
         "INSERT INTO todos (task, done) VALUES (%s, %s) RETURNING id, task, done, created_at",
         (task, False),
     )
     log_activity("todos", "created", f"Created todo: {task}")
+    answer_cache.invalidate("todos")
     return {
         "response": f"Added to your todos: **{task}**",
         "tool": "Todos",
@@ -574,153 +1264,256 @@ except ImportError:
 _NEWS_EXTRAS = ["drudgereport", "x_trending"]
 _NEWS_MAX_PER_SECTION = 4
 
+# Whole-digest budget: sections still in flight after this render from the
+# last-good cache (or as "still loading") instead of holding up the reply.
+_NEWS_DEADLINE = 6.0
+_NEWS_LAST_GOOD_TTL = 6 * 3600
 
-def _handle_news(query: str):
-    """Fetch personalized news digest — sequential fetches to avoid thread issues."""
-    import os
-    import requests
+_news_last_good: dict = {}  # section name -> (timestamp, markdown, articles)
+_news_lock = threading.Lock()
 
-    api_key = os.getenv("SERPAPI_API_KEY", "")
-    if not api_key:
-        return {"response": "News search not configured (missing SerpAPI key).", "tool": "News", "data": {}}
+
+def _news_serp_section(api_key: str, name: str, query: str) -> tuple[str, list]:
+    """Fetch one NEWS_SECTIONS query (news tab, past 24h) — returns (markdown, articles)."""
+    import requests
 
     max_items = _NEWS_MAX_PER_SECTION
-    extras = _NEWS_EXTRAS
+    resp = requests.get(
+        "https://serpapi.com/search.json",
+        params={
+            "engine": "google",
+            "q": query,
+            "tbm": "nws",
+            "tbs": "qdr:d",
+            "api_key": api_key,
+            "gl": "us",
+            "hl": "en",
+            "num": max_items + 2,
+        },
+        timeout=10,
+    )
+    data = resp.json()
+    results = data.get("news_results", data.get("organic_results", []))[:max_items]
+
+    bullets = []
+    articles = []
+    for r in results:
+        title = r.get("title", "")
+        source = r.get("source", "")
+        link = r.get("link", "")
+        snippet = r.get("snippet", "")
+        date = r.get("date", "")
+
+        line = f"**{title}**"
+        if source:
+            line += f" — *{source}*"
+        if date:
+            line += f" ({date})"
+        if snippet:
+            short = snippet[:180].rsplit(" ", 1)[0] + "..." if len(snippet) > 180 else snippet
+            line += f"\n  {short}"
+        if link:
+            line += f"\n  [Read more]({link})"
+        bullets.append(line)
+        articles.append({"title": title, "source": source, "link": link, "section": name})
+
+    if not bullets:
+        return f"### {name}\n- *No results found*", []
+    return f"### {name}\n" + "\n\n".join(f"- {b}" for b in bullets), articles
+
+
+def _news_drudge_section(api_key: str, name: str, query: str) -> tuple[str, list]:
+    """Scrape the Drudge Report front page."""
+    import requests
+    from bs4 import BeautifulSoup
+
+    resp = requests.get("https://www.drudgereport.com/", timeout=8, headers={
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
+    })
+    soup = BeautifulSoup(resp.text, "html.parser")
+    headlines = []
+    seen = set()
+    for a in soup.select("a[href]"):
+        text = a.get_text(strip=True)
+        href = a.get("href", "")
+        if (text and href.startswith("http") and len(text) > 15
+                and text not in seen and "drudgereport.com" not in href):
+            seen.add(text)
+            headlines.append({"title": text, "link": href})
+            if len(headlines) >= 6:
+                break
+
+    if not headlines:
+        return "", []
+    bullets = []
+    articles = []
+    for item in headlines:
+        line = f"**{item['title']}**"
+        if item.get("link"):
+            line += f"\n  [Read more]({item['link']})"
+        bullets.append(line)
+        articles.append({"title": item["title"], "source": "Drudge Report", "link": item.get("link", ""), "section": name})
+    return f"### {name}\n" + "\n\n".join(f"- {b}" for b in bullets), articles
+
+
+def _news_x_section(api_key: str, name: str, query: str) -> tuple[str, list]:
+    """Trending posts on X, via SerpAPI Google search (past 24h)."""
+    import requests
 
-    sections = []
-    all_articles = []
+    resp = requests.get(
+        "https://serpapi.com/search.json",
+        params={
+            "engine": "google",
+            "q": query,
+            "api_key": api_key,
+            "gl": "us",
+            "hl": "en",
+            "num": 8,
+            "tbs": "qdr:d",  # past 24 hours
+        },
+        timeout=10,
+    )
+    data = resp.json()
+    results = data.get("organic_results", [])[:6]
+
+    if not results:
+        return "", []
+    bullets = []
+    articles = []
+    for r in results:
+        title = r.get("title", "").replace(" / X", "").replace(" on X", "").strip()
+        link = r.get("link", "")
+        snippet = r.get("snippet", "")
+
+        line = f"**{title}**"
+        if snippet:
+            # Trim long snippets
+            short = snippet[:150].rsplit(" ", 1)[0] + "..." if len(snippet) > 150 else snippet
+            line += f"\n  {short}"
+        if link:
+            line += f"\n  [View on X]({link})"
+        bullets.append(line)
+        articles.append({"title": title, "source": "X", "link": link, "section": name})
+    return f"### {name}\n" + "\n\n".join(f"- {b}" for b in bullets), articles
+
+
+def _news_plan() -> list[tuple]:
+    """Digest sections in display order: (name, fetcher, query)."""
+    plan = [(s["name"], _news_serp_section, s["query"]) for s in _PROFILE_NEWS_SECTIONS]
+    if "drudgereport" in _NEWS_EXTRAS:
+        plan.append(("Drudge Report", _news_drudge_section, ""))
+    if "x_trending" in _NEWS_EXTRAS:
+        plan.append(("Trending on X", _news_x_section,
+                     "site:x.com trending politics OR AI OR technology OR markets"))
+    return plan
+
+
+def _news_timed_fetch(fetcher, api_key: str, name: str, query: str) -> tuple[str, list, float]:
+    """Run one section fetcher, remember a good result, and time it."""
+    t0 = time.monotonic()
+    markdown, articles = fetcher(api_key, name, query)
+    elapsed_ms = round((time.monotonic() - t0) * 1000)
+    if articles:
+        with _news_lock:
+            _news_last_good[name] = (time.time(), markdown, articles)
+    return markdown, articles, elapsed_ms
+
+
+def _news_fallback(name: str, status: str) -> tuple[str, list, str]:
+    """Markdown for a section that timed out or failed: last-good copy if fresh enough."""
+    with _news_lock:
+        cached = _news_last_good.get(name)
+    if cached and time.time() - cached[0] < _NEWS_LAST_GOOD_TTL:
+        age_min = int((time.time() - cached[0]) // 60)
+        return f"{cached[1]}\n\n*Cached {age_min} min ago*", cached[2], "cached"
+    if status == "timeout":
+        return f"### {name}\n- *Still loading — ask again in a moment*", [], status
+    return f"### {name}\n- *Unable to fetch*", [], status
 
-    # ── News sections via SerpAPI Google Search (news tab, past 24h) ──
-    for section in _PROFILE_NEWS_SECTIONS:
-        name = section["name"]
-        try:
-            resp = requests.get(
-                "https://serpapi.com/search.json",
-                params={
-                    "engine": "google",
-                    "q": section["query"],
-                    "tbm": "nws",
-                    "tbs": "qdr:d",
-                    "api_key": api_key,
-                    "gl": "us",
-                    "hl": "en",
-                    "num": max_items + 2,
-                },
-                timeout=10,
-            )
-            data = resp.json()
-            results = data.get("news_results", data.get("organic_results", []))[:max_items]
 
-            bullets = []
-            for r in results:
-                title = r.get("title", "")
-                source = r.get("source", "")
-                link = r.get("link", "")
-                snippet = r.get("snippet", "")
-                date = r.get("date", "")
-
-                line = f"**{title}**"
-                if source:
-                    line += f" — *{source}*"
-                if date:
-                    line += f" ({date})"
-                if snippet:
-                    short = snippet[:180].rsplit(" ", 1)[0] + "..." if len(snippet) > 180 else snippet
-                    line += f"\n  {short}"
-                if link:
-                    line += f"\n  [Read more]({link})"
-                bullets.append(line)
-                all_articles.append({"title": title, "source": source, "link": link, "section": name})
-
-            if bullets:
-                sections.append(f"### {name}\n" + "\n\n".join(f"- {b}" for b in bullets))
-            else:
-                sections.append(f"### {name}\n- *No results found*")
-        except Exception as e:
-            print(f"[NEWS] Error fetching {name}: {e}", flush=True)
-            sections.append(f"### {name}\n- *Unable to fetch*")
+def _handle_news(query: str):
+    """Fetch personalized news digest."""
+    return _drain(_stream_news({"query": query}))
 
-    # ── Drudge Report ────────────────────────────────────────────────
-    if "drudgereport" in extras:
-        try:
-            from bs4 import BeautifulSoup
-            resp = requests.get("https://www.drudgereport.com/", timeout=8, headers={
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
-            })
-            soup = BeautifulSoup(resp.text, "html.parser")
-            headlines = []
-            seen = set()
-            for a in soup.select("a[href]"):
-                text = a.get_text(strip=True)
-                href = a.get("href", "")
-                if (text and href.startswith("http") and len(text) > 15
-                        and text not in seen and "drudgereport.com" not in href):
-                    seen.add(text)
-                    headlines.append({"title": text, "link": href})
-                    if len(headlines) >= 6:
-                        break
 
-            if headlines:
-                bullets = []
-                for item in headlines:
-                    line = f"**{item['title']}**"
-                    if item.get("link"):
-                        line += f"\n  [Read more]({item['link']})"
-                    bullets.append(line)
-                    all_articles.append({"title": item["title"], "source": "Drudge Report", "link": item.get("link", ""), "section": "Drudge Report"})
-                sections.append(f"### Drudge Report\n" + "\n\n".join(f"- {b}" for b in bullets))
-        except Exception as e:
-            print(f"[NEWS] Error fetching Drudge: {e}", flush=True)
-            sections.append(f"### Drudge Report\n- *Unable to fetch*")
+def _stream_news(params: dict):
+    """Stream the news digest, one section per partial as each fetch lands.
 
-    # ── X / Twitter Trending ─────────────────────────────────────────
-    if "x_trending" in extras:
-        try:
-            # Use SerpAPI Google search for trending topics on X
-            resp = requests.get(
-                "https://serpapi.com/search.json",
-                params={
-                    "engine": "google",
-                    "q": "site:x.com trending politics OR AI OR technology OR markets",
-                    "api_key": api_key,
-                    "gl": "us",
-                    "hl": "en",
-                    "num": 8,
-                    "tbs": "qdr:d",  # past 24 hours
-                },
-                timeout=10,
-            )
-            data = resp.json()
-            results = data.get("organic_results", [])[:6]
-
-            if results:
-                bullets = []
-                for r in results:
-                    title = r.get("title", "").replace(" / X", "").replace(" on X", "").strip()
-                    link = r.get("link", "")
-                    snippet = r.get("snippet", "")
-
-                    line = f"**{title}**"
-                    if snippet:
-                        # Trim long snippets
-                        short = snippet[:150].rsplit(" ", 1)[0] + "..." if len(snippet) > 150 else snippet
-                        line += f"\n  {short}"
-                    if link:
-                        line += f"\n  [View on X]({link})"
-                    bullets.append(line)
-                    all_articles.append({"title": title, "source": "X", "link": link, "section": "Trending on X"})
-                sections.append(f"### Trending on X\n" + "\n\n".join(f"- {b}" for b in bullets))
-        except Exception as e:
-            print(f"[NEWS] Error fetching X trending: {e}", flush=True)
-            sections.append(f"### Trending on X\n- *Unable to fetch*")
+    All sections are fetched concurrently under one _NEWS_DEADLINE; stragglers
+    are left running in the background (their result still refreshes the
+    last-good cache) and render from that cache or as "still loading".
+    """
+    import os
 
-    if not sections:
-        return {"response": "Couldn't fetch news right now. Try again in a moment.", "tool": "News", "data": []}
+    api_key = os.getenv("SERPAPI_API_KEY", "")
+    if not api_key:
+        yield "done", {"response": "News search not configured (missing SerpAPI key).", "tool": "News", "data": {},
+                       "error": "missing SERPAPI_API_KEY"}
+        return
+
+    started = time.monotonic()
+    title = f"News Digest — {datetime.now().strftime('%A, %B %d')}"
+    yield _partial(0, title, f"## {title}")
+
+    plan = _news_plan()
+    pool = ThreadPoolExecutor(max_workers=max(1, len(plan)))
+    futures = {pool.submit(_news_timed_fetch, fetcher, api_key, name, q): i
+               for i, (name, fetcher, q) in enumerate(plan)}
+    pool.shutdown(wait=False)
+
+    results: dict = {}  # plan index -> (markdown, articles, timing)
+    pending = set(futures)
+    stop_at = started + _NEWS_DEADLINE
+    while pending:
+        remaining = stop_at - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = futures[future]
+            name = plan[i][0]
+            try:
+                markdown, articles, elapsed_ms = future.result()
+                status = "ok"
+                timing = {"name": name, "status": status, "ms": elapsed_ms}
+            except Exception as e:
+                print(f"[NEWS] Error fetching {name}: {e}", flush=True)
+                markdown, articles, status = _news_fallback(name, "error")
+                timing = {"name": name, "status": status, "ms": None, "error": str(e)}
+            results[i] = (markdown, articles, timing)
+            yield _partial(i + 1, name, markdown, status)
+
+    for future in sorted(pending, key=futures.get):
+        i = futures[future]
+        name = plan[i][0]
+        print(f"[NEWS] {name} missed the {_NEWS_DEADLINE:.0f}s deadline", flush=True)
+        markdown, articles, status = _news_fallback(name, "timeout")
+        results[i] = (markdown, articles, {"name": name, "status": status, "ms": None})
+        yield _partial(i + 1, name, markdown, status)
+
+    sections = []
+    all_articles = []
+    timings = []
+    for i in range(len(plan)):
+        markdown, articles, timing = results[i]
+        timings.append(timing)
+        if markdown:
+            sections.append(markdown)
+            all_articles.extend(articles)
+
+    elapsed_ms = round((time.monotonic() - started) * 1000)
+    print(f"[NEWS] Digest in {elapsed_ms}ms: "
+          + ", ".join(f"{t['name']}={t['ms'] if t['ms'] is not None else t['status']}" for t in timings),
+          flush=True)
+    data = {"articles": all_articles, "sections": timings, "elapsedMs": elapsed_ms}
 
-    header = f"## News Digest — {datetime.now().strftime('%A, %B %d')}\n\n"
-    response = header + "\n\n".join(sections)
+    if not sections:
+        yield "done", {"response": "Couldn't fetch news right now. Try again in a moment.", "tool": "News", "data": data,
+                       "error": "no sections"}
+        return
 
-    return {"response": response, "tool": "News", "data": all_articles}
+    response = f"## {title}\n\n" + "\n\n".join(sections)
+    yield "done", {"response": response, "tool": "News", "data": data}
 
 
 # ── Calendar fast-path handlers ───────────────────────────────────────────────
@@ -768,22 +1561,30 @@ def _handle_calendar_today():
         lines.append(f"\n*{len(events)} event{'s' if len(events) != 1 else ''} today*")
         return {"response": "\n".join(lines), "tool": "Calendar", "data": events}
     except Exception as e:
-        return {"response": f"Couldn't fetch today's calendar: {e}", "tool": "Calendar", "data": {}}
+        return {"response": f"Couldn't fetch today's calendar: {e}", "tool": "Calendar", "data": {}, "error": str(e)}
 
 
 def _handle_calendar_week(days: int = 7):
+    return _drain(_stream_calendar_week({"days": days}))
+
+
+def _stream_calendar_week(params: dict):
+    """Stream upcoming events: the heading at once, then one partial per day."""
+    days = params.get("days", 7)
+    title = f"Upcoming {days} Days"
+    yield _partial(0, title, f"## {title}")
     try:
         from backend.services.kindora_service import get_upcoming, get_family_members
         events = get_upcoming(days=days)
-        members = get_family_members()
-        member_map = {m["id"]: m["name"] for m in members}
 
         if not events:
-            return {
-                "response": f"## Upcoming {days} Days\n\nNo events scheduled. Calendar is clear!",
-                "tool": "Calendar",
-                "data": [],
-            }
+            response = f"## {title}\n\nNo events scheduled. Calendar is clear!"
+            yield _partial(0, title, response)
+            yield "done", {"response": response, "tool": "Calendar", "data": []}
+            return
+
+        members = get_family_members()
+        member_map = {m["id"]: m["name"] for m in members}
 
         # Group by date
         by_date: dict = {}
@@ -798,11 +1599,13 @@ def _handle_calendar_week(days: int = 7):
             by_date.setdefault(date_key, {"label": date_label, "events": []})
             by_date[date_key]["events"].append(ev)
 
-        lines = [f"## Upcoming {days} Days ({len(events)} events)\n"]
+        heading = f"## {title} ({len(events)} events)"
+        sections = [heading]
+        yield _partial(0, title, heading)
 
-        for date_key in sorted(by_date.keys()):
+        for index, date_key in enumerate(sorted(by_date.keys()), start=1):
             day_info = by_date[date_key]
-            lines.append(f"### {day_info['label']}")
+            lines = [f"### {day_info['label']}"]
             for ev in day_info["events"]:
                 time_str = _format_event_time(ev["startTime"], ev["endTime"])
                 who = ", ".join(member_map.get(mid, mid) for mid in ev.get("memberIds", []))
@@ -810,11 +1613,12 @@ def _handle_calendar_week(days: int = 7):
                 if who:
                     line += f" ({who})"
                 lines.append(line)
-            lines.append("")
+            sections.append("\n".join(lines))
+            yield _partial(index, day_info["label"], sections[-1])
 
-        return {"response": "\n".join(lines), "tool": "Calendar", "data": events}
+        yield "done", {"response": "\n\n".join(sections), "tool": "Calendar", "data": events}
     except Exception as e:
-        return {"response": f"Couldn't fetch upcoming events: {e}", "tool": "Calendar", "data": {}}
+        yield "done", {"response": f"Couldn't fetch upcoming events: {e}", "tool": "Calendar", "data": {}, "error": str(e)}
 
 
 def _handle_calendar_family():
@@ -835,7 +1639,7 @@ def _handle_calendar_family():
 
         return {"response": "\n".join(lines), "tool": "Calendar", "data": members}
     except Exception as e:
-        return {"response": f"Couldn't fetch family members: {e}", "tool": "Calendar", "data": {}}
+        return {"response": f"Couldn't fetch family members: {e}", "tool": "Calendar", "data": {}, "error": str(e)}
 
 
 # ── Finance fast-path handlers ────────────────────────────────────────────────
@@ -863,7 +1667,7 @@ def _handle_finance_accounts():
 
         return {"response": "\n".join(lines), "tool": "PersonalFinance", "data": data}
     except Exception as e:
-        return {"response": f"Couldn't fetch accounts: {e}", "tool": "PersonalFinance", "data": {}}
+        return {"response": f"Couldn't fetch accounts: {e}", "tool": "PersonalFinance", "data": {}, "error": str(e)}
 
 
 def _handle_finance_transactions():
@@ -886,7 +1690,7 @@ def _handle_finance_transactions():
 
         return {"response": "\n".join(lines), "tool": "PersonalFinance", "data": txns}
     except Exception as e:
-        return {"response": f"Couldn't fetch transactions: {e}", "tool": "PersonalFinance", "data": {}}
+        return {"response": f"Couldn't fetch transactions: {e}", "tool": "PersonalFinance", "data": {}, "error": str(e)}
 
 
 def _handle_finance_budgets():
@@ -917,26 +1721,132 @@ def _handle_finance_budgets():
 
         return {"response": "\n".join(lines), "tool": "PersonalFinance", "data": data}
     except Exception as e:
-        return {"response": f"Couldn't fetch budgets: {e}", "tool": "PersonalFinance", "data": {}}
+        return {"response": f"Couldn't fetch budgets: {e}", "tool": "PersonalFinance", "data": {}, "error": str(e)}
 
 
 def _handle_finance_overview():
+    return _drain(_stream_finance_overview({}))
+
+
+def _stream_finance_overview(params: dict):
+    """Stream the overview: heading, net worth, then cash flow as each loads."""
     try:
         from backend.services.monarch_service import get_accounts, get_cashflow
-        accounts = get_accounts()
-        cashflow = get_cashflow()
+    except Exception as e:
+        yield "done", {"response": f"Couldn't fetch financial overview: {e}", "tool": "PersonalFinance", "data": {}, "error": str(e)}
+        return
 
-        lines = [
-            f"## Financial Overview\n",
+    title = "Financial Overview"
+    sections = [f"## {title}"]
+    yield _partial(0, title, sections[0])
+
+    data: dict = {}
+    errors = []
+    try:
+        accounts = get_accounts()
+        data["accounts"] = accounts
+        sections.append("\n".join([
             f"### Net Worth: **${accounts['netWorth']:,.2f}**",
             f"- Assets: ${accounts['totalAssets']:,.2f}",
-            f"- Liabilities: ${accounts['totalLiabilities']:,.2f}\n",
+            f"- Liabilities: ${accounts['totalLiabilities']:,.2f}",
+        ]))
+        yield _partial(1, "Net Worth", sections[-1])
+    except Exception as e:
+        errors.append(f"accounts: {e}")
+        sections.append(f"### Net Worth\n- *Couldn't fetch accounts: {e}*")
+        yield _partial(1, "Net Worth", sections[-1], "error")
+
+    try:
+        cashflow = get_cashflow()
+        data["cashflow"] = cashflow
+        sections.append("\n".join([
             f"### Cash Flow (Last 30 Days)",
             f"- Income: **${cashflow['income']:,.2f}**",
             f"- Expenses: **${cashflow['expenses']:,.2f}**",
             f"- Savings: **${cashflow['savings']:,.2f}** ({cashflow['savingsRate']:.1f}%)",
-        ]
-
-        return {"response": "\n".join(lines), "tool": "PersonalFinance", "data": {"accounts": accounts, "cashflow": cashflow}}
+        ]))
+        yield _partial(2, "Cash Flow", sections[-1])
     except Exception as e:
-        return {"response": f"Couldn't fetch financial overview: {e}", "tool": "PersonalFinance", "data": {}}
+        errors.append(f"cashflow: {e}")
+        sections.append(f"### Cash Flow (Last 30 Days)\n- *Couldn't fetch cash flow: {e}*")
+        yield _partial(2, "Cash Flow", sections[-1], "error")
+
+    if len(errors) == 2:
+        yield "done", {"response": f"Couldn't fetch financial overview: {'; '.join(errors)}",
+                       "tool": "PersonalFinance", "data": {}, "error": "; ".join(errors)}
+        return
+    if errors:
+        data["errors"] = errors
+    yield "done", {"response": "\n\n".join(sections), "tool": "PersonalFinance", "data": data}
+
+
+# ── Multi-intent handler ─────────────────────────────────────────────────────
+
+def _stream_multi(params: dict):
+    """Run each sub-route concurrently (through the cache) and stream each answer as it lands."""
+    routes = params["routes"]
+    pool = ThreadPoolExecutor(max_workers=len(routes))
+    futures = {pool.submit(execute_fast, route_info): i for i, route_info in enumerate(routes)}
+    pool.shutdown(wait=False)
+
+    results: list = [None] * len(routes)
+    for future in as_completed(futures):
+        i = futures[future]
+        try:
+            results[i] = future.result()
+        except Exception as e:
+            print(f"[ROUTER] multi: {routes[i]['route']} failed: {e}", flush=True)
+            results[i] = {"response": f"Couldn't answer {routes[i]['label']}: {e}", "tool": None,
+                          "data": {}, "error": str(e)}
+        yield _partial(i, routes[i]["label"], results[i]["response"],
+                       "error" if _result_error(results[i]) else "ok")
+
+    errors = [f"{r['route']}: {res['error']}" for r, res in zip(routes, results) if res.get("error")]
+    result = {
+        "response": "\n\n---\n\n".join(res["response"] for res in results),
+        "tool": " + ".join(dict.fromkeys(res["tool"] for res in results if res.get("tool"))) or None,
+        "data": {r["route"]: res.get("data") for r, res in zip(routes, results)},
+    }
+    if errors:
+        result["error"] = "; ".join(errors)
+    yield "done", result
+
+
+# ── Route registry ───────────────────────────────────────────────────────────
+#
+# Every fast-path route, in classification priority order.  Each entry names
+# the classifier hook that can produce it (routes of one intent family share
+# a hook), the executor that answers it — called with the route's params —
+# and, for multi-section routes, the generator stream_fast() uses instead.
+
+ROUTES: dict = {}
+
+
+def _register(name: str, label: str, classifier, executor, stream=None) -> None:
+    ROUTES[name] = {"name": name, "label": label, "classifier": classifier,
+                    "executor": executor, "stream": stream}
+
+
+_register("greeting", "Greeting", _classify_greeting, lambda p: _handle_greeting())
+_register("datetime", "Date & Time", _classify_datetime, lambda p: _handle_datetime())
+_register("weather", "Weather", _classify_weather, lambda p: _handle_weather(p["location"]))
+_register("stocks", "Stocks", _classify_stocks, lambda p: _handle_stocks(p["tickers"]))
+_register("watchlist", "Watchlist", _classify_stocks, lambda p: _handle_watchlist())
+_register("todo_add", "Add todo", _classify_todos, lambda p: _handle_todo_add(p["task"]))
+_register("todo_list", "Todos", _classify_todos, lambda p: _handle_todo_list())
+_register("note_list", "Notes", _classify_notes, lambda p: _handle_note_list())
+_register("system", "System Info", _classify_system, lambda p: _handle_system())
+_register("news", "News Digest", _classify_news, lambda p: _handle_news(p["query"]), _stream_news)
+_register("calendar_today", "Today's Calendar", _classify_calendar, lambda p: _handle_calendar_today())
+_register("calendar_week", "Upcoming Events", _classify_calendar,
+          lambda p: _handle_calendar_week(p.get("days", 7)), _stream_calendar_week)
+_register("calendar_family", "Family Members", _classify_calendar, lambda p: _handle_calendar_family())
+_register("finance_budgets", "Budgets", _classify_finance, lambda p: _handle_finance_budgets())
+_register("finance_transactions", "Transactions", _classify_finance, lambda p: _handle_finance_transactions())
+_register("finance_overview", "Financial Overview", _classify_finance,
+          lambda p: _handle_finance_overview(), _stream_finance_overview)
+_register("finance_accounts", "Accounts & Net Worth", _classify_finance, lambda p: _handle_finance_accounts())
+
+_register("multi", "Multiple", None, lambda p: _drain(_stream_multi(p)), _stream_multi)
+
+_CLASSIFIER_HOOKS = tuple(dict.fromkeys(spec["classifier"] for spec in ROUTES.values() if spec["classifier"]))
@@ -15,10 +15,16 @@ project_root = str(Path(__file__).parent.parent)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+import logging
 import os
 import backend.config  # noqa: F401 — loads .env into os.environ
 from backend.app import create_app, socketio
 
+# Backend modules that log (rather than print) do so at INFO; third-party
+# libraries stay at the root's WARNING
+logging.basicConfig(format="[%(name)s] %(message)s")
+logging.getLogger("backend").setLevel(logging.INFO)
+
 app = create_app()
 
 # Auto-create tables on startup
@@ -29,6 +35,12 @@ try:
 except Exception as e:
     print(f"Warning: Could not init tables: {e}")
 
+# Build the agent executors off the startup path; the app serves immediately
+# and fast-path queries never need them.  AGENT_PREWARM=0 defers to first use.
+if os.environ.get("AGENT_PREWARM", "1") != "0":
+    from backend.agent.wrapper import prewarm
+    prewarm()
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5001))
     print(f"Langly backend starting on http://localhost:{port}")
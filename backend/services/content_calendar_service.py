@@ -2,17 +2,12 @@
 from __future__ import annotations
 
 import json
-import os
 import uuid
 from datetime import date, timedelta
 from typing import Optional
 
-from langchain_openai import ChatOpenAI
-
 from backend.db import query, execute, execute_returning
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-
 SYSTEM_PROMPT = """You are a content strategist for Stride — a personal brand built by Michael Vicenzino.
 
 Brand voice: confident, strategic, data-grounded, never generic. Michael is an AI strategy consultant and builder who helps leaders operationalize AI. He speaks from experience, shares frameworks, and isn't afraid of bold takes.
@@ -82,16 +77,12 @@ def generate_content_calendar(start_date_str: Optional[str] = None) -> dict:
         week_ranges="\n".join(week_ranges),
     )
 
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.7,
-        api_key=OPENAI_API_KEY,
-    )
+    from backend.services.llm_clients import invoke
 
-    response = llm.invoke([
+    response = invoke([
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": user_prompt},
-    ])
+    ], model="gpt-4o-mini", temperature=0.7)
 
     raw = response.content.strip()
 
@@ -75,13 +75,21 @@ def _cached(key: str, fetcher):
 
 
 def _invalidate_cache(prefix: Optional[str] = None):
-    """Clear cache entries. If prefix given, only clear matching keys."""
+    """Clear cache entries. If prefix given, only clear matching keys.
+
+    Event writes also drop agent answers and fast-path results that depended
+    on the calendar.
+    """
     if prefix is None:
         _cache.clear()
     else:
         keys_to_remove = [k for k in _cache if k.startswith(prefix)]
         for k in keys_to_remove:
             _cache.pop(k, None)
+    if prefix is None or prefix.startswith("events"):
+        from backend import answer_cache, router
+        answer_cache.invalidate("calendar")
+        router.clear_fast_cache("calendar")
 
 
 # ── HTTP helpers ─────────────────────────────────────────────────────────────
@@ -0,0 +1,111 @@
+"""Shared LLM clients — one long-lived chat model per (provider, model, temperature).
+
+Callers used to construct a fresh ChatOpenAI per request, paying client setup
+and a new TLS connection every time.  get_llm() hands out a cached client
+whose HTTP pool keeps connections alive between calls; invoke() additionally
+caps how many requests one client has in flight, so a burst of tool calls
+queues briefly instead of tripping provider rate limits.  The agent tiers ask
+for streaming=True clients so answers can be forwarded token by token; those
+are separate instances, so one-shot invoke() callers never stream.
+Python 3.9 compatible.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+MAX_CONNECTIONS = 20        # per client
+MAX_KEEPALIVE = 10          # idle connections kept open per client
+KEEPALIVE_EXPIRY = 60.0     # seconds an idle connection stays open
+REQUEST_TIMEOUT = 60.0
+MAX_RETRIES = 2
+MAX_CONCURRENT = 8          # in-flight invoke() calls per client
+ACQUIRE_TIMEOUT = 30.0      # how long invoke() waits for a slot
+
+# ── Singleton state ───────────────────────────────────────────────────────────
+
+_lock = threading.Lock()
+_clients: dict = {}     # (provider, model, temperature, streaming) -> chat model
+_slots: dict = {}       # same key -> BoundedSemaphore
+_stats: dict = {}       # same key -> counters
+
+
+def _build(provider: str, model: str, temperature: float, streaming: bool):
+    if provider == "openai":
+        import httpx
+        from langchain_openai import ChatOpenAI
+
+        http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE,
+                                keepalive_expiry=KEEPALIVE_EXPIRY),
+            timeout=REQUEST_TIMEOUT,
+        )
+        # stream_usage keeps token counts available when streaming
+        return ChatOpenAI(model=model, temperature=temperature, max_retries=MAX_RETRIES,
+                          timeout=REQUEST_TIMEOUT, http_client=http_client,
+                          streaming=streaming, stream_usage=streaming)
+    if provider == "anthropic":
+        # The Anthropic SDK pools connections inside its own long-lived client
+        from langchain_anthropic import ChatAnthropic
+
+        return ChatAnthropic(model=model, temperature=temperature, max_retries=MAX_RETRIES,
+                             default_request_timeout=REQUEST_TIMEOUT, streaming=streaming)
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+def get_llm(model: str = "gpt-4o-mini", temperature: float = 0.0, provider: str = "openai",
+            streaming: bool = False):
+    """Return the shared chat model for (provider, model, temperature, streaming), creating it once."""
+    key = (provider, model, float(temperature), bool(streaming))
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _build(provider, model, float(temperature), bool(streaming))
+                _slots[key] = threading.BoundedSemaphore(MAX_CONCURRENT)
+                _stats[key] = {"calls": 0, "errors": 0, "waited": 0, "inFlight": 0, "totalMs": 0.0}
+    return client
+
+
+def invoke(messages, model: str = "gpt-4o-mini", temperature: float = 0.0, provider: str = "openai"):
+    """Call the shared client with at most MAX_CONCURRENT requests in flight; returns the AI message."""
+    client = get_llm(model, temperature, provider)
+    key = (provider, model, float(temperature), False)
+    slots = _slots[key]
+    waited = not slots.acquire(blocking=False)
+    if waited and not slots.acquire(timeout=ACQUIRE_TIMEOUT):
+        raise TimeoutError(f"{model}: no free request slot after {ACQUIRE_TIMEOUT:.0f}s")
+    stats = _stats[key]
+    with _lock:
+        stats["calls"] += 1
+        stats["waited"] += waited
+        stats["inFlight"] += 1
+    started = time.monotonic()
+    try:
+        return client.invoke(messages)
+    except Exception:
+        with _lock:
+            stats["errors"] += 1
+        raise
+    finally:
+        with _lock:
+            stats["inFlight"] -= 1
+            stats["totalMs"] += (time.monotonic() - started) * 1000
+        slots.release()
+
+
+def get_stats() -> dict:
+    """Per-client call counts, errors, queueing and mean latency."""
+    with _lock:
+        return {
+            f"{provider}:{model}@{temperature:g}{'+stream' if streaming else ''}": {
+                **{k: v for k, v in s.items() if k != "totalMs"},
+                "meanMs": round(s["totalMs"] / s["calls"], 1) if s["calls"] else None,
+            }
+            for (provider, model, temperature, streaming), s in sorted(_stats.items())
+        }
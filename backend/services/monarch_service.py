@@ -107,13 +107,21 @@ def _invalidate_client():
 
 
 def _cached(key: str, fetcher):
-    """Return cached value or call fetcher, caching the result for CACHE_TTL seconds."""
+    """Return cached value or call fetcher, caching the result for CACHE_TTL seconds.
+
+    A refetch that differs from the value it replaces means the finance data
+    changed, so agent answers and fast-path results built on it are dropped.
+    """
     now = time.time()
     entry = _cache.get(key)
     if entry and now - entry["ts"] < CACHE_TTL:
         return entry["val"]
     val = fetcher()
     _cache[key] = {"val": val, "ts": now}
+    if entry and entry["val"] != val:
+        from backend import answer_cache, router
+        answer_cache.invalidate("finance")
+        router.clear_fast_cache("finance")
     return val
 
 
@@ -0,0 +1,171 @@
+"""Quote service — batched stock quotes shared by the router, REST API and agent.
+
+One yf.download() call covers a whole watchlist (hourly bars over 5 days),
+from which price, previous close, change, day range, volume and a sparkline
+are derived.  Quotes are cached per ticker for CACHE_TTL seconds; concurrent
+callers wait for an in-flight download instead of starting their own.
+Python 3.9 compatible.
+"""
+from __future__ import annotations
+
+import time
+import threading
+from typing import Optional
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+CACHE_TTL = 30  # seconds — matches the router's stocks TTL
+SPARKLINE_POINTS = 24
+
+# Display names — yf.download carries no metadata, and looking names up via
+# .info would cost a round trip per symbol.  Unknown tickers show the symbol.
+DISPLAY_NAMES = {
+    "AAPL": "Apple", "TSLA": "Tesla", "GOOGL": "Alphabet", "GOOG": "Alphabet",
+    "MSFT": "Microsoft", "AMZN": "Amazon", "META": "Meta", "NVDA": "NVIDIA",
+    "AMD": "AMD", "NFLX": "Netflix", "SNOW": "Snowflake", "PLTR": "Palantir",
+    "SPY": "SPDR S&P 500 ETF", "QQQ": "Invesco QQQ", "DIS": "Disney",
+    "BABA": "Alibaba", "INTC": "Intel", "UBER": "Uber", "LYFT": "Lyft",
+    "SQ": "Block", "SHOP": "Shopify", "PYPL": "PayPal", "COIN": "Coinbase",
+    "ROKU": "Roku", "SNAP": "Snap", "PINS": "Pinterest", "TWLO": "Twilio",
+    "CRM": "Salesforce", "ORCL": "Oracle", "IBM": "IBM", "BA": "Boeing",
+    "JPM": "JPMorgan Chase", "GS": "Goldman Sachs", "V": "Visa",
+    "MA": "Mastercard", "WMT": "Walmart", "TGT": "Target", "SPOT": "Spotify",
+    "^GSPC": "S&P 500", "^DJI": "Dow", "^IXIC": "Nasdaq",
+}
+
+# ── Singleton state ───────────────────────────────────────────────────────────
+
+_lock = threading.Lock()        # guards _cache and _stats
+_fetch_lock = threading.Lock()  # one download in flight at a time
+_cache: dict = {}               # ticker -> {"val": quote, "ts": time}
+_stats = {"downloads": 0, "tickers_fetched": 0, "hits": 0, "misses": 0}
+
+
+# ── Fetching ──────────────────────────────────────────────────────────────────
+
+def _frame_for(data, ticker: str, batch_size: int):
+    """Slice one ticker's OHLCV frame out of a yf.download result."""
+    import pandas as pd
+
+    if isinstance(data.columns, pd.MultiIndex):
+        if ticker not in data.columns.get_level_values(0):
+            return None
+        return data[ticker]
+    return data if batch_size == 1 else None
+
+
+def _quote_from_frame(ticker: str, df) -> dict:
+    """Build a quote from hourly bars; previous close is the prior session's last bar."""
+    if df is None:
+        return {"ticker": ticker, "error": "No data returned"}
+    df = df.dropna(subset=["Close"])
+    if df.empty:
+        return {"ticker": ticker, "error": "No data returned"}
+
+    sessions = df.index.normalize() if hasattr(df.index, "normalize") else df.index
+    last_session = sessions[-1]
+    today = df[sessions == last_session]
+    earlier = df[sessions < last_session]
+
+    price = float(df["Close"].iloc[-1])
+    prev_close = float(earlier["Close"].iloc[-1]) if not earlier.empty else None
+    change = price - prev_close if prev_close else 0.0
+    change_pct = (change / prev_close * 100) if prev_close else 0.0
+    volume = today["Volume"].fillna(0).sum() if "Volume" in today else None
+
+    return {
+        "ticker": ticker,
+        "name": DISPLAY_NAMES.get(ticker, ticker),
+        "price": round(price, 2),
+        "previousClose": round(prev_close, 2) if prev_close else None,
+        "change": round(change, 2),
+        "changePercent": round(change_pct, 2),
+        "dayHigh": round(float(today["High"].max()), 2) if "High" in today else None,
+        "dayLow": round(float(today["Low"].min()), 2) if "Low" in today else None,
+        "volume": int(volume) if volume is not None else None,
+        "sparkline": [round(float(v), 2) for v in df["Close"].tolist()[-SPARKLINE_POINTS:]],
+    }
+
+
+def _download(tickers: list[str]) -> dict:
+    """Fetch quotes for every ticker with one yf.download call."""
+    import yfinance as yf
+
+    data = yf.download(
+        tickers, period="5d", interval="1h", group_by="ticker",
+        auto_adjust=False, progress=False, threads=True,
+    )
+    quotes = {}
+    for ticker in tickers:
+        try:
+            quotes[ticker] = _quote_from_frame(ticker, _frame_for(data, ticker, len(tickers)))
+        except Exception as e:
+            quotes[ticker] = {"ticker": ticker, "error": str(e)}
+    return quotes
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+def get_quotes(tickers: list[str]) -> dict:
+    """Return {ticker: quote} for all tickers, fetching only stale ones in one batch.
+
+    A quote has ticker, name, price, previousClose, change, changePercent,
+    dayHigh, dayLow, volume and sparkline — or ticker and error.
+    """
+    wanted = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    if not wanted:
+        return {}
+
+    def fresh() -> dict:
+        now = time.time()
+        return {t: _cache[t]["val"] for t in wanted if t in _cache and now - _cache[t]["ts"] < CACHE_TTL}
+
+    with _lock:
+        quotes = fresh()
+        _stats["hits"] += len(quotes)
+        _stats["misses"] += len(wanted) - len(quotes)
+    if len(quotes) == len(wanted):
+        return {t: quotes[t] for t in wanted}
+
+    with _fetch_lock:
+        # Another caller may have fetched these while we waited
+        with _lock:
+            quotes = fresh()
+        missing = [t for t in wanted if t not in quotes]
+        if missing:
+            try:
+                fetched = _download(missing)
+            except Exception as e:
+                fetched = {t: {"ticker": t, "error": str(e)} for t in missing}
+            now = time.time()
+            with _lock:
+                _stats["downloads"] += 1
+                _stats["tickers_fetched"] += len(missing)
+                for t, quote in fetched.items():
+                    if "error" not in quote:
+                        _cache[t] = {"val": quote, "ts": now}
+            quotes.update(fetched)
+
+    return {t: quotes[t] for t in wanted}
+
+
+def get_quote(ticker: str) -> dict:
+    """Return a single quote (see get_quotes)."""
+    quotes = get_quotes([ticker])
+    t = ticker.strip().upper()
+    return quotes.get(t, {"ticker": t, "error": "Invalid ticker"})
+
+
+def invalidate(ticker: Optional[str] = None):
+    """Drop cached quotes — one ticker or all."""
+    with _lock:
+        if ticker is None:
+            _cache.clear()
+        else:
+            _cache.pop(ticker.upper(), None)
+
+
+def get_stats() -> dict:
+    """Download and cache counters."""
+    with _lock:
+        return {**_stats, "cached": len(_cache)}
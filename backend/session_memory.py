@@ -0,0 +1,206 @@
+"""Per-session conversational memory for agent runs.
+
+Agent runs used to see only the current message, so follow-ups ("and
+tomorrow?") lost their subject and tools were re-run for data the session
+already had.  build_context() prefixes the agent input with:
+
+  * the session's running summary of older turns (chat_sessions.summary)
+  * the most recent WINDOW_MESSAGES messages, each clipped, with a short
+    note of the tools an assistant turn used and what they returned
+
+The summary is incremental: whenever a saved message pushes older messages
+out of the window, note_message() folds just those messages into the stored
+summary with a cheap model, in the background, and advances
+chat_sessions.summary_upto to the last folded message id.  Nothing is ever
+re-summarised from scratch, and the prefix never exceeds MAX_CONTEXT_CHARS
+however long the session runs.
+
+is_follow_up() tells messages that lean on the conversation ("what about
+Chicago?") from ones that stand on their own: only follow-ups have their tier
+and tools chosen with the previous user turn, and only standalone messages
+use the answer cache.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+WINDOW_MESSAGES = 6        # recent messages sent verbatim (3 turns)
+FOLD_BATCH = 4             # fold once this many messages have left the window
+MESSAGE_CHARS = 600        # per window message
+TOOL_NOTE_CHARS = 200      # per tool result noted under an assistant message
+SUMMARY_CHARS = 1500
+MAX_CONTEXT_CHARS = 5000
+SUMMARY_MODEL = "gpt-4o-mini"
+
+# Openers and references that only make sense against earlier turns; the
+# weather/time "it" ("is it raining", "what time is it") and "this"/"that"
+# before a time word ("this month") don't count
+_FOLLOW_UP = re.compile(
+    r"^\s*(?:and|also|so|then|but|or|what about|how about|what if|same)\b"
+    r"|(?<!\bis )(?<!\bwill )(?<!\bwas )(?<!\bdoes )\bit\b(?!\s+(?:going|gonna)\b)"
+    r"|\b(?:its|they|them|their|he|she|him|his|her|instead|again|else|the rest|above|earlier)\b"
+    r"|\b(?:this|that|these|those)\b(?!\s+(?:week|weekend|month|year|morning|afternoon|evening|quarter)\b)",
+    re.IGNORECASE,
+)
+
+# ── Singleton state ───────────────────────────────────────────────────────────
+
+_lock = threading.Lock()
+_folding: set = set()      # session ids with a fold in progress
+_stats = Counter()
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _format_message(row: dict) -> str:
+    role = "User" if row["role"] == "user" else "Assistant"
+    line = f"{role}: {_clip(row['content'], MESSAGE_CHARS)}"
+    for tc in row.get("tool_calls") or []:
+        if isinstance(tc, dict) and tc.get("tool"):
+            note = f"  [{tc['tool']}({_clip(tc.get('input', ''), 60)})"
+            if tc.get("output"):
+                note += f" -> {_clip(tc['output'], TOOL_NOTE_CHARS)}"
+            line += "\n" + note + "]"
+    return line
+
+
+def _session(session_id: int) -> dict | None:
+    from backend.db import query
+
+    rows = query("SELECT summary, summary_upto FROM chat_sessions WHERE id = %s", (session_id,))
+    return rows[0] if rows else None
+
+
+def _unfolded(session_id: int, upto: int) -> list:
+    """Messages not yet in the summary, oldest first."""
+    from backend.db import query
+
+    return query(
+        "SELECT id, role, content, tool_calls FROM chat_messages "
+        "WHERE session_id = %s AND id > %s ORDER BY id ASC",
+        (session_id, upto or 0),
+    )
+
+
+# ── Summary folding ──────────────────────────────────────────────────────────
+
+def _fold(session_id: int) -> None:
+    from backend.db import execute
+    from backend.services.llm_clients import invoke
+
+    started = time.monotonic()
+    try:
+        session = _session(session_id)
+        if session is None:
+            return
+        messages = _unfolded(session_id, session["summary_upto"])
+        older = messages[:-WINDOW_MESSAGES] if len(messages) > WINDOW_MESSAGES else []
+        if len(older) < FOLD_BATCH:
+            return
+        transcript = "\n".join(_format_message(m) for m in older)
+        summary = invoke(
+            "You maintain a running summary of a chat between a user and their personal assistant.\n"
+            f"Current summary:\n{session['summary'] or '(none yet)'}\n\n"
+            f"New messages:\n{transcript}\n\n"
+            f"Rewrite the summary to include the new messages in under {SUMMARY_CHARS // 6} words. "
+            "Keep names, dates, numbers, decisions, open questions and facts tools returned; drop chit-chat.",
+            model=SUMMARY_MODEL,
+        ).content.strip()
+        # summary_upto guards against a concurrent fold having moved on already
+        execute(
+            "UPDATE chat_sessions SET summary = %s, summary_upto = %s WHERE id = %s AND summary_upto = %s",
+            (_clip(summary, SUMMARY_CHARS), older[-1]["id"], session_id, session["summary_upto"]),
+        )
+        with _lock:
+            _stats["folds"] += 1
+            _stats["foldedMessages"] += len(older)
+            _stats["foldMs"] += round((time.monotonic() - started) * 1000)
+    except Exception as e:
+        with _lock:
+            _stats["foldErrors"] += 1
+        print(f"[MEMORY] summary fold failed for session {session_id}: {e}", flush=True)
+    finally:
+        with _lock:
+            _folding.discard(session_id)
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+def note_message(session_id: int) -> None:
+    """Call after saving a message; folds old messages into the summary when due."""
+    with _lock:
+        if session_id in _folding:
+            return
+        _folding.add(session_id)
+    threading.Thread(target=_fold, args=(session_id,), daemon=True, name=f"memory-{session_id}").start()
+
+
+def is_follow_up(message: str) -> bool:
+    """True if the message refers back to the conversation rather than standing alone."""
+    return bool(_FOLLOW_UP.search(message))
+
+
+def build_context(session_id, message: str) -> str:
+    """Summary plus recent turns of the session, as a prefix for the agent input ("" if none)."""
+    return context_for(session_id, message)[0]
+
+
+def context_for(session_id, message: str) -> tuple[str, str]:
+    """(build_context() prefix, the previous user message or "")."""
+    try:
+        session_id = int(session_id)
+    except (TypeError, ValueError):
+        return "", ""
+    try:
+        session = _session(session_id)
+        if session is None:
+            return "", ""
+        messages = _unfolded(session_id, session["summary_upto"])
+    except Exception as e:
+        print(f"[MEMORY] context unavailable for session {session_id}: {e}", flush=True)
+        return "", ""
+
+    # The client saves the new user message concurrently with chat:send
+    if messages and messages[-1]["role"] == "user" and messages[-1]["content"].strip() == message.strip():
+        messages = messages[:-1]
+    previous = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    # Unfolded messages past the window are dropped, not sent, until their fold lands
+    recent = [_format_message(m) for m in messages[-(WINDOW_MESSAGES + FOLD_BATCH - 1):]]
+    summary = session["summary"] or ""
+    if not recent and not summary:
+        return "", previous
+
+    budget = MAX_CONTEXT_CHARS - len(summary)
+    while recent and sum(len(r) + 1 for r in recent) > budget:
+        recent.pop(0)
+    parts = ["Conversation so far (for context; answer only the new message):"]
+    if summary:
+        parts.append(f"Summary of earlier turns: {summary}")
+    if recent:
+        parts.append("Recent turns:\n" + "\n".join(recent))
+    with _lock:
+        _stats["contexts"] += 1
+        _stats["contextChars"] += sum(len(p) for p in parts)
+    return "\n\n".join(parts) + "\n\nNew message: ", previous
+
+
+def get_stats() -> dict:
+    """Context builds, mean prefix size and summary fold counters."""
+    with _lock:
+        counts = dict(_stats)
+    contexts, folds = counts.get("contexts", 0), counts.get("folds", 0)
+    return {
+        "windowMessages": WINDOW_MESSAGES,
+        "maxContextChars": MAX_CONTEXT_CHARS,
+        **{k: v for k, v in counts.items() if k not in ("contextChars", "foldMs")},
+        "meanContextChars": round(counts.get("contextChars", 0) / contexts) if contexts else None,
+        "meanFoldMs": round(counts.get("foldMs", 0) / folds) if folds else None,
+    }
@@ -1,11 +1,10 @@
 """WebSocket handler for streaming chat with the LangChain agent."""
-import queue
 import time
 import threading
 from flask import request as flask_request
 from flask_socketio import SocketIO, emit
-from backend.agent.callbacks import StreamingCallbackHandler
-from backend.router import classify, execute_fast
+from backend.router import classify, prefetch, record_fallthrough, record_unrouted, stream_fast
+from backend.sockets.stream_runner import stream_agent_run
 
 
 def register_handlers(socketio: SocketIO):
@@ -19,21 +18,64 @@ def register_handlers(socketio: SocketIO):
             return False  # reject connection
         print("[SOCKET] Client connected", flush=True)
 
+    @socketio.on("disconnect")
+    def handle_disconnect():
+        from backend.agent import pool
+        cancelled = pool.cancel_client(flask_request.sid, "disconnect")
+        if cancelled:
+            print(f"[SOCKET] Client disconnected — cancelled {cancelled} agent run(s)", flush=True)
+
+    @socketio.on("chat:cancel")
+    def handle_cancel(data=None):
+        from backend.agent import pool
+        cancelled = pool.cancel_client(flask_request.sid, "user", label="chat")
+        print(f"[SOCKET] chat:cancel — {cancelled} agent run(s) cancelled", flush=True)
+
+    @socketio.on("chat:typing")
+    def handle_typing(data):
+        # Speculative: warm the fast-path cache for what the user is typing.
+        # Never emits — the answer goes out on the chat:send that follows.
+        message = (data or {}).get("message", "")
+        try:
+            started = [p for p in prefetch(message, client=flask_request.sid) if p["status"] == "started"]
+        except Exception as e:
+            print(f"[SOCKET] chat:typing prefetch ERROR: {e}", flush=True)
+            return
+        if started:
+            print(f"[SOCKET] prefetching {', '.join(p['route'] for p in started)} for: {message[:60]}", flush=True)
+
     @socketio.on("chat:send")
     def handle_chat(data):
         print(f"[SOCKET] chat:send received: {str(data)[:100]}", flush=True)
         user_message = data.get("message", "")
+        session_id = data.get("sessionId")
         if not user_message:
             emit("chat:error", {"error": "No message provided"})
             return
 
         # ── Fast path: check if we can skip the agent ────────────────
         route_info = classify(user_message)
+        if route_info is None:
+            # Second chance: learned classifier for paraphrases the regexes miss
+            from backend.intent_model import classify_fallback
+            route_info = classify_fallback(user_message)
         print(f"[SOCKET] classify result: {route_info}", flush=True)
         if route_info:
             try:
-                result = execute_fast(route_info)
-                print(f"[SOCKET] fast-path result: sections in response = {result['response'].count('###')}, len = {len(result['response'])}", flush=True)
+                # Multi-section routes stream each section as it lands
+                started = time.monotonic()
+                first_ms = None
+                result = None
+                for kind, payload in stream_fast(route_info):
+                    if kind == "partial":
+                        if first_ms is None:
+                            first_ms = round((time.monotonic() - started) * 1000)
+                        emit("chat:partial", payload)
+                    else:
+                        result = payload
+                total_ms = round((time.monotonic() - started) * 1000)
+                print(f"[SOCKET] fast-path result: sections in response = {result['response'].count('###')}, len = {len(result['response'])}, "
+                      f"first content {first_ms if first_ms is not None else total_ms}ms, total {total_ms}ms", flush=True)
                 tool_calls = []
                 if result.get("tool"):
                     tool_calls = [{"tool": result["tool"], "input": user_message, "output": result["response"]}]
@@ -44,6 +86,7 @@ def register_handlers(socketio: SocketIO):
                     "response": result["response"],
                     "toolCalls": tool_calls,
                     "fastPath": True,
+                    "cached": bool(result.get("cached")),
                 })
 
                 # Log activity
@@ -52,7 +95,9 @@ def register_handlers(socketio: SocketIO):
                     log_activity(
                         "chat", "fast_query",
                         f"Q: {user_message[:80]}",
-                        {"route": route_info["route"], "label": route_info["label"], "response_len": len(result["response"])}
+                        {"route": route_info["route"], "label": route_info["label"], "response_len": len(result["response"]),
+                         "first_content_ms": first_ms, "total_ms": total_ms, "cached": bool(result.get("cached")),
+                         "classifier": route_info.get("classifier", "regex"), "confidence": route_info.get("confidence")}
                     )
                 except Exception:
                     pass
@@ -61,110 +106,125 @@ def register_handlers(socketio: SocketIO):
                 print(f"[SOCKET] fast-path ERROR: {e}", flush=True)
                 import traceback; traceback.print_exc()
                 # If fast path fails, fall through to full agent
-                pass
+                record_fallthrough(route_info["route"])
+        else:
+            record_unrouted(user_message)
 
         # ── Full agent path (tiered: Haiku for simple, Sonnet for complex) ─
-        from backend.agent.wrapper import get_executor_for_query
+        from backend.agent.callbacks import FINAL_ANSWER_MARKER, StreamingCallbackHandler
+        from backend.agent.wrapper import executor_info, get_executor_for_query, record_ttft, run_succeeded
+
+        # ── Session memory: summary + recent turns ahead of the message ─
+        # A follow-up ("what about Chicago?") picks its tier and tools together
+        # with the previous user turn, which names what it's about
+        from backend import answer_cache, session_memory
+        memory, previous = session_memory.context_for(session_id, user_message)
+        standalone = not memory or not session_memory.is_follow_up(user_message)
+        routing_query = user_message if standalone or not previous else f"{previous}\n{user_message}"
 
-        callback = StreamingCallbackHandler()
         try:
-            executor, tier = get_executor_for_query(user_message)
-            print(f"[SOCKET] Agent tier: {tier} for: {user_message[:60]}", flush=True)
+            executor, tier = get_executor_for_query(routing_query)
+            agent_info = executor_info(executor)
+            print(f"[SOCKET] Agent tier: {tier} ({agent_info.get('mode', 'react')}, "
+                  f"{agent_info.get('tools', 'all')} tools) for: {user_message[:60]}", flush=True)
         except Exception as e:
             print(f"[SOCKET] ERROR getting executor: {e}", flush=True)
             emit("chat:error", {"error": f"Agent initialization failed: {e}"})
             return
-        executor.handle_parsing_errors = (
-            "Parsing error. You must respond using EXACTLY this format:\n"
-            "Thought: I now know the final answer\n"
-            "Final Answer: <your complete response here>"
-        )
 
-        def run_agent():
+        # ── Answer cache: replay a recent identical question instantly ─
+        # Skipped for follow-ups, where the same words can mean something else
+        cache_tier = agent_info.get("tier", tier)
+        hit = answer_cache.lookup(user_message, cache_tier) if standalone else None
+        if hit:
+            print(f"[SOCKET] answer cache hit ({hit['ageSeconds']}s old) for: {user_message[:60]}", flush=True)
+            emit("chat:done", {"response": hit["response"], "toolCalls": hit["toolCalls"], "cached": True})
             try:
-                print("[SOCKET] Agent thread starting invoke...", flush=True)
-                result = executor.invoke(
-                    {"input": user_message},
-                    config={"callbacks": [callback]}
+                from backend.db import log_activity
+                log_activity(
+                    "chat", "query",
+                    f"Q: {user_message[:80]}",
+                    {"tools": [tc.get("tool", "") for tc in hit["toolCalls"]],
+                     "response_len": len(hit["response"]), "cached": True}
                 )
-                print(f"[SOCKET] Agent invoke returned: {str(result)[:200]}", flush=True)
-                if not callback.is_done:
-                    output = result.get("output", "") if isinstance(result, dict) else str(result)
-                    callback.queue.put({
-                        "event": "done",
-                        "data": {"output": output}
-                    })
-                    callback._done = True
-            except Exception as e:
-                print(f"[SOCKET] Agent thread ERROR: {e}", flush=True)
-                callback.queue.put({
-                    "event": "error",
-                    "data": str(e)
-                })
-                callback._done = True
+            except Exception:
+                pass
+            return
 
-        thread = threading.Thread(target=run_agent, daemon=True)
-        thread.start()
+        # Stream only the answer: ReAct text after "Final Answer:", tool-calling turn content
+        callback = StreamingCallbackHandler(None if agent_info.get("mode") == "tools" else FINAL_ANSWER_MARKER)
+        if "mode:tools" not in (getattr(executor, "tags", None) or []):
+            # ReAct only — tool-calling executors have no text format to repair
+            executor.handle_parsing_errors = (
+                "Parsing error. You must respond using EXACTLY this format:\n"
+                "Thought: I now know the final answer\n"
+                "Final Answer: <your complete response here>"
+            )
 
-        tool_calls = []
-        timeout_at = time.time() + 120
-        while time.time() < timeout_at:
+        def log_tokens(success, cancelled=None):
+            # Token usage for cost tracking, including what cancelled runs spent
             try:
-                item = callback.queue.get(timeout=0.2)
-            except queue.Empty:
-                if callback.is_done:
-                    break
-                continue
-
-            event_type = item["event"]
-            event_data = item["data"]
-
-            if event_type == "thinking":
-                emit("chat:thinking", {"text": event_data})
-            elif event_type == "tool_start":
-                tool_calls.append(event_data)
-                emit("chat:tool_start", event_data)
-            elif event_type == "tool_result":
-                emit("chat:tool_result", event_data)
-            elif event_type == "done":
-                response_text = event_data.get("output", "")
-                emit("chat:done", {
-                    "response": response_text,
-                    "toolCalls": tool_calls,
-                })
+                import requests as _req
+                model = callback.model or ('claude-sonnet-4' if tier == 'sonnet' else 'claude-haiku')
+                prompt_tokens, completion_tokens = callback.spent_tokens()
+                if prompt_tokens or completion_tokens:
+                    def _log_tokens():
+                        try:
+                            _req.post('http://localhost:5001/api/token-usage/log', json={
+                                'source': 'langly',
+                                'model': model,
+                                'prompt_tokens': prompt_tokens,
+                                'completion_tokens': completion_tokens,
+                                'cached_tokens': callback.cached_tokens,
+                                'session_id': str(session_id or ''),
+                                'context': user_message[:120],
+                                'tool_selection': agent_info.get('toolset', ''),
+                                'tools_offered': agent_info.get('tools'),
+                                'success': success,
+                                'cancel_reason': cancelled,
+                            }, timeout=3)
+                        except Exception:
+                            pass
+                    threading.Thread(target=_log_tokens, daemon=True).start()
+            except Exception:
+                pass
+
+        def on_finish(outcome, text, tool_calls):
+            from backend.db import log_activity
+            tools_used = [tc.get("tool", "") for tc in tool_calls]
+            if outcome == "done":
+                answer_cache.store(user_message, cache_tier, text, tool_calls,
+                                   ok=run_succeeded(text) and standalone)
+                if callback.first_token_ms is not None:
+                    record_ttft(cache_tier, callback.first_token_ms)
+                saved = (callback.compaction or {}).get("savedTokens", 0)
+                if saved:
+                    print(f"[CHAT] Observation compaction saved ~{saved} prompt tokens", flush=True)
                 try:
-                    from backend.db import log_activity
-                    tools_used = [tc.get("tool", "") for tc in tool_calls]
                     log_activity(
                         "chat", "query",
                         f"Q: {user_message[:80]}",
-                        {"tools": tools_used, "response_len": len(response_text)}
+                        {"tools": tools_used, "response_len": len(text), "tier": cache_tier,
+                         "ttft_ms": callback.first_token_ms, "obs_tokens_saved": saved,
+                         "memory_chars": len(memory), "prompt_tokens": callback.prompt_tokens,
+                         "cached_tokens": callback.cached_tokens}
                     )
                 except Exception:
                     pass
-                # Log token usage for cost tracking
+                log_tokens(run_succeeded(text))
+            elif outcome in ("cancelled", "timeout"):
+                prompt_tokens, completion_tokens = callback.spent_tokens()
                 try:
-                    import requests as _req
-                    model = callback.model or ('claude-sonnet-4' if tier == 'sonnet' else 'claude-haiku')
-                    if callback.prompt_tokens or callback.completion_tokens:
-                        def _log_tokens():
-                            try:
-                                _req.post('http://localhost:5001/api/token-usage/log', json={
-                                    'source': 'langly',
-                                    'model': model,
-                                    'prompt_tokens': callback.prompt_tokens,
-                                    'completion_tokens': callback.completion_tokens,
-                                    'session_id': '',
-                                    'context': user_message[:120],
-                                }, timeout=3)
-                            except Exception:
-                                pass
-                        threading.Thread(target=_log_tokens, daemon=True).start()
+                    log_activity(
+                        "chat", "cancelled",
+                        f"Q: {user_message[:80]}",
+                        {"reason": text, "tools": tools_used, "tier": cache_tier,
+                         "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+                    )
                 except Exception:
                     pass
-                break
-            elif event_type == "error":
-                emit("chat:error", {"error": event_data})
-                break
-        else:
-            emit("chat:error", {"error": "Agent timed out after 120 seconds"})
+                log_tokens(False, cancelled=text)
+
+        stream_agent_run(socketio, flask_request.sid, "chat", executor, memory + user_message, callback,
+                         label="chat", timeout=120, timeout_message="Agent timed out after 120 seconds",
+                         on_finish=on_finish)
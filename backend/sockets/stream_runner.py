@@ -0,0 +1,168 @@
+"""Shared runner that streams one agent run's callback events to a Socket.IO client.
+
+chat:send and travel:insights used to poll the callback queue every 0.2 s
+inside the event handler, holding the handler for the whole run and delaying
+each event by up to 200 ms.  stream_agent_run() instead submits the run to
+the agent pool and returns; a background task (socketio.start_background_task,
+so a greenlet under gevent and a thread under threading) blocks on the queue
+and emits "<prefix>:<event>" to the client's room as soon as each event is
+produced:
+
+    <prefix>:queued      {position}        waiting for a pool slot
+    <prefix>:thinking    {text}
+    <prefix>:tool_start  {tool, input, runId}
+    <prefix>:tool_result {output, runId}      runId pairs a result with its call
+    <prefix>:token       {text}            final-answer text as it streams
+    <prefix>:reset       {reason}          discard the streamed text; the run restarts
+    <prefix>:done        {response, toolCalls}
+    <prefix>:cancelled   {reason}
+    <prefix>:error       {error}           including the timeout
+
+on_finish(outcome, text, tool_calls) runs once the stream ends, in the
+background task: outcome is "done" (text = response), "cancelled" or
+"timeout" (text = reason) or "error" (text = message).
+
+`timeout` bounds the run itself and starts when the pool gives it a slot;
+time spent queued is bounded separately by pool.MAX_WAIT.
+
+Under gevent this relies on the gunicorn worker's monkey patching, which
+makes the pool's threads and queue.Queue cooperative.
+"""
+from __future__ import annotations
+
+import queue
+import time
+
+_patch_checked = False
+
+
+def _check_gevent(socketio) -> None:
+    global _patch_checked
+    if _patch_checked or socketio.async_mode != "gevent":
+        return
+    _patch_checked = True
+    from gevent import monkey
+    if not monkey.is_module_patched("threading"):
+        print("[STREAM] WARNING: gevent mode without monkey patching — agent runs will block the event loop",
+              flush=True)
+
+
+def stream_agent_run(socketio, sid: str, prefix: str, executor, agent_input: str, callback, *,
+                     label: str, timeout: float, timeout_message: str, on_finish=None):
+    """Run executor on agent_input in the agent pool and stream its events to sid.
+
+    Returns the pool Future, or None if the pool refused the run (the client
+    has already been sent <prefix>:error).
+    """
+    from backend.agent import pool
+    from backend.agent.callbacks import CancellationHandler, CancelToken, RunCancelled
+
+    _check_gevent(socketio)
+    cancel_token = CancelToken()
+    tag = prefix.upper()
+
+    def send(event: str, payload) -> None:
+        socketio.emit(f"{prefix}:{event}", payload, to=sid)
+
+    def run_agent():
+        callback.queue.put({"event": "started", "data": None})
+        try:
+            print(f"[{tag}] Agent thread starting invoke...", flush=True)
+            result = executor.invoke(
+                {"input": agent_input},
+                config={"callbacks": [callback, CancellationHandler(cancel_token)]}
+            )
+            print(f"[{tag}] Agent invoke returned: {str(result)[:200]}", flush=True)
+            if not callback.is_done:
+                output = result.get("output", "") if isinstance(result, dict) else str(result)
+                callback.queue.put({"event": "done", "data": {"output": output}})
+                callback._done = True
+        except RunCancelled as e:
+            print(f"[{tag}] Agent run cancelled ({e.reason})", flush=True)
+            callback.queue.put({"event": "cancelled", "data": e.reason})
+            callback._done = True
+        except Exception as e:
+            print(f"[{tag}] Agent thread ERROR: {e}", flush=True)
+            callback.queue.put({"event": "error", "data": str(e)})
+            callback._done = True
+
+    try:
+        future = pool.submit(run_agent, client=sid, label=label, token=cancel_token,
+                             on_position=lambda n: callback.queue.put({"event": "queued", "data": {"position": n}}))
+    except pool.PoolFull as e:
+        send("error", {"error": str(e)})
+        return None
+
+    def on_future_done(f):
+        # A run cancelled while still queued never starts, so nothing else would wake the pump
+        if f.cancelled():
+            callback.queue.put({"event": "cancelled", "data": cancel_token.reason})
+
+    future.add_done_callback(on_future_done)
+
+    def finish(outcome: str, text: str, tool_calls: list) -> None:
+        if on_finish is None:
+            return
+        try:
+            on_finish(outcome, text, tool_calls)
+        except Exception as e:
+            print(f"[{tag}] on_finish ERROR: {e}", flush=True)
+
+    def pump():
+        tool_calls = []
+        call_index = {}   # runId -> index in tool_calls
+        started = False
+        deadline = time.monotonic() + pool.MAX_WAIT   # until the run gets a slot
+        while True:
+            try:
+                item = callback.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                if not started:
+                    pool.cancel(future, "queue_timeout")
+                    send("error", {"error": "The assistant is busy — please try again shortly"})
+                    finish("timeout", "queue_timeout", tool_calls)
+                    return
+                # Stop the run too, or it keeps calling tools and paying for tokens
+                pool.cancel(future, "timeout")
+                send("error", {"error": timeout_message})
+                finish("timeout", "timeout", tool_calls)
+                return
+
+            event_type = item["event"]
+            event_data = item["data"]
+            if event_type == "started":
+                started = True
+                deadline = time.monotonic() + timeout
+            elif event_type == "token":
+                send("token", {"text": event_data})
+            elif event_type == "reset":
+                send("reset", {"reason": event_data})
+            elif event_type == "queued":
+                send("queued", event_data)
+            elif event_type == "thinking":
+                send("thinking", {"text": event_data})
+            elif event_type == "tool_start":
+                call_index[event_data.get("runId")] = len(tool_calls)
+                tool_calls.append({"tool": event_data["tool"], "input": event_data["input"]})
+                send("tool_start", event_data)
+            elif event_type == "tool_result":
+                index = call_index.pop(event_data.get("runId"), None)
+                if index is not None:
+                    tool_calls[index] = {**tool_calls[index], "output": event_data.get("output", "")}
+                send("tool_result", event_data)
+            elif event_type == "done":
+                response_text = event_data.get("output", "")
+                send("done", {"response": response_text, "toolCalls": tool_calls})
+                finish("done", response_text, tool_calls)
+                return
+            elif event_type == "cancelled":
+                send("cancelled", {"reason": event_data})
+                finish("cancelled", event_data, tool_calls)
+                return
+            elif event_type == "error":
+                send("error", {"error": event_data})
+                finish("error", event_data, tool_calls)
+                return
+
+    socketio.start_background_task(pump)
+    return future
@@ -1,10 +1,8 @@
 """Socket handler for streaming AI travel insights."""
-import queue
-import time
-import threading
+from flask import request as flask_request
 from flask_socketio import SocketIO, emit
-from backend.agent.callbacks import StreamingCallbackHandler
 from backend.profile import FAMILY_PROFILE
+from backend.sockets.stream_runner import stream_agent_run
 
 
 def build_travel_prompt(data: dict) -> str:
@@ -121,9 +119,9 @@ def register_travel_handlers(socketio: SocketIO):
         print(f"[TRAVEL] Generating insights for: {destination}", flush=True)
         prompt = build_travel_prompt(data)
 
+        from backend.agent.callbacks import FINAL_ANSWER_MARKER, StreamingCallbackHandler
         from backend.agent.wrapper import get_executor
 
-        callback = StreamingCallbackHandler()
         try:
             executor = get_executor()
             print(f"[TRAVEL] Got executor: {type(executor).__name__}", flush=True)
@@ -132,77 +130,31 @@ def register_travel_handlers(socketio: SocketIO):
             emit("travel:error", {"error": f"Agent initialization failed: {e}"})
             return
 
-        executor.handle_parsing_errors = (
-            "Parsing error. You must respond using EXACTLY this format:\n"
-            "Thought: I now know the final answer\n"
-            "Final Answer: <your complete response here>"
-        )
+        tool_mode = "mode:tools" in (getattr(executor, "tags", None) or [])
+        callback = StreamingCallbackHandler(None if tool_mode else FINAL_ANSWER_MARKER)
+        if not tool_mode:
+            # ReAct only — tool-calling executors have no text format to repair
+            executor.handle_parsing_errors = (
+                "Parsing error. You must respond using EXACTLY this format:\n"
+                "Thought: I now know the final answer\n"
+                "Final Answer: <your complete response here>"
+            )
 
-        def run_agent():
+        def on_finish(outcome, text, tool_calls):
+            if outcome != "done":
+                return
             try:
-                print("[TRAVEL] Agent thread starting invoke...", flush=True)
-                result = executor.invoke(
-                    {"input": prompt},
-                    config={"callbacks": [callback]}
+                from backend.db import log_activity
+                tools_used = [tc.get("tool", "") for tc in tool_calls]
+                log_activity(
+                    "travel", "insights",
+                    f"Insights: {destination}",
+                    {"tools": tools_used, "response_len": len(text)}
                 )
-                print(f"[TRAVEL] Agent invoke returned: {str(result)[:200]}", flush=True)
-                if not callback.is_done:
-                    output = result.get("output", "") if isinstance(result, dict) else str(result)
-                    callback.queue.put({
-                        "event": "done",
-                        "data": {"output": output}
-                    })
-                    callback._done = True
-            except Exception as e:
-                print(f"[TRAVEL] Agent thread ERROR: {e}", flush=True)
-                callback.queue.put({
-                    "event": "error",
-                    "data": str(e)
-                })
-                callback._done = True
-
-        thread = threading.Thread(target=run_agent, daemon=True)
-        thread.start()
-
-        tool_calls = []
-        timeout_at = time.time() + 180  # 3 min timeout for travel research
-        while time.time() < timeout_at:
-            try:
-                item = callback.queue.get(timeout=0.2)
-            except queue.Empty:
-                if callback.is_done:
-                    break
-                continue
-
-            event_type = item["event"]
-            event_data = item["data"]
-
-            if event_type == "thinking":
-                emit("travel:thinking", {"text": event_data})
-            elif event_type == "tool_start":
-                tool_calls.append(event_data)
-                emit("travel:tool_start", event_data)
-            elif event_type == "tool_result":
-                emit("travel:tool_result", event_data)
-            elif event_type == "done":
-                response_text = event_data.get("output", "")
-                emit("travel:done", {
-                    "response": response_text,
-                    "toolCalls": tool_calls,
-                })
-                try:
-                    from backend.db import log_activity
-                    tools_used = [tc.get("tool", "") for tc in tool_calls]
-                    log_activity(
-                        "travel", "insights",
-                        f"Insights: {destination}",
-                        {"tools": tools_used, "response_len": len(response_text)}
-                    )
-                except Exception:
-                    pass
-                break
-            elif event_type == "error":
-                emit("travel:error", {"error": event_data})
-                break
-        else:
-            emit("travel:error", {"error": "Travel insights timed out after 180 seconds"})
+            except Exception:
+                pass
+
+        # 3 min timeout for travel research
+        stream_agent_run(socketio, flask_request.sid, "travel", executor, prompt, callback,
+                         label="travel", timeout=180, timeout_message="Travel insights timed out after 180 seconds",
+                         on_finish=on_finish)
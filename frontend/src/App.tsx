@@ -449,6 +449,8 @@ function Dashboard() {
               messages={chat.messages}
               isLoading={chat.isLoading}
               sendMessage={chat.sendMessage}
+              notifyTyping={chat.notifyTyping}
+              cancelRun={chat.cancelRun}
               clearMessages={chat.clearMessages}
               sessions={chat.sessions}
               activeSessionId={chat.activeSessionId}
@@ -2,10 +2,12 @@ import { useState, useRef, useEffect } from 'react';
 
 interface Props {
   onSend: (message: string) => void;
+  onTyping?: (draft: string) => void;
+  onCancel?: () => void;
   disabled: boolean;
 }
 
-export function ChatInput({ onSend, disabled }: Props) {
+export function ChatInput({ onSend, onTyping, onCancel, disabled }: Props) {
   const [value, setValue] = useState('');
   const inputRef = useRef<HTMLTextAreaElement>(null);
 
@@ -34,7 +36,10 @@ export function ChatInput({ onSend, disabled }: Props) {
           <textarea
             ref={inputRef}
             value={value}
-            onChange={(e) => setValue(e.target.value)}
+            onChange={(e) => {
+              setValue(e.target.value);
+              onTyping?.(e.target.value);
+            }}
             onKeyDown={handleKeyDown}
             placeholder={disabled ? 'Processing...' : 'Enter command...'}
             disabled={disabled}
@@ -53,15 +58,28 @@ export function ChatInput({ onSend, disabled }: Props) {
             </div>
           )}
         </div>
-        <button
-          type="submit"
-          disabled={disabled || !value.trim()}
-          className="flex h-[42px] w-[42px] items-center justify-center rounded-lg border border-cyan-500/30 bg-cyan-500/10 text-cyan-400 transition-all hover:bg-cyan-500/20 hover:border-cyan-500/50 disabled:opacity-30 disabled:hover:bg-cyan-500/10 glow-border-cyan"
-        >
-          <svg className="h-4 w-4" fill="none" viewBox="0 0 24 24" stroke="currentColor">
-            <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M12 19V5m0 0l-7 7m7-7l7 7" />
-          </svg>
-        </button>
+        {disabled && onCancel ? (
+          <button
+            type="button"
+            onClick={onCancel}
+            title="Stop"
+            className="flex h-[42px] w-[42px] items-center justify-center rounded-lg border border-red-500/30 bg-red-500/10 text-red-400 transition-all hover:bg-red-500/20 hover:border-red-500/50"
+          >
+            <svg className="h-3.5 w-3.5" fill="currentColor" viewBox="0 0 24 24">
+              <rect x="5" y="5" width="14" height="14" rx="2" />
+            </svg>
+          </button>
+        ) : (
+          <button
+            type="submit"
+            disabled={disabled || !value.trim()}
+            className="flex h-[42px] w-[42px] items-center justify-center rounded-lg border border-cyan-500/30 bg-cyan-500/10 text-cyan-400 transition-all hover:bg-cyan-500/20 hover:border-cyan-500/50 disabled:opacity-30 disabled:hover:bg-cyan-500/10 glow-border-cyan"
+          >
+            <svg className="h-4 w-4" fill="none" viewBox="0 0 24 24" stroke="currentColor">
+              <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M12 19V5m0 0l-7 7m7-7l7 7" />
+            </svg>
+          </button>
+        )}
       </div>
     </form>
   );
@@ -50,7 +50,9 @@ export function ChatMessage({ message }: Props) {
           {message.isStreaming && !message.content ? (
             <div className="flex items-center gap-2 py-1">
               <LoadingSpinner size="sm" />
-              <span className="text-sm text-cyan-400/60 cursor-blink">Processing</span>
+              <span className="text-sm text-cyan-400/60 cursor-blink">
+                {message.queuePosition ? `Queued · #${message.queuePosition}` : 'Processing'}
+              </span>
             </div>
           ) : (
             <MarkdownRenderer content={message.content} />
@@ -9,6 +9,8 @@ interface Props {
   messages: ChatMessage[];
   isLoading: boolean;
   sendMessage: (msg: string) => void;
+  notifyTyping?: (draft: string) => void;
+  cancelRun?: () => void;
   clearMessages: () => void;
   sessions: ChatSession[];
   activeSessionId: number | null;
@@ -21,6 +23,8 @@ export function ChatPanel({
   messages,
   isLoading,
   sendMessage,
+  notifyTyping,
+  cancelRun,
   clearMessages,
   sessions,
   activeSessionId,
@@ -120,7 +124,7 @@ export function ChatPanel({
         ) : (
           <MessageList messages={messages} onQuickAction={sendMessage} />
         )}
-        <ChatInput onSend={sendMessage} disabled={isLoading} />
+        <ChatInput onSend={sendMessage} onTyping={notifyTyping} onCancel={cancelRun} disabled={isLoading} />
       </div>
     </WidgetPanel>
   );
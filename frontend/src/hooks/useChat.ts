@@ -23,7 +23,11 @@ export function useChat() {
   const currentAssistantId = useRef<string | null>(null);
   const toolCallsRef = useRef<ToolCall[]>([]);
   const thinkingRef = useRef<ThinkingStep[]>([]);
+  const partialsRef = useRef<Map<number, string>>(new Map());
+  const streamedRef = useRef('');
   const sessionIdRef = useRef<number | null>(null);
+  const typingTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const lastTypedRef = useRef('');
 
   // Keep ref in sync
   useEffect(() => {
@@ -69,23 +73,54 @@ export function useChat() {
         ...thinkingRef.current,
         { text: data.text, timestamp: Date.now() },
       ];
-      updateAssistantMessage({ thinkingSteps: [...thinkingRef.current] });
+      updateAssistantMessage({ thinkingSteps: [...thinkingRef.current], queuePosition: undefined });
     });
 
-    socket.on('chat:tool_start', (data: { tool: string; input: string }) => {
-      toolCallsRef.current = [...toolCallsRef.current, { tool: data.tool, input: data.input }];
-      updateAssistantMessage({ toolCalls: [...toolCallsRef.current] });
+    socket.on('chat:tool_start', (data: { tool: string; input: string; runId?: string }) => {
+      toolCallsRef.current = [...toolCallsRef.current, { tool: data.tool, input: data.input, runId: data.runId }];
+      updateAssistantMessage({ toolCalls: [...toolCallsRef.current], queuePosition: undefined });
     });
 
-    socket.on('chat:tool_result', (data: { output: string }) => {
-      if (toolCallsRef.current.length > 0) {
+    socket.on('chat:tool_result', (data: { output: string; runId?: string }) => {
+      // Parallel tools finish out of order — match the result to its call
+      const index = toolCallsRef.current.findIndex((tc) => tc.runId === data.runId && tc.output === undefined);
+      if (index >= 0) {
         const updated = [...toolCallsRef.current];
-        updated[updated.length - 1] = { ...updated[updated.length - 1], output: data.output };
+        updated[index] = { ...updated[index], output: data.output };
         toolCallsRef.current = updated;
         updateAssistantMessage({ toolCalls: [...toolCallsRef.current] });
       }
     });
 
+    // Fast-path sections stream in as they load; a repeated index replaces
+    // that section, and chat:done carries the assembled response
+    socket.on('chat:partial', (data: { index: number; markdown: string }) => {
+      partialsRef.current.set(data.index, data.markdown);
+      const content = [...partialsRef.current.entries()]
+        .sort(([a], [b]) => a - b)
+        .map(([, md]) => md)
+        .filter(Boolean)
+        .join('\n\n');
+      updateAssistantMessage({ content });
+    });
+
+    // Agent answer text streams in token by token; chat:done carries the final text
+    socket.on('chat:token', (data: { text: string }) => {
+      streamedRef.current += data.text;
+      updateAssistantMessage({ content: streamedRef.current, queuePosition: undefined });
+    });
+
+    // A cascade run escalated to the deep tier: its answer replaces the partial one
+    socket.on('chat:reset', () => {
+      streamedRef.current = '';
+      updateAssistantMessage({ content: '' });
+    });
+
+    // All agent slots busy: show our place in line until the run starts
+    socket.on('chat:queued', (data: { position: number }) => {
+      updateAssistantMessage({ queuePosition: data.position });
+    });
+
     socket.on('chat:done', (data: { response: string; toolCalls: ToolCall[] }) => {
       // Capture ref values before they're cleared — React's functional
       // setState runs later during render, refs would be null by then
@@ -103,6 +138,7 @@ export function useChat() {
                 content: data.response,
                 toolCalls: finalToolCalls,
                 isStreaming: false,
+                queuePosition: undefined,
               }
             : m
         )
@@ -119,6 +155,32 @@ export function useChat() {
       currentAssistantId.current = null;
       toolCallsRef.current = [];
       thinkingRef.current = [];
+      partialsRef.current.clear();
+      streamedRef.current = '';
+    });
+
+    // Run stopped (chat:cancel, timeout or server side): keep what streamed so far
+    socket.on('chat:cancelled', () => {
+      const assistantId = currentAssistantId.current;
+      const streamed = streamedRef.current;
+      setMessages((prev) =>
+        prev.map((m) =>
+          m.id === assistantId
+            ? {
+                ...m,
+                content: streamed ? `${streamed}\n\n_Stopped._` : '_Stopped._',
+                isStreaming: false,
+                queuePosition: undefined,
+              }
+            : m
+        )
+      );
+      setIsLoading(false);
+      currentAssistantId.current = null;
+      toolCallsRef.current = [];
+      thinkingRef.current = [];
+      partialsRef.current.clear();
+      streamedRef.current = '';
     });
 
     socket.on('chat:error', (data: { error: string }) => {
@@ -126,18 +188,25 @@ export function useChat() {
       setMessages((prev) =>
         prev.map((m) =>
           m.id === assistantId
-            ? { ...m, content: `Error: ${data.error}`, isStreaming: false }
+            ? { ...m, content: `Error: ${data.error}`, isStreaming: false, queuePosition: undefined }
             : m
         )
       );
       setIsLoading(false);
       currentAssistantId.current = null;
+      partialsRef.current.clear();
+      streamedRef.current = '';
     });
 
     return () => {
       socket.off('chat:thinking');
       socket.off('chat:tool_start');
       socket.off('chat:tool_result');
+      socket.off('chat:partial');
+      socket.off('chat:token');
+      socket.off('chat:reset');
+      socket.off('chat:queued');
+      socket.off('chat:cancelled');
       socket.off('chat:done');
       socket.off('chat:error');
     };
@@ -185,6 +254,7 @@ export function useChat() {
       currentAssistantId.current = assistantMsg.id;
       toolCallsRef.current = [];
       thinkingRef.current = [];
+      partialsRef.current.clear();
 
       setMessages((prev) => [...prev, userMsg, assistantMsg]);
       setIsLoading(true);
@@ -202,11 +272,27 @@ export function useChat() {
         });
       }
 
-      socket.emit('chat:send', { message: content.trim() });
+      socket.emit('chat:send', { message: content.trim(), sessionId: sid });
     },
     [isLoading, activeSessionId]
   );
 
+  // Typeahead prefetch: after a short pause in typing, the server classifies
+  // the draft and warms cheap fast-path routes so the send hits a hot cache
+  const notifyTyping = useCallback((draft: string) => {
+    if (typingTimerRef.current) clearTimeout(typingTimerRef.current);
+    const text = draft.trim();
+    if (text.length < 4 || text === lastTypedRef.current) return;
+    typingTimerRef.current = setTimeout(() => {
+      lastTypedRef.current = text;
+      if (socket.connected) socket.emit('chat:typing', { message: text });
+    }, 300);
+  }, []);
+
+  const cancelRun = useCallback(() => {
+    if (socket.connected) socket.emit('chat:cancel');
+  }, []);
+
   const startNewSession = useCallback(async () => {
     const session = await createSession();
     setSessions((prev) => [session, ...prev]);
@@ -239,6 +325,8 @@ export function useChat() {
     messages,
     isLoading,
     sendMessage,
+    notifyTyping,
+    cancelRun,
     clearMessages,
     sessions,
     activeSessionId,
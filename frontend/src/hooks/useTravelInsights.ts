@@ -5,6 +5,7 @@ interface ToolCall {
   tool: string;
   input: string;
   output?: string;
+  runId?: string;
 }
 
 interface ThinkingStep {
@@ -51,15 +52,23 @@ export function useTravelInsights() {
       setState((s) => ({ ...s, thinkingSteps: [...thinkingRef.current] }));
     });
 
-    socket.on('travel:tool_start', (data: { tool: string; input: string }) => {
-      toolCallsRef.current = [...toolCallsRef.current, { tool: data.tool, input: data.input }];
+    socket.on('travel:queued', (data: { position: number }) => {
+      const text = `Waiting for a free agent slot (#${data.position} in queue)`;
+      thinkingRef.current = [...thinkingRef.current, { text, timestamp: Date.now() }];
+      setState((s) => ({ ...s, thinkingSteps: [...thinkingRef.current] }));
+    });
+
+    socket.on('travel:tool_start', (data: { tool: string; input: string; runId?: string }) => {
+      toolCallsRef.current = [...toolCallsRef.current, { tool: data.tool, input: data.input, runId: data.runId }];
       setState((s) => ({ ...s, toolCalls: [...toolCallsRef.current] }));
     });
 
-    socket.on('travel:tool_result', (data: { output: string }) => {
-      if (toolCallsRef.current.length > 0) {
+    socket.on('travel:tool_result', (data: { output: string; runId?: string }) => {
+      // Parallel tools finish out of order — match the result to its call
+      const index = toolCallsRef.current.findIndex((tc) => tc.runId === data.runId && tc.output === undefined);
+      if (index >= 0) {
         const updated = [...toolCallsRef.current];
-        updated[updated.length - 1] = { ...updated[updated.length - 1], output: data.output };
+        updated[index] = { ...updated[index], output: data.output };
         toolCallsRef.current = updated;
         setState((s) => ({ ...s, toolCalls: [...toolCallsRef.current] }));
       }
@@ -76,16 +85,27 @@ export function useTravelInsights() {
       thinkingRef.current = [];
     });
 
+    socket.on('travel:token', (data: { text: string }) => {
+      setState((s) => ({ ...s, content: s.content + data.text }));
+    });
+
     socket.on('travel:error', (data: { error: string }) => {
       setState((s) => ({ ...s, error: data.error, isLoading: false }));
     });
 
+    socket.on('travel:cancelled', (data: { reason: string }) => {
+      setState((s) => ({ ...s, error: `Travel insights cancelled (${data.reason})`, isLoading: false }));
+    });
+
     return () => {
       socket.off('travel:thinking');
+      socket.off('travel:queued');
       socket.off('travel:tool_start');
       socket.off('travel:tool_result');
       socket.off('travel:done');
+      socket.off('travel:token');
       socket.off('travel:error');
+      socket.off('travel:cancelled');
     };
   }, []);
 
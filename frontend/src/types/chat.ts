@@ -2,6 +2,7 @@ export interface ToolCall {
   tool: string;
   input: string;
   output?: string;
+  runId?: string;
 }
 
 export interface ThinkingStep {
@@ -17,4 +18,5 @@ export interface ChatMessage {
   toolCalls?: ToolCall[];
   thinkingSteps?: ThinkingStep[];
   isStreaming?: boolean;
+  queuePosition?: number;
 }